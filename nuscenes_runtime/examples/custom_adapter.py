@@ -27,7 +27,9 @@ def convert_model_output(raw_output: Any, frame: dict[str, Any]) -> list[dict[st
     Required per detection:
       x, y, z, yaw, l, w, h, score, label
 
-    Return list[dict].
+    Return list[dict], or a DetectionBatch built with
+    cam3d_tracker.nuscenes_runtime.adapters.boxes_to_batch(boxes, scores, label_ids)
+    to skip building one dict per detection.
     """
     if isinstance(raw_output, dict) and "detections" in raw_output:
         return raw_output["detections"]
@@ -2,11 +2,20 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
 from nuscenes.nuscenes import NuScenes
 
+from cam3d_tracker.nuscenes_runtime.scene_index import (
+    SceneTables,
+    add_scene_args,
+    build_scene_shards,
+    build_trace_shard,
+    select_scenes,
+    write_index,
+    write_json,
+)
+
 
 CATEGORY_TO_DET = {
     "vehicle.car": "car",
@@ -28,25 +37,14 @@ def to_det_name(category_name: str) -> str | None:
     return None
 
 
-def build_results(nusc: NuScenes, scene_name: str) -> tuple[dict[str, list[dict]], dict[str, float], list[str]]:
-    scene = next((s for s in nusc.scene if s["name"] == scene_name), None)
-    if scene is None:
-        raise ValueError(f"scene '{scene_name}' not found for {nusc.version}")
-
+def build_results(tables: SceneTables, scene: dict) -> tuple[dict[str, list[dict]], dict[str, float], list[str]]:
     results: dict[str, list[dict]] = {}
-    token_to_ts_s: dict[str, float] = {}
-    trace_tokens: list[str] = []
+    trace_tokens, token_to_ts_s = tables.trace(scene)
 
-    sample_token = scene["first_sample_token"]
-    while sample_token:
-        sample = nusc.get("sample", sample_token)
+    for sample in tables.samples(scene):
         token = sample["token"]
-        trace_tokens.append(token)
-        token_to_ts_s[token] = float(sample["timestamp"]) * 1e-6
         annos: list[dict] = []
-
-        for ann_token in sample["anns"]:
-            ann = nusc.get("sample_annotation", ann_token)
+        for ann in tables.annotations(sample):
             det_name = to_det_name(ann["category_name"])
             if det_name is None:
                 continue
@@ -60,64 +58,83 @@ def build_results(nusc: NuScenes, scene_name: str) -> tuple[dict[str, list[dict]
                     "detection_name": det_name,
                     "detection_score": 0.99,
                     "attribute_name": "",
+                    "tracking_id": ann["instance_token"],
                 }
             )
-
         results[token] = annos
-        sample_token = sample["next"]
 
     return results, token_to_ts_s, trace_tokens
 
 
+def _results_payload(results: dict[str, list[dict]]) -> dict:
+    return {
+        "meta": {
+            "use_camera": True,
+            "use_lidar": False,
+            "use_radar": False,
+            "use_map": False,
+            "use_external": False,
+        },
+        "results": results,
+    }
+
+
+def build_gt_shard(tables: SceneTables, scene: dict, out_dir: Path) -> dict:
+    entry = build_trace_shard(tables, scene, out_dir)
+    results, _, _ = build_results(tables, scene)
+    entry["gt_results"] = f"{scene['name']}_gt_results.json"
+    write_json(out_dir / entry["gt_results"], _results_payload(results))
+    return entry
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
-        description="Build scene-ordered nuScenes detection JSON from mini GT (for tracker pipeline testing)."
+        description="Build scene-ordered nuScenes detection JSON from GT (for tracker pipeline testing)."
     )
     p.add_argument("--dataroot", required=True)
     p.add_argument("--version", default="v1.0-mini")
-    p.add_argument("--scene-name", required=True)
-    p.add_argument("--out-results", required=True)
-    p.add_argument("--out-tokens", required=True)
-    p.add_argument("--out-timestamps", required=True)
-    return p.parse_args()
+    add_scene_args(p)
+    p.add_argument("--out-results", help="Single scene: GT results JSON path")
+    p.add_argument("--out-tokens", help="Single scene: ordered sample tokens JSON path")
+    p.add_argument("--out-timestamps", help="Single scene: token->timestamp_s JSON path")
+    args = p.parse_args()
+    if not (args.scene_name or args.scene_glob or args.split):
+        p.error("select scenes with --scene-name, --scene-glob or --split")
+    if not args.out_dir and not (args.out_results and args.out_tokens and args.out_timestamps):
+        p.error("give --out-dir, or --out-results, --out-tokens and --out-timestamps for a single scene")
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    out_results = Path(args.out_results)
-    out_tokens = Path(args.out_tokens)
-    out_timestamps = Path(args.out_timestamps)
-    out_results.parent.mkdir(parents=True, exist_ok=True)
-    out_tokens.parent.mkdir(parents=True, exist_ok=True)
-    out_timestamps.parent.mkdir(parents=True, exist_ok=True)
-
     nusc = NuScenes(version=args.version, dataroot=args.dataroot, verbose=False)
-    results, token_to_ts, trace_tokens = build_results(nusc, args.scene_name)
-
-    with out_results.open("w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "meta": {
-                    "use_camera": True,
-                    "use_lidar": False,
-                    "use_radar": False,
-                    "use_map": False,
-                    "use_external": False,
-                },
-                "results": results,
-            },
-            f,
-            indent=2,
-        )
-    with out_tokens.open("w", encoding="utf-8") as f:
-        json.dump({"scene_name": args.scene_name, "sample_tokens": trace_tokens}, f, indent=2)
-    with out_timestamps.open("w", encoding="utf-8") as f:
-        json.dump(token_to_ts, f, indent=2)
+    tables = SceneTables(nusc)
+    try:
+        scenes = select_scenes(tables.scenes, args.scene_name, args.scene_glob, args.split)
+    except ValueError as exc:
+        raise SystemExit(f"{exc} ({args.version})") from exc
+    if not scenes:
+        raise SystemExit(f"No scenes selected in {args.version}")
+
+    if args.out_dir:
+        entries = build_scene_shards(tables, scenes, args.out_dir, build_gt_shard, workers=args.workers)
+        index = write_index(args.out_dir, tables.version, entries)
+        print(f"Wrote GT for {len(entries)} scenes ({sum(e['num_samples'] for e in entries)} samples)")
+        print(f"index: {index}")
+        return
+
+    if len(scenes) != 1:
+        raise SystemExit(f"{len(scenes)} scenes selected; use --out-dir for more than one")
+    scene = scenes[0]
+    results, token_to_ts, trace_tokens = build_results(tables, scene)
+    write_json(Path(args.out_results), _results_payload(results))
+    write_json(Path(args.out_tokens), {"scene_name": scene["name"], "sample_tokens": trace_tokens})
+    write_json(Path(args.out_timestamps), token_to_ts)
 
     print(f"Scene trace length: {len(trace_tokens)}")
-    print(f"Wrote: {out_results}")
-    print(f"Wrote: {out_tokens}")
-    print(f"Wrote: {out_timestamps}")
+    print(f"Wrote: {args.out_results}")
+    print(f"Wrote: {args.out_tokens}")
+    print(f"Wrote: {args.out_timestamps}")
 
 
 if __name__ == "__main__":
@@ -2,18 +2,32 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
+from cam3d_tracker.nuscenes_runtime.scene_index import (
+    SceneTables,
+    add_scene_args,
+    build_scene_shards,
+    build_trace_shard,
+    select_scenes,
+    write_index,
+    write_json,
+)
+
 
 def parse_args() -> argparse.Namespace:
-    p = argparse.ArgumentParser(description="Build ordered sample-token trace for one nuScenes scene")
+    p = argparse.ArgumentParser(description="Build ordered sample-token traces for nuScenes scenes")
     p.add_argument("--dataroot", required=True, help="Path to nuScenes root")
     p.add_argument("--version", default="v1.0-mini", help="nuScenes version")
-    p.add_argument("--scene-name", required=True, help="Scene name, e.g., scene-0103")
-    p.add_argument("--out-tokens", required=True, help="Output JSON path for ordered sample tokens")
-    p.add_argument("--out-timestamps", required=True, help="Output JSON path for token->timestamp_s map")
-    return p.parse_args()
+    add_scene_args(p)
+    p.add_argument("--out-tokens", help="Output JSON path for ordered sample tokens (single scene)")
+    p.add_argument("--out-timestamps", help="Output JSON path for token->timestamp_s map (single scene)")
+    args = p.parse_args()
+    if not (args.scene_name or args.scene_glob or args.split):
+        p.error("select scenes with --scene-name, --scene-glob or --split")
+    if not args.out_dir and not (args.out_tokens and args.out_timestamps):
+        p.error("give --out-dir, or --out-tokens and --out-timestamps for a single scene")
+    return args
 
 
 def main() -> None:
@@ -24,39 +38,29 @@ def main() -> None:
         raise SystemExit("nuscenes-devkit is required: pip install nuscenes-devkit") from exc
 
     nusc = NuScenes(version=args.version, dataroot=args.dataroot, verbose=False)
+    tables = SceneTables(nusc)
+    try:
+        scenes = select_scenes(tables.scenes, args.scene_name, args.scene_glob, args.split)
+    except ValueError as exc:
+        raise SystemExit(f"{exc} ({args.version})") from exc
+    if not scenes:
+        raise SystemExit(f"No scenes selected in {args.version}")
 
-    scene = None
-    for s in nusc.scene:
-        if s["name"] == args.scene_name:
-            scene = s
-            break
-    if scene is None:
-        raise SystemExit(f"Scene '{args.scene_name}' not found in {args.version}")
-
-    sample_tokens: list[str] = []
-    token_to_ts: dict[str, float] = {}
-
-    tok = scene["first_sample_token"]
-    while tok:
-        sample = nusc.get("sample", tok)
-        sample_tokens.append(tok)
-        token_to_ts[tok] = float(sample["timestamp"]) * 1e-6
-        tok = sample["next"]
-
-    tokens_payload = {
-        "version": args.version,
-        "scene_name": args.scene_name,
-        "sample_tokens": sample_tokens,
-    }
+    if args.out_dir:
+        entries = build_scene_shards(tables, scenes, args.out_dir, build_trace_shard, workers=args.workers)
+        index = write_index(args.out_dir, tables.version, entries)
+        print(f"Wrote {len(entries)} scene traces ({sum(e['num_samples'] for e in entries)} samples)")
+        print(f"index: {index}")
+        return
 
-    Path(args.out_tokens).parent.mkdir(parents=True, exist_ok=True)
-    Path(args.out_timestamps).parent.mkdir(parents=True, exist_ok=True)
-    with open(args.out_tokens, "w", encoding="utf-8") as f:
-        json.dump(tokens_payload, f, indent=2)
-    with open(args.out_timestamps, "w", encoding="utf-8") as f:
-        json.dump(token_to_ts, f, indent=2)
+    if len(scenes) != 1:
+        raise SystemExit(f"{len(scenes)} scenes selected; use --out-dir for more than one")
+    scene = scenes[0]
+    sample_tokens, token_to_ts = tables.trace(scene)
+    write_json(Path(args.out_tokens), {"version": args.version, "scene_name": scene["name"], "sample_tokens": sample_tokens})
+    write_json(Path(args.out_timestamps), token_to_ts)
 
-    print(f"Wrote {len(sample_tokens)} ordered tokens for {args.scene_name}")
+    print(f"Wrote {len(sample_tokens)} ordered tokens for {scene['name']}")
     print(f"tokens: {args.out_tokens}")
     print(f"timestamps: {args.out_timestamps}")
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Time the auction assignment solver against SciPy on synthetic gated cost matrices.
+
+Each frame moves ``--tracks`` targets at constant velocity over a square of
+``--area`` metres, drops 10% of their detections and adds 5% clutter. Pairs
+farther apart than the 2 m gate get the tracker's 1e6 fill, as in association.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from cam3d_tracker.assignment import INVALID_COST, AuctionAssignment
+
+
+def make_frames(n_tracks: int, area_m: float, n_frames: int, seed: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0.0, area_m, (n_tracks, 2))
+    vel = rng.normal(0.0, 3.0, (n_tracks, 2))
+    frames = []
+    for k in range(n_frames):
+        p = pos + vel * 0.5 * k
+        seen = rng.uniform(size=n_tracks) > 0.1
+        dets = p[seen] + rng.normal(0.0, 0.3, (int(seen.sum()), 2))
+        dets = np.vstack([dets, rng.uniform(0.0, area_m, (n_tracks // 20, 2))])
+        dist = np.linalg.norm(p[:, None, :] - dets[None, :, :], axis=2)
+        frames.append(np.where(dist < 2.0, 0.275 * dist + 0.2 * rng.uniform(size=dist.shape), 1e6))
+    return frames
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--tracks", type=int, default=1000)
+    p.add_argument("--area", type=float, default=200.0, help="Side of the square scene (m)")
+    p.add_argument("--frames", type=int, default=20)
+    p.add_argument("--epsilon", type=float, default=1e-3)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    frames = make_frames(args.tracks, args.area, args.frames, args.seed)
+    cold = AuctionAssignment(args.epsilon)
+    warm = AuctionAssignment(args.epsilon, warm_start=True)
+    # The first call compiles the Numba kernel; keep it out of the timings.
+    cold.solve(frames[0])
+
+    t_scipy = t_cold = t_warm = 0.0
+    prices = None
+    gap = 0.0
+    for cost in frames:
+        t = time.perf_counter()
+        row, col = linear_sum_assignment(cost)
+        t_scipy += time.perf_counter() - t
+        gated = cost[row, col] < INVALID_COST
+
+        t = time.perf_counter()
+        a_row, a_col, _ = cold.solve(cost)
+        t_cold += time.perf_counter() - t
+
+        t = time.perf_counter()
+        _, _, prices = warm.solve(cost, prices)
+        t_warm += time.perf_counter() - t
+
+        if len(a_row) != int(gated.sum()):
+            raise SystemExit(f"auction matched {len(a_row)} gated pairs, SciPy {int(gated.sum())}")
+        gap = max(gap, float(cost[a_row, a_col].sum() - cost[row, col][gated].sum()))
+
+    ms = 1000.0 / len(frames)
+    print(f"{args.tracks} tracks, {len(frames)} frames")
+    print(f"  scipy           {t_scipy * ms:8.2f} ms/frame")
+    print(f"  auction (cold)  {t_cold * ms:8.2f} ms/frame")
+    print(f"  auction (warm)  {t_warm * ms:8.2f} ms/frame")
+    print(f"  worst cost gap  {gap:.2e} (bound n * epsilon = {args.tracks * args.epsilon:.2e})")
+
+
+if __name__ == "__main__":
+    main()
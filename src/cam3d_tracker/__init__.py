@@ -1,5 +1,12 @@
 """Classical 3D tracker package."""
 
-from .pipeline import run_tracking
-
 __all__ = ["run_tracking"]
+
+
+def __getattr__(name: str):
+    # Resolved on first use so `import cam3d_tracker` (and CLI --help) stays cheap.
+    if name == "run_tracking":
+        from .pipeline import run_tracking
+
+        return run_tracking
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
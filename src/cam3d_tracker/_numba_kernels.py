@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from numba import njit
+
+from .kernels import H_IDX, MEAS_DIM, STATE_DIM, KernelBackend
+
+PI = math.pi
+TWO_PI = 2.0 * math.pi
+_H_IDX = H_IDX.copy()
+
+
+@njit(cache=True)
+def wrap_angle(theta):
+    if theta > PI or theta < -PI:
+        wrapped = np.fmod(theta + PI, TWO_PI)
+        if wrapped < 0.0:
+            wrapped += TWO_PI
+        wrapped -= PI
+        if wrapped == -PI and theta > 0.0:
+            wrapped = PI
+        return wrapped
+    return theta
+
+
+@njit(cache=True)
+def _f(mode, x, dt):
+    xn = x.copy()
+    px = x[0]
+    py = x[1]
+    v = x[3]
+    yaw = x[4]
+    yaw_rate = x[5]
+    if mode == 0:
+        xn[0] = px + v * dt * math.cos(yaw)
+        xn[1] = py + v * dt * math.sin(yaw)
+        xn[4] = wrap_angle(yaw)
+        xn[5] = 0.95 * yaw_rate
+    else:
+        if abs(yaw_rate) > 1e-4:
+            xn[0] = px + (v / yaw_rate) * (math.sin(yaw + yaw_rate * dt) - math.sin(yaw))
+            xn[1] = py - (v / yaw_rate) * (math.cos(yaw + yaw_rate * dt) - math.cos(yaw))
+        else:
+            xn[0] = px + v * dt * math.cos(yaw)
+            xn[1] = py + v * dt * math.sin(yaw)
+        xn[4] = wrap_angle(yaw + yaw_rate * dt)
+    xn[6] = max(0.05, x[6])
+    xn[7] = max(0.05, x[7])
+    xn[8] = max(0.05, x[8])
+    return xn
+
+
+@njit(cache=True)
+def _jacobian(mode, x, dt):
+    eps = 1e-4
+    y0 = _f(mode, x, dt)
+    j = np.zeros((STATE_DIM, STATE_DIM))
+    for i in range(STATE_DIM):
+        xp = x.copy()
+        xp[i] += eps
+        yp = _f(mode, xp, dt)
+        for k in range(STATE_DIM):
+            j[k, i] = (yp[k] - y0[k]) / eps
+    return j
+
+
+@njit(cache=True)
+def _outer_accumulate(out, weight, p, dx):
+    for a in range(STATE_DIM):
+        for b in range(STATE_DIM):
+            out[a, b] += weight * (p[a, b] + dx[a] * dx[b])
+
+
+@njit(cache=True)
+def mix(x_models, p_models, mu, transition):
+    c_j = transition.T @ mu
+    for j in range(2):
+        c_j[j] = max(c_j[j], 1e-12)
+    mixed_x = np.empty_like(x_models)
+    mixed_p = np.zeros_like(p_models)
+    for j in range(2):
+        w0 = transition[0, j] * mu[0] / c_j[j]
+        w1 = transition[1, j] * mu[1] / c_j[j]
+        xj = w0 * x_models[0] + w1 * x_models[1]
+        for i in range(2):
+            dx = x_models[i] - xj
+            dx[4] = wrap_angle(x_models[i, 4] - xj[4])
+            _outer_accumulate(mixed_p[j], w0 if i == 0 else w1, p_models[i], dx)
+        mixed_x[j] = xj
+    return mixed_x, mixed_p, c_j
+
+
+@njit(cache=True)
+def predict_models(mixed_x, mixed_p, dt, q_cv, q_ctrv):
+    x_pred = np.empty_like(mixed_x)
+    p_pred = np.empty_like(mixed_p)
+    for j in range(2):
+        x_pred[j] = _f(j, mixed_x[j], dt)
+        fj = _jacobian(j, mixed_x[j], dt)
+        q = q_cv if j == 0 else q_ctrv
+        p_pred[j] = fj @ mixed_p[j] @ fj.T + q
+    return x_pred, p_pred
+
+
+@njit(cache=True)
+def _select(p, r):
+    ph = np.empty((STATE_DIM, MEAS_DIM))
+    for a in range(STATE_DIM):
+        for b in range(MEAS_DIM):
+            ph[a, b] = p[a, _H_IDX[b]]
+    s = np.empty((MEAS_DIM, MEAS_DIM))
+    for a in range(MEAS_DIM):
+        for b in range(MEAS_DIM):
+            s[a, b] = ph[_H_IDX[a], b] + r[a, b]
+    return ph, 0.5 * (s + s.T)
+
+
+@njit(cache=True)
+def mode_gains(x_models, p_models, r):
+    z_hat = np.empty((2, MEAS_DIM))
+    s_inv = np.empty((2, MEAS_DIM, MEAS_DIM))
+    gains = np.empty((2, STATE_DIM, MEAS_DIM))
+    p_post = np.empty_like(p_models)
+    log_norm = np.empty(2)
+    for j in range(2):
+        for a in range(MEAS_DIM):
+            z_hat[j, a] = x_models[j, _H_IDX[a]]
+        z_hat[j, 3] = wrap_angle(z_hat[j, 3])
+        ph, s = _select(p_models[j], r)
+        s_inv[j] = np.linalg.inv(s)
+        gains[j] = ph @ s_inv[j]
+        pu = p_models[j] - gains[j] @ ph.T
+        p_post[j] = 0.5 * (pu + pu.T)
+        det_s = max(np.linalg.det(s), 1e-12)
+        log_norm[j] = -0.5 * (math.log(det_s) + MEAS_DIM * math.log(2.0 * PI))
+    return z_hat, s_inv, gains, p_post, log_norm
+
+
+@njit(cache=True)
+def fuse(x_models, p_models, mu):
+    xf = mu[0] * x_models[0] + mu[1] * x_models[1]
+    pf = np.zeros((STATE_DIM, STATE_DIM))
+    for i in range(2):
+        dx = x_models[i] - xf
+        dx[4] = wrap_angle(x_models[i, 4] - xf[4])
+        _outer_accumulate(pf, mu[i], p_models[i], dx)
+    xf[4] = wrap_angle(xf[4])
+    return xf, 0.5 * (pf + pf.T)
+
+
+@njit(cache=True)
+def gate_factors(x, p, r):
+    z_hat = np.empty(MEAS_DIM)
+    for a in range(MEAS_DIM):
+        z_hat[a] = x[_H_IDX[a]]
+    z_hat[3] = wrap_angle(z_hat[3])
+    _, s = _select(p, r)
+    return z_hat, np.linalg.inv(s)
+
+
+@njit(cache=True)
+def _corners(x, y, yaw, l, w):
+    c = math.cos(yaw)
+    s = math.sin(yaw)
+    dx = l / 2.0
+    dy = w / 2.0
+    # Counter-clockwise, as the clipping in bev_iou expects (_inside keeps the left side of each edge).
+    local = np.array([[dx, dy], [-dx, dy], [-dx, -dy], [dx, -dy]])
+    out = np.empty((4, 2))
+    for i in range(4):
+        out[i, 0] = local[i, 0] * c - local[i, 1] * s + x
+        out[i, 1] = local[i, 0] * s + local[i, 1] * c + y
+    return out
+
+
+@njit(cache=True)
+def _area(poly, n):
+    if n < 3:
+        return 0.0
+    a = 0.0
+    b = 0.0
+    for i in range(n):
+        k = (i + 1) % n
+        a += poly[i, 0] * poly[k, 1]
+        b += poly[i, 1] * poly[k, 0]
+    return 0.5 * abs(a - b)
+
+
+@njit(cache=True)
+def _inside(px, py, sx, sy, ex, ey):
+    return (ex - sx) * (py - sy) - (ey - sy) * (px - sx) >= 0.0
+
+
+@njit(cache=True)
+def _intersect(out, m, s, e, cp1, cp2):
+    dcx = cp1[0] - cp2[0]
+    dcy = cp1[1] - cp2[1]
+    dpx = s[0] - e[0]
+    dpy = s[1] - e[1]
+    n1 = cp1[0] * cp2[1] - cp1[1] * cp2[0]
+    n2 = s[0] * e[1] - s[1] * e[0]
+    denom = dcx * dpy - dcy * dpx
+    if abs(denom) < 1e-9:
+        out[m, 0] = e[0]
+        out[m, 1] = e[1]
+    else:
+        out[m, 0] = (n1 * dpx - n2 * dcx) / denom
+        out[m, 1] = (n1 * dpy - n2 * dcy) / denom
+
+
+@njit(cache=True)
+def bev_iou(box_a, box_b):
+    pa = _corners(box_a[0], box_a[1], box_a[4], box_a[6], box_a[7])
+    pb = _corners(box_b[0], box_b[1], box_b[4], box_b[6], box_b[7])
+    cur = np.empty((16, 2))
+    nxt = np.empty((16, 2))
+    cur[:4] = pa
+    n = 4
+    cp1 = pb[3]
+    for c in range(4):
+        cp2 = pb[c]
+        if n == 0:
+            return 0.0
+        m = 0
+        s = cur[n - 1].copy()
+        for k in range(n):
+            e = cur[k]
+            e_in = _inside(e[0], e[1], cp1[0], cp1[1], cp2[0], cp2[1])
+            s_in = _inside(s[0], s[1], cp1[0], cp1[1], cp2[0], cp2[1])
+            if e_in:
+                if not s_in:
+                    _intersect(nxt, m, s, e, cp1, cp2)
+                    m += 1
+                nxt[m] = e
+                m += 1
+            elif s_in:
+                _intersect(nxt, m, s, e, cp1, cp2)
+                m += 1
+            s = e.copy()
+        cur, nxt = nxt, cur
+        n = m
+        cp1 = cp2
+    inter = _area(cur, n)
+    if inter <= 0.0:
+        return 0.0
+    ua = _area(pa, 4) + _area(pb, 4) - inter
+    if ua <= 1e-9:
+        return 0.0
+    return inter / ua
+
+
+def build_backend() -> KernelBackend:
+    return KernelBackend(
+        name="numba",
+        wrap_angle=wrap_angle,
+        mix=mix,
+        predict_models=predict_models,
+        mode_gains=mode_gains,
+        fuse=fuse,
+        gate_factors=gate_factors,
+        bev_iou=bev_iou,
+    )
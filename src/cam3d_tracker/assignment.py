@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import numpy as np
+
+from .kernels import numba_available
+
+ASSIGNMENT_SOLVERS = ("scipy", "auction")
+# Cost entries at or above this are gated-out pairs (the tracker fills them with 1e6).
+INVALID_COST = 1e5
+
+_UNASSIGNED = -1
+_DUMMY = -2
+
+
+def _auction_core(
+    indptr: np.ndarray,
+    objects: np.ndarray,
+    benefit: np.ndarray,
+    obj_indptr: np.ndarray,
+    obj_edges: np.ndarray,
+    bidders: np.ndarray,
+    prices: np.ndarray,
+    eps: float,
+    max_bids: int,
+) -> tuple[np.ndarray, bool]:
+    """Forward/reverse auction for a maximum-weight matching on a sparse bipartite graph.
+
+    Bidder ``i`` (a detection) values object ``objects[e]`` (a track) at
+    ``benefit[e]`` for ``e`` in ``indptr[i]:indptr[i + 1]`` and may instead
+    take a private dummy worth 0. ``obj_indptr``/``obj_edges`` list the same
+    edges per object and ``bidders[e]`` is an edge's bidder.
+
+    Forward bids place every bidder within ``eps`` of its best option. Objects
+    then left unheld at a positive price (only possible with warm ``prices``)
+    bid in reverse, lowering their price just enough to pull a bidder over,
+    until every unheld object is free. ``prices`` are updated in place.
+    Returns each bidder's object (negative for none) and whether the auction
+    finished within ``max_bids`` bids.
+    """
+    n_bidders = len(indptr) - 1
+    n_objects = len(prices)
+    assigned = np.full(n_bidders, _UNASSIGNED, dtype=np.int64)
+    profit = np.zeros(n_bidders)
+    owner = np.full(n_objects, _UNASSIGNED, dtype=np.int64)
+    stack = np.empty(max(n_bidders, n_objects), dtype=np.int64)
+    top = 0
+    for i in range(n_bidders - 1, -1, -1):
+        stack[top] = i
+        top += 1
+
+    bids = 0
+    while top > 0:
+        bids += 1
+        if bids > max_bids:
+            return assigned, False
+        top -= 1
+        i = stack[top]
+        best_j = -1
+        v1 = -np.inf
+        v2 = -np.inf
+        for e in range(indptr[i], indptr[i + 1]):
+            v = benefit[e] - prices[objects[e]]
+            if v > v1:
+                v2 = v1
+                v1 = v
+                best_j = objects[e]
+            elif v > v2:
+                v2 = v
+        if best_j < 0 or v1 < -eps:
+            assigned[i] = _DUMMY
+            profit[i] = 0.0
+            continue
+        # The dummy (worth 0) is always the fallback option.
+        v2 = max(v2, 0.0)
+        prices[best_j] += v1 - v2 + eps
+        prev = owner[best_j]
+        if prev >= 0:
+            assigned[prev] = _UNASSIGNED
+            stack[top] = prev
+            top += 1
+        owner[best_j] = i
+        assigned[i] = best_j
+        profit[i] = v2 - eps
+
+    # Every bidder is placed; a priced object nobody holds bids for a bidder or drops to 0.
+    for j in range(n_objects):
+        if owner[j] < 0 and prices[j] > 0.0:
+            stack[top] = j
+            top += 1
+    while top > 0:
+        bids += 1
+        if bids > max_bids:
+            return assigned, False
+        top -= 1
+        j = stack[top]
+        best_e = -1
+        b1 = -np.inf
+        b2 = -np.inf
+        for k in range(obj_indptr[j], obj_indptr[j + 1]):
+            e = obj_edges[k]
+            b = benefit[e] - profit[bidders[e]]
+            if b > b1:
+                b2 = b1
+                b1 = b
+                best_e = e
+            elif b > b2:
+                b2 = b
+        if best_e < 0 or b1 <= eps:
+            prices[j] = 0.0
+            continue
+        prices[j] = max(0.0, b2 - eps)
+        i = bidders[best_e]
+        old = assigned[i]
+        assigned[i] = j
+        owner[j] = i
+        profit[i] = benefit[best_e] - prices[j]
+        if old >= 0:
+            owner[old] = _UNASSIGNED
+            if prices[old] > 0.0:
+                stack[top] = old
+                top += 1
+    return assigned, True
+
+
+_AUCTION: dict[str, Callable] = {}
+
+
+def _auction_fn() -> Callable:
+    fn = _AUCTION.get("fn")
+    if fn is None:
+        if numba_available():
+            from numba import njit
+
+            fn = njit(cache=True)(_auction_core)
+        else:
+            fn = _auction_core
+        _AUCTION["fn"] = fn
+    return fn
+
+
+_SCIPY: dict[str, Callable] = {}
+
+
+def _linear_sum_assignment() -> Callable:
+    fn = _SCIPY.get("linear_sum_assignment")
+    if fn is None:
+        from scipy.optimize import linear_sum_assignment
+
+        fn = _SCIPY["linear_sum_assignment"] = linear_sum_assignment
+    return fn
+
+
+class ScipyAssignment:
+    """Exact Hungarian-style assignment (``scipy.optimize.linear_sum_assignment``), solved from scratch."""
+
+    warm_start = False
+
+    def solve(
+        self, cost: np.ndarray, row_prices: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+        row_ind, col_ind = _linear_sum_assignment()(cost)
+        return row_ind, col_ind, None
+
+
+class AuctionAssignment:
+    """Epsilon-optimal forward/reverse auction on the gated pairs only.
+
+    Tracks (rows) are the auctioned objects and detections (columns) bid only
+    on their gated tracks. The matching maximizes the number of gated pairs
+    first, then comes within ``n * epsilon`` of the minimum total cost; a
+    larger ``epsilon`` stops the bidding earlier. With ``warm_start`` the
+    caller passes the track prices returned for the previous frame. Only the
+    prices carry over, not the previous matching: detections are new columns
+    every frame, so there is no earlier assignment to start from and every
+    bidder starts unassigned. Frames that exceed ``bid_budget`` bids per edge
+    are re-solved from zero prices, and as a last resort by SciPy.
+    """
+
+    def __init__(self, epsilon: float = 1e-3, warm_start: bool = False, bid_budget: int = 64) -> None:
+        if epsilon <= 0.0:
+            raise ValueError("association.auction_epsilon must be > 0")
+        self.epsilon = float(epsilon)
+        self.warm_start = bool(warm_start)
+        self.bid_budget = int(bid_budget)
+
+    def solve(
+        self, cost: np.ndarray, row_prices: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+        n_rows, n_cols = cost.shape
+        cols, rows = np.nonzero(cost.T < INVALID_COST)
+        if rows.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.zeros(n_rows)
+
+        c = cost[rows, cols]
+        # Worth more than any cost trade-off, so an extra gated pair always wins, as with the 1e6 fill.
+        benefit = (min(n_rows, n_cols) + 1) * max(1.0, float(c.max())) - c
+        rows = rows.astype(np.int64)
+        cols = cols.astype(np.int64)
+        indptr = np.zeros(n_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=n_cols), out=indptr[1:])
+        obj_indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=obj_indptr[1:])
+        obj_edges = np.argsort(rows, kind="stable")
+        max_bids = self.bid_budget * (len(rows) + n_cols)
+
+        auction = _auction_fn()
+        edges = (indptr, rows, benefit, obj_indptr, obj_edges, cols)
+        settled = False
+        if row_prices is not None:
+            prices = np.maximum(np.asarray(row_prices, dtype=float), 0.0)
+            assigned, settled = auction(*edges, prices, self.epsilon, max_bids)
+        if not settled:
+            prices = np.zeros(n_rows)
+            assigned, settled = auction(*edges, prices, self.epsilon, max_bids)
+        if not settled:
+            # Pathological price war: solve this frame exactly instead.
+            row_ind, col_ind, _ = ScipyAssignment().solve(cost)
+            keep = cost[row_ind, col_ind] < INVALID_COST
+            return row_ind[keep], col_ind[keep], np.zeros(n_rows)
+        col_ind = np.flatnonzero(assigned >= 0)
+        row_ind = assigned[col_ind]
+        order = np.argsort(row_ind)
+        return row_ind[order], col_ind[order], prices
+
+
+def make_assignment_solver(assoc_cfg: dict[str, Any]) -> ScipyAssignment | AuctionAssignment:
+    name = str(assoc_cfg.get("solver", "scipy"))
+    if name == "scipy":
+        return ScipyAssignment()
+    if name == "auction":
+        return AuctionAssignment(
+            epsilon=float(assoc_cfg.get("auction_epsilon", 1e-3)),
+            warm_start=bool(assoc_cfg.get("auction_warm_start", False)),
+            bid_budget=int(assoc_cfg.get("auction_bid_budget", 64)),
+        )
+    raise ValueError(f"Unknown association.solver '{name}'. Use one of {ASSIGNMENT_SOLVERS}")
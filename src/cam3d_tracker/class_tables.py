@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import numpy as np
+
+from .imm_ekf import MEAS_DIM
+
+
+class ClassTables:
+    """Per-class tracker parameters compiled into arrays indexed by label code.
+
+    Labels listed in the config are interned when the tracker is built; labels
+    first seen at runtime are appended with the ``default`` entries.
+    """
+
+    def __init__(self, cfg: dict[str, Any]) -> None:
+        tracker_cfg = cfg["tracker"]
+        self._max_age_map = tracker_cfg["max_age_s"]
+        self._min_hits_map = tracker_cfg["min_hits"]
+        self._meas_map = cfg["noise"]["meas_by_class"]
+
+        self.names: list[str] = []
+        self.codes: dict[str, int] = {}
+        self.meas_cov = np.empty((0, MEAS_DIM, MEAS_DIM), dtype=float)
+        self.meas_chol = np.empty((0, MEAS_DIM, MEAS_DIM), dtype=float)
+        self.max_age_s = np.empty(0, dtype=float)
+        self.min_hits = np.empty(0, dtype=np.int64)
+
+        known = list(cfg.get("classes", []))
+        for table in (self._max_age_map, self._min_hits_map, self._meas_map):
+            known.extend(k for k in table if k != "default")
+        for label in known:
+            self.intern(label)
+
+    def intern(self, label: str) -> int:
+        code = self.codes.get(label)
+        if code is not None:
+            return code
+        code = len(self.names)
+        self.names.append(label)
+        self.codes[label] = code
+
+        sigma = np.array(self._meas_map.get(label, self._meas_map["default"]), dtype=float)
+        r = np.diag(sigma**2)
+        self.meas_cov = np.concatenate([self.meas_cov, r[None]])
+        self.meas_chol = np.concatenate([self.meas_chol, np.diag(np.abs(sigma))[None]])
+        max_age = float(self._max_age_map.get(label, self._max_age_map["default"]))
+        self.max_age_s = np.append(self.max_age_s, max_age)
+        min_hits = int(self._min_hits_map.get(label, self._min_hits_map["default"]))
+        self.min_hits = np.append(self.min_hits, min_hits)
+        return code
+
+    def codes_for(self, names: Sequence[str]) -> np.ndarray:
+        return np.array([self.intern(n) for n in names], dtype=np.int64)
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 import argparse
 
-from .pipeline import run_tracking
-
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Classical camera-based 3D MOT")
@@ -15,6 +13,8 @@ def build_parser() -> argparse.ArgumentParser:
 
 def main() -> None:
     args = build_parser().parse_args()
+    from .pipeline import run_tracking
+
     run_tracking(args.config, args.detections, args.output)
 
 
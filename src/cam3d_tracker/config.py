@@ -1,11 +1,10 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 
 @dataclass
 class TrackerConfig:
@@ -28,7 +27,19 @@ class TrackerConfig:
         return self.raw["imm"]
 
 
-def load_config(path: str | Path) -> TrackerConfig:
+def load_mapping(path: str | Path) -> Any:
+    """Parse a YAML or JSON config file.
+
+    ``.json`` files skip PyYAML entirely; YAML uses the libyaml C loader when
+    PyYAML was built with it.
+    """
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    return TrackerConfig(raw=data)
+        if Path(path).suffix == ".json":
+            return json.load(f)
+        import yaml
+
+        return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def load_config(path: str | Path) -> TrackerConfig:
+    return TrackerConfig(raw=load_mapping(path))
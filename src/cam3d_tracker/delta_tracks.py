@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from .models import TRACK_STATUSES, TrackOutput, TrackOutputBatch
+
+DELTA_SCHEMA = "cam3d_tracks_delta_v1"
+DYNAMIC_FIELDS = ("x", "y", "z", "v", "yaw", "yaw_rate", "l", "w", "h", "score", "age_s", "hits", "status")
+STATUSES = TRACK_STATUSES
+DEFAULT_PRECISION = {"default": 0.01, "yaw": 0.001, "yaw_rate": 0.001, "score": 0.001, "age_s": 0.001}
+# Counters and enums are stored exactly.
+_EXACT_FIELDS = ("hits", "status")
+_FULL_MASK = (1 << len(DYNAMIC_FIELDS)) - 1
+
+
+def _steps(precision: dict[str, float] | None) -> np.ndarray:
+    table = dict(DEFAULT_PRECISION, **(precision or {}))
+    steps = [1.0 if f in _EXACT_FIELDS else float(table.get(f, table["default"])) for f in DYNAMIC_FIELDS]
+    if min(steps) <= 0.0:
+        raise ValueError("Delta output precision steps must be > 0")
+    return np.array(steps, dtype=float)
+
+
+class DeltaTrackEncoder:
+    """Compact track output: static fields once per track, then per-frame changes only.
+
+    Dynamic fields are quantized to integer multiples of their precision step
+    and a row is written only for tracks whose quantized state changed, as
+    ``[track_id, changed_field_bitmask, *changed_values]``. Each frame lists
+    the tracks that appeared (``born``) and disappeared (``died``) in it.
+    """
+
+    def __init__(self, precision: dict[str, float] | None = None) -> None:
+        self.steps = _steps(precision)
+        self._bits = np.left_shift(1, np.arange(len(DYNAMIC_FIELDS), dtype=np.int64))
+        self.tracks: dict[str, dict[str, Any]] = {}
+        self.frames: list[dict[str, Any]] = []
+        self._last: dict[int, np.ndarray] = {}
+
+    def add(
+        self,
+        timestamp_s: float,
+        outputs: TrackOutputBatch | Sequence[TrackOutput],
+        sample_token: str | None = None,
+    ) -> None:
+        batch = outputs if isinstance(outputs, TrackOutputBatch) else TrackOutputBatch.from_outputs(outputs)
+        values = np.column_stack([batch.states, batch.scores, batch.age_s, batch.hits, batch.status_codes])
+        self._add(timestamp_s, batch.track_ids.tolist(), batch.labels(), values, sample_token)
+
+    def add_rows(self, timestamp_s: float, rows: Sequence[dict[str, Any]], sample_token: str | None = None) -> None:
+        """Same as ``add`` for ``TrackOutput.to_dict`` rows."""
+        values = np.array(
+            [[STATUSES.index(r[f]) if f == "status" else r[f] for f in DYNAMIC_FIELDS] for r in rows], dtype=float
+        ).reshape(-1, len(DYNAMIC_FIELDS))
+        self._add(timestamp_s, [int(r["track_id"]) for r in rows], [r["label"] for r in rows], values, sample_token)
+
+    def _add(
+        self,
+        timestamp_s: float,
+        track_ids: list[int],
+        labels: list[str],
+        values: np.ndarray,
+        sample_token: str | None,
+    ) -> None:
+        q = np.rint(values / self.steps).astype(np.int64)
+        born: list[int] = []
+        rows: list[list[int]] = []
+        for k, tid in enumerate(track_ids):
+            prev = self._last.get(tid)
+            if prev is None:
+                born.append(tid)
+                self.tracks[str(tid)] = {"label": labels[k]}
+                rows.append([tid, _FULL_MASK, *q[k].tolist()])
+            else:
+                changed = q[k] != prev
+                if not changed.any():
+                    continue
+                rows.append([tid, int(self._bits[changed].sum()), *q[k][changed].tolist()])
+            self._last[tid] = q[k]
+
+        current = set(track_ids)
+        died = sorted(tid for tid in self._last if tid not in current)
+        for tid in died:
+            del self._last[tid]
+
+        frame: dict[str, Any] = {"t": float(timestamp_s), "born": born, "died": died, "rows": rows}
+        if sample_token is not None:
+            frame["sample_token"] = sample_token
+        self.frames.append(frame)
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "schema": DELTA_SCHEMA,
+            "fields": list(DYNAMIC_FIELDS),
+            "precision": self.steps.tolist(),
+            "statuses": list(STATUSES),
+            "tracks": self.tracks,
+            "frames": self.frames,
+        }
+
+
+def encode_rows(rows: Iterable[dict[str, Any]], precision: dict[str, float] | None = None) -> dict[str, Any]:
+    """Delta payload for flat track rows; consecutive rows with the same timestamp form one frame."""
+    enc = DeltaTrackEncoder(precision)
+    frame_rows: list[dict[str, Any]] = []
+    for row in rows:
+        if frame_rows and row["timestamp_s"] != frame_rows[0]["timestamp_s"]:
+            enc.add_rows(frame_rows[0]["timestamp_s"], frame_rows, frame_rows[0].get("sample_token"))
+            frame_rows = []
+        frame_rows.append(row)
+    if frame_rows:
+        enc.add_rows(frame_rows[0]["timestamp_s"], frame_rows, frame_rows[0].get("sample_token"))
+    return enc.payload()
+
+
+def decode_delta_tracks(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Rebuild the flat per-frame rows (``TrackOutput.to_dict`` plus ``timestamp_s``) from a delta payload.
+
+    Tracks that did not change in a frame are still emitted for it, so the
+    result lines up with the full row output up to the quantization step.
+    """
+    if payload.get("schema") != DELTA_SCHEMA:
+        raise ValueError(f"Not a {DELTA_SCHEMA} payload")
+    fields = payload["fields"]
+    steps = np.asarray(payload["precision"], dtype=float)
+    statuses = payload["statuses"]
+    labels = {int(k): v["label"] for k, v in payload["tracks"].items()}
+    i_status = fields.index("status")
+    i_hits = fields.index("hits")
+    mask_fields: dict[int, list[int]] = {}
+
+    live: dict[int, np.ndarray] = {}
+    out: list[dict[str, Any]] = []
+    for frame in payload["frames"]:
+        for tid in frame["died"]:
+            live.pop(tid, None)
+        for tid, mask, *vals in frame["rows"]:
+            q = live.get(tid)
+            if q is None:
+                q = live[tid] = np.zeros(len(fields), dtype=np.int64)
+            idx = mask_fields.get(mask)
+            if idx is None:
+                idx = mask_fields[mask] = [i for i in range(len(fields)) if mask >> i & 1]
+            q[idx] = vals
+        for tid in sorted(live):
+            q = live[tid]
+            v = (q * steps).tolist()
+            row: dict[str, Any] = {"track_id": tid, "label": labels[tid], "score": v[fields.index("score")]}
+            for i, name in enumerate(fields):
+                if i == i_status:
+                    row[name] = statuses[int(q[i])]
+                elif i == i_hits:
+                    row[name] = int(q[i])
+                elif name != "score":
+                    row[name] = v[i]
+            row["timestamp_s"] = frame["t"]
+            if "sample_token" in frame:
+                row["sample_token"] = frame["sample_token"]
+            out.append(row)
+    return out
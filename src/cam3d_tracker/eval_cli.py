@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Evaluate tracks against nuScenes GT (AMOTA/MOTA/IDF1)")
+    p.add_argument("--tracks", required=True, help="Tracks JSON written by track3d / track3d-nuscenes")
+    p.add_argument("--gt", nargs="+", help="GT results JSON(s) from build_gt_detection_results.py")
+    p.add_argument("--index", help="index.json of build_gt_detection_results.py --out-dir (replaces --gt/--scene-tokens/--timestamps)")
+    p.add_argument("--scene-tokens", nargs="+", help="Scene token JSON(s); default: one scene per GT file")
+    p.add_argument("--timestamps", nargs="+", help="Token->timestamp JSON(s) for tracks without sample_token")
+    p.add_argument("--classes", nargs="+", help="Classes to evaluate (default: the nuScenes tracking classes)")
+    p.add_argument("--statuses", nargs="+", help="Only evaluate tracks with these statuses")
+    p.add_argument("--dist-th", type=float, default=2.0, help="BEV center distance match threshold (m)")
+    p.add_argument("--num-thresholds", type=int, default=40)
+    p.add_argument("--min-recall", type=float, default=0.1)
+    p.add_argument("--workers", type=int, default=1, help="Processes used to evaluate scenes")
+    p.add_argument("--output", help="Optional metrics JSON path")
+    return p
+
+
+def _apply_index(args: argparse.Namespace) -> None:
+    base = Path(args.index).parent
+    with open(args.index, "r", encoding="utf-8") as f:
+        scenes = [e for e in json.load(f)["scenes"].values() if "gt_results" in e]
+    args.gt = [str(base / e["gt_results"]) for e in scenes]
+    args.scene_tokens = [str(base / e["tokens"]) for e in scenes]
+    args.timestamps = [str(base / e["timestamps"]) for e in scenes]
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.index:
+        _apply_index(args)
+    if not args.gt:
+        parser.error("give --gt or --index")
+    # Imported after parsing so --help does not load numpy and scipy.
+    from .evaluation import TRACKING_CLASSES, build_scenes, evaluate_tracking
+
+    scenes = build_scenes(
+        args.gt,
+        args.tracks,
+        scene_tokens=args.scene_tokens,
+        timestamps=args.timestamps,
+        classes=args.classes or TRACKING_CLASSES,
+        statuses=args.statuses,
+    )
+    metrics = evaluate_tracking(
+        scenes,
+        dist_th=args.dist_th,
+        num_thresholds=args.num_thresholds,
+        min_recall=args.min_recall,
+        workers=args.workers,
+    )
+
+    o = metrics["overall"]
+    print(f"Scenes: {len(scenes)}")
+    print(f"AMOTA {o['amota']:.4f}  MOTA {o['mota']:.4f}  IDF1 {o['idf1']:.4f}  IDS {o['ids']}  MOTP {o['motp']:.3f}")
+    for label, m in metrics["classes"].items():
+        print(f"  {label:<12} AMOTA {m['amota']:.4f}  MOTA {m['mota']:.4f}  IDF1 {m['idf1']:.4f}  IDS {m['ids']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2)
+        print(f"Wrote: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
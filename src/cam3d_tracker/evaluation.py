@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .io_utils import load_tracks
+
+# nuScenes tracking classes.
+TRACKING_CLASSES = ("car", "truck", "bus", "trailer", "pedestrian", "motorcycle", "bicycle")
+
+
+@dataclass
+class SceneData:
+    """Per-class frame arrays of one scene.
+
+    ``frames[label]`` holds one tuple per sample:
+    (gt_xy (N, 2), gt_ids (N,), trk_xy (M, 2), trk_ids (M,), trk_scores (M,)).
+    """
+
+    name: str
+    frames: dict[str, list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]]
+
+
+@dataclass
+class ClassCounts:
+    num_gt: int = 0
+    num_pred: int = 0
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+    ids: int = 0
+    dist_sum: float = 0.0
+    idtp: int = 0
+    tp_scores: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    def __add__(self, other: ClassCounts) -> ClassCounts:
+        return ClassCounts(
+            num_gt=self.num_gt + other.num_gt,
+            num_pred=self.num_pred + other.num_pred,
+            tp=self.tp + other.tp,
+            fp=self.fp + other.fp,
+            fn=self.fn + other.fn,
+            ids=self.ids + other.ids,
+            dist_sum=self.dist_sum + other.dist_sum,
+            idtp=self.idtp + other.idtp,
+            tp_scores=np.concatenate([self.tp_scores, other.tp_scores]),
+        )
+
+
+def _match_frame(gt_xy: np.ndarray, trk_xy: np.ndarray, dist_th: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hungarian matching on BEV center distance; pairs farther than ``dist_th`` stay unmatched."""
+    if gt_xy.shape[0] == 0 or trk_xy.shape[0] == 0:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty, np.zeros(0)
+    dist = np.linalg.norm(gt_xy[:, None, :] - trk_xy[None, :, :], axis=2)
+    rows, cols = linear_sum_assignment(np.where(dist <= dist_th, dist, 1e6))
+    ok = dist[rows, cols] <= dist_th
+    return rows[ok], cols[ok], dist[rows[ok], cols[ok]]
+
+
+def _count_class(
+    frames: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+    dist_th: float,
+    min_score: float | None = None,
+    identity: bool = False,
+) -> ClassCounts:
+    c = ClassCounts()
+    last_match: dict[int, int] = {}
+    pair_counts: dict[tuple[int, int], int] = {}
+    tp_scores: list[np.ndarray] = []
+
+    for gt_xy, gt_ids, trk_xy, trk_ids, trk_scores in frames:
+        if min_score is not None:
+            keep = trk_scores >= min_score
+            trk_xy, trk_ids, trk_scores = trk_xy[keep], trk_ids[keep], trk_scores[keep]
+        rows, cols, dist = _match_frame(gt_xy, trk_xy, dist_th)
+        c.num_gt += gt_xy.shape[0]
+        c.num_pred += trk_xy.shape[0]
+        c.tp += rows.size
+        c.fp += trk_xy.shape[0] - rows.size
+        c.fn += gt_xy.shape[0] - rows.size
+        c.dist_sum += float(np.sum(dist))
+        tp_scores.append(trk_scores[cols])
+        for g, t in zip(gt_ids[rows].tolist(), trk_ids[cols].tolist()):
+            prev = last_match.get(g)
+            if prev is not None and prev != t:
+                c.ids += 1
+            last_match[g] = t
+
+        if identity and gt_xy.shape[0] and trk_xy.shape[0]:
+            dist_all = np.linalg.norm(gt_xy[:, None, :] - trk_xy[None, :, :], axis=2)
+            gi, ti = np.nonzero(dist_all <= dist_th)
+            for g, t in zip(gt_ids[gi].tolist(), trk_ids[ti].tolist()):
+                pair_counts[(g, t)] = pair_counts.get((g, t), 0) + 1
+
+    c.tp_scores = np.concatenate(tp_scores) if tp_scores else np.zeros(0)
+    if identity and pair_counts:
+        c.idtp = _identity_true_positives(pair_counts)
+    return c
+
+
+def _identity_true_positives(pair_counts: dict[tuple[int, int], int]) -> int:
+    # IDF1 matches whole trajectories: a global one-to-one GT-id <-> track-id
+    # assignment that maximises the number of co-located frames.
+    gts = sorted({g for g, _ in pair_counts})
+    trks = sorted({t for _, t in pair_counts})
+    g_idx = {g: i for i, g in enumerate(gts)}
+    t_idx = {t: i for i, t in enumerate(trks)}
+    weights = np.zeros((len(gts), len(trks)))
+    for (g, t), n in pair_counts.items():
+        weights[g_idx[g], t_idx[t]] = n
+    rows, cols = linear_sum_assignment(-weights)
+    return int(weights[rows, cols].sum())
+
+
+def _evaluate_scene(scene: SceneData, dist_th: float) -> dict[str, ClassCounts]:
+    return {label: _count_class(frames, dist_th, identity=True) for label, frames in scene.frames.items()}
+
+
+def _sweep_scene(scene: SceneData, thresholds: dict[str, np.ndarray], dist_th: float) -> dict[str, list[ClassCounts]]:
+    return {
+        label: [_count_class(scene.frames[label], dist_th, min_score=float(t)) for t in thr]
+        for label, thr in thresholds.items()
+        if label in scene.frames
+    }
+
+
+def _recall_thresholds(tp_scores: np.ndarray, num_gt: int, recalls: np.ndarray) -> np.ndarray:
+    """Score threshold reaching each target recall, NaN where the recall is unreachable."""
+    scores = np.sort(tp_scores)[::-1]
+    need = np.ceil(recalls * num_gt).astype(int)
+    out = np.full(recalls.shape, np.nan)
+    ok = (need >= 1) & (need <= scores.size)
+    out[ok] = scores[need[ok] - 1]
+    return out
+
+
+def _motar(c: ClassCounts) -> float:
+    if c.num_gt == 0 or c.tp == 0:
+        return 0.0
+    recall = c.tp / c.num_gt
+    num = c.fn + c.ids + c.fp - (1.0 - recall) * c.num_gt
+    return max(0.0, 1.0 - num / (recall * c.num_gt))
+
+
+def _map_scenes(func, scenes: list[SceneData], args: tuple, workers: int) -> list:
+    if workers <= 1 or len(scenes) <= 1:
+        return [func(s, *args) for s in scenes]
+    with ProcessPoolExecutor(max_workers=min(workers, len(scenes))) as pool:
+        return list(pool.map(func, scenes, *[[a] * len(scenes) for a in args]))
+
+
+def evaluate_tracking(
+    scenes: list[SceneData],
+    dist_th: float = 2.0,
+    num_thresholds: int = 40,
+    min_recall: float = 0.1,
+    workers: int = 1,
+) -> dict[str, Any]:
+    """MOTA, MOTP, IDF1, ID switches and AMOTA per class and averaged over classes.
+
+    Scenes are counted independently (in parallel when ``workers > 1``) and summed
+    in scene order, so results do not depend on the worker count. AMOTA follows
+    the nuScenes recipe: score thresholds are taken from the matched-track
+    scores at evenly spaced recall targets, and MOTAR is averaged over them.
+    """
+    per_scene = _map_scenes(_evaluate_scene, scenes, (dist_th,), workers)
+    labels = sorted({label for s in scenes for label in s.frames})
+    totals = {label: sum((r[label] for r in per_scene if label in r), ClassCounts()) for label in labels}
+
+    recalls = np.linspace(min_recall, 1.0, num_thresholds)
+    point_thr = {label: _recall_thresholds(totals[label].tp_scores, totals[label].num_gt, recalls) for label in labels}
+    unique_thr = {label: np.unique(t[~np.isnan(t)]) for label, t in point_thr.items()}
+    sweeps = _map_scenes(_sweep_scene, scenes, (unique_thr, dist_th), workers)
+
+    classes: dict[str, dict[str, float]] = {}
+    for label in labels:
+        c = totals[label]
+        swept = [ClassCounts() for _ in unique_thr[label]]
+        for r in sweeps:
+            for k, counts in enumerate(r.get(label, [])):
+                swept[k] = swept[k] + counts
+        motar_by_thr = {float(t): _motar(s) for t, s in zip(unique_thr[label], swept)}
+        motars = [0.0 if math.isnan(t) else motar_by_thr[float(t)] for t in point_thr[label]]
+        classes[label] = {
+            "num_gt": c.num_gt,
+            "num_pred": c.num_pred,
+            "mota": 1.0 - (c.fn + c.fp + c.ids) / c.num_gt if c.num_gt else float("nan"),
+            "motp": c.dist_sum / c.tp if c.tp else float("nan"),
+            "idf1": 2.0 * c.idtp / (c.num_gt + c.num_pred) if (c.num_gt + c.num_pred) else float("nan"),
+            "recall": c.tp / c.num_gt if c.num_gt else float("nan"),
+            "ids": c.ids,
+            "fp": c.fp,
+            "fn": c.fn,
+            "amota": float(np.mean(motars)) if c.num_gt else float("nan"),
+        }
+
+    scored = [m for m in classes.values() if m["num_gt"] > 0]
+    overall: dict[str, float] = {"ids": sum(m["ids"] for m in classes.values())}
+    for key in ("amota", "mota", "motp", "idf1", "recall"):
+        vals = [m[key] for m in scored if not math.isnan(m[key])]
+        overall[key] = float(np.mean(vals)) if vals else float("nan")
+    return {"overall": overall, "classes": classes}
+
+
+def _load_json(path: str | Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ts_key(ts: float) -> int:
+    return int(round(float(ts) * 1e6))
+
+
+def _xy(rows: list[list[float]]) -> np.ndarray:
+    return np.asarray(rows, dtype=float).reshape(-1, 2)
+
+
+def build_scenes(
+    gt_results: list[str | Path],
+    tracks_path: str | Path,
+    scene_tokens: list[str | Path] | None = None,
+    timestamps: list[str | Path] | None = None,
+    classes: Iterable[str] = TRACKING_CLASSES,
+    statuses: Iterable[str] | None = None,
+) -> list[SceneData]:
+    """Group GT annotations and track rows into per-scene, per-class frame arrays.
+
+    ``gt_results`` are files written by ``build_gt_detection_results.py``. Each
+    file is one scene unless ``scene_tokens`` files (``{"scene_name",
+    "sample_tokens"}``) are given. Track rows without ``sample_token`` are
+    mapped to samples through the ``timestamps`` files.
+    """
+    classes = set(classes)
+    statuses = set(statuses) if statuses else None
+
+    gt_by_token: dict[str, list[dict]] = {}
+    scene_lists: list[tuple[str, list[str]]] = []
+    for path in gt_results:
+        results = _load_json(path)["results"]
+        gt_by_token.update(results)
+        if not scene_tokens:
+            scene_lists.append((Path(path).stem, list(results)))
+    for path in scene_tokens or []:
+        data = _load_json(path)
+        scene_lists.append((str(data.get("scene_name", Path(path).stem)), [str(t) for t in data["sample_tokens"]]))
+
+    token_by_ts: dict[int, str] = {}
+    for path in timestamps or []:
+        for token, ts in _load_json(path).items():
+            token_by_ts[_ts_key(ts)] = str(token)
+
+    trk_by_token: dict[str, list[dict]] = {}
+    for row in load_tracks(tracks_path):
+        if statuses is not None and row.get("status") not in statuses:
+            continue
+        token = row.get("sample_token")
+        if token is None and "timestamp_s" in row:
+            token = token_by_ts.get(_ts_key(row["timestamp_s"]))
+        if token is not None:
+            trk_by_token.setdefault(token, []).append(row)
+
+    gt_id_codes: dict[str, int] = {}
+    scenes: list[SceneData] = []
+    for name, tokens in scene_lists:
+        frames: dict[str, list] = {label: [] for label in sorted(classes)}
+        for token in tokens:
+            gts = [a for a in gt_by_token.get(token, []) if a.get("detection_name") in classes]
+            trks = [t for t in trk_by_token.get(token, []) if t.get("label") in classes]
+            for label, out in frames.items():
+                g = [a for a in gts if a["detection_name"] == label]
+                t = [r for r in trks if r["label"] == label]
+                if any("tracking_id" not in a for a in g):
+                    raise ValueError(
+                        "GT annotations need 'tracking_id'; regenerate them with build_gt_detection_results.py"
+                    )
+                out.append(
+                    (
+                        _xy([a["translation"][:2] for a in g]),
+                        np.array([gt_id_codes.setdefault(a["tracking_id"], len(gt_id_codes)) for a in g], dtype=int),
+                        _xy([[r["x"], r["y"]] for r in t]),
+                        np.array([int(r["track_id"]) for r in t], dtype=int),
+                        np.array([float(r["score"]) for r in t], dtype=float),
+                    )
+                )
+        frames = {label: f for label, f in frames.items() if any(x[0].size or x[2].size for x in f)}
+        scenes.append(SceneData(name=name, frames=frames))
+    return scenes
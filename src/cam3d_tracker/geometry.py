@@ -4,7 +4,7 @@ import math
 
 import numpy as np
 
-from .math_utils import angle_diff
+from .math_utils import angle_diff, wrap_angle_array
 
 
 def oriented_box_corners_xy(x: float, y: float, yaw: float, l: float, w: float) -> np.ndarray:
@@ -12,7 +12,8 @@ def oriented_box_corners_xy(x: float, y: float, yaw: float, l: float, w: float)
     s = math.sin(yaw)
     dx = l / 2.0
     dy = w / 2.0
-    local = np.array([[dx, dy], [dx, -dy], [-dx, -dy], [-dx, dy]], dtype=float)
+    # Counter-clockwise, as polygon_clip's inside test expects.
+    local = np.array([[dx, dy], [-dx, dy], [-dx, -dy], [dx, -dy]], dtype=float)
     rot = np.array([[c, -s], [s, c]], dtype=float)
     return (local @ rot.T) + np.array([x, y], dtype=float)
 
@@ -80,3 +81,71 @@ def bev_iou(box_a: np.ndarray, box_b: np.ndarray) -> float:
 
 def yaw_cost(yaw_a: float, yaw_b: float) -> float:
     return min(abs(angle_diff(yaw_a, yaw_b)) / math.pi, 1.0)
+
+
+def yaw_cost_array(yaw_a: float, yaw_b: np.ndarray) -> np.ndarray:
+    return np.minimum(np.abs(wrap_angle_array(yaw_a - yaw_b)) / math.pi, 1.0)
+
+
+def box_corners_xy_batch(xy: np.ndarray, yaw: np.ndarray, l: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """(N, 4, 2) corners, in the same order as ``oriented_box_corners_xy``."""
+    c = np.cos(yaw)[:, None]
+    s = np.sin(yaw)[:, None]
+    lx = np.array([0.5, -0.5, -0.5, 0.5]) * l[:, None]
+    ly = np.array([0.5, 0.5, -0.5, -0.5]) * w[:, None]
+    return np.stack([lx * c - ly * s + xy[:, 0:1], lx * s + ly * c + xy[:, 1:2]], axis=2)
+
+
+def bev_iou_pairs(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """BEV IoU of paired rotated boxes, vectorized over pairs.
+
+    ``boxes_a`` and ``boxes_b`` are (P, 5) rows ``[x, y, yaw, l, w]``. The
+    intersection polygon is built from the corners of each box inside the other
+    plus all edge crossings, ordered by angle around its centroid.
+    """
+    p = boxes_a.shape[0]
+    if p == 0:
+        return np.zeros(0, dtype=float)
+    ca = box_corners_xy_batch(boxes_a[:, :2], boxes_a[:, 2], boxes_a[:, 3], boxes_a[:, 4])
+    cb = box_corners_xy_batch(boxes_b[:, :2], boxes_b[:, 2], boxes_b[:, 3], boxes_b[:, 4])
+
+    def inside(pts: np.ndarray, poly: np.ndarray) -> np.ndarray:
+        # Convex containment: the point is on the same side of all four edges.
+        e0 = poly
+        e1 = np.roll(poly, -1, axis=1)
+        cross = (e1[:, None, :, 0] - e0[:, None, :, 0]) * (pts[:, :, None, 1] - e0[:, None, :, 1]) - (
+            e1[:, None, :, 1] - e0[:, None, :, 1]
+        ) * (pts[:, :, None, 0] - e0[:, None, :, 0])
+        return np.all(cross >= -1e-9, axis=2) | np.all(cross <= 1e-9, axis=2)
+
+    # Edge i of A against edge j of B: a0 + t * da == b0 + u * db.
+    a0 = ca[:, :, None, :]
+    da = (np.roll(ca, -1, axis=1) - ca)[:, :, None, :]
+    b0 = cb[:, None, :, :]
+    db = (np.roll(cb, -1, axis=1) - cb)[:, None, :, :]
+    denom = da[..., 0] * db[..., 1] - da[..., 1] * db[..., 0]
+    diff = b0 - a0
+    safe = np.where(np.abs(denom) < 1e-12, 1.0, denom)
+    t = (diff[..., 0] * db[..., 1] - diff[..., 1] * db[..., 0]) / safe
+    u = (diff[..., 0] * da[..., 1] - diff[..., 1] * da[..., 0]) / safe
+    hit = (np.abs(denom) >= 1e-12) & (t >= 0.0) & (t <= 1.0) & (u >= 0.0) & (u <= 1.0)
+    cross_pts = (a0 + t[..., None] * da).reshape(p, 16, 2)
+
+    pts = np.concatenate([ca, cb, cross_pts], axis=1)
+    valid = np.concatenate([inside(ca, cb), inside(cb, ca), hit.reshape(p, 16)], axis=1)
+    count = valid.sum(axis=1)
+
+    n_valid = np.maximum(count, 1)[:, None]
+    centroid = np.where(valid[..., None], pts, 0.0).sum(axis=1) / n_valid
+    ang = np.arctan2(pts[..., 1] - centroid[:, 1:2], pts[..., 0] - centroid[:, 0:1])
+    order = np.argsort(np.where(valid, ang, np.inf), axis=1)
+    pts = np.take_along_axis(pts, order[..., None], axis=1)
+    # Pad with the last valid vertex: repeated points add nothing to the shoelace sum.
+    idx = np.minimum(np.arange(pts.shape[1])[None, :], np.maximum(count - 1, 0)[:, None])
+    pts = np.take_along_axis(pts, idx[..., None], axis=1)
+    nxt = np.roll(pts, -1, axis=1)
+    inter = 0.5 * np.abs(np.sum(pts[..., 0] * nxt[..., 1] - pts[..., 1] * nxt[..., 0], axis=1))
+    inter = np.where(count >= 3, inter, 0.0)
+
+    union = boxes_a[:, 3] * boxes_a[:, 4] + boxes_b[:, 3] * boxes_b[:, 4] - inter
+    return np.where((inter > 0.0) & (union > 1e-9), inter / np.maximum(union, 1e-9), 0.0)
@@ -1,191 +1,604 @@
 from __future__ import annotations
 
 import math
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Any, Callable
 
 import numpy as np
 
-from .math_utils import angle_diff, wrap_angle
+from .kernels import (
+    H_IDX,
+    MEAS_DIM,
+    NUMPY_KERNELS,
+    STATE_DIM,
+    KernelBackend,
+    f_ctrv,
+    f_cv,
+    h_meas,
+    jacobian_numeric,
+)
+from .math_utils import wrap_angle_array
+
+__all__ = [
+    "CoastBound",
+    "IMMEKF",
+    "IMMState",
+    "InnovationCache",
+    "MEAS_DIM",
+    "STATE_DIM",
+    "SqrtIMMEKF",
+    "SqrtIMMState",
+    "StaticPolicy",
+    "make_filter_class",
+]
+
+_LOG_2PI = math.log(2.0 * math.pi)
+_LOWER_MASKS = {n: np.tri(n) for n in (MEAS_DIM, STATE_DIM, MEAS_DIM + STATE_DIM)}
+# Velocity and yaw rate, pinned to zero while a track is static.
+_RATE_IDX = [3, 5]
+# Chi-square 99% quantile, 2 dof: position innovations beyond this count as motion evidence.
+_CHI2_2DOF_99 = 9.21
+
+
+def _lambda_max_2x2(m: np.ndarray) -> float:
+    half_tr = 0.5 * (m[0, 0] + m[1, 1])
+    return float(half_tr + math.sqrt(max(0.0, 0.25 * (m[0, 0] - m[1, 1]) ** 2 + m[0, 1] * m[1, 0])))
 
-STATE_DIM = 9
-MEAS_DIM = 7
+
+@dataclass
+class CoastBound:
+    """Standard deviations that bound position, speed, yaw and yaw rate while predictions are deferred."""
+
+    pos: float
+    v: float
+    yaw: float
+    yaw_rate: float
+
+
+@dataclass
+class StaticPolicy:
+    """When an IMM track drops to the constant-position model and when it returns.
+
+    A track becomes static after ``enter_updates`` consecutive updates with
+    fused speed and yaw rate below the limits, and returns to the full IMM
+    after ``exit_updates`` consecutive updates whose position innovation NIS
+    exceeds ``exit_nis``. ``q_diag`` are per-``reference_dt_s`` sigmas of the
+    constant-position random walk; ``release_sigma`` seeds the (v, yaw_rate)
+    uncertainty on return.
+    """
+
+    enter_speed_mps: float = 0.3
+    enter_yaw_rate: float = 0.05
+    enter_updates: int = 3
+    exit_nis: float = _CHI2_2DOF_99
+    exit_updates: int = 1
+    q_diag: tuple[float, ...] = (0.05, 0.05, 0.02, 0.0, 0.01, 0.0, 0.02, 0.02, 0.02)
+    release_sigma: tuple[float, float] = (2.0, 0.5)
+    reference_dt_s: float = 0.5
+
+    @classmethod
+    def from_config(cls, cfg: dict[str, Any], reference_dt_s: float) -> StaticPolicy | None:
+        if not cfg.get("enabled", False):
+            return None
+        d = cls()
+        return cls(
+            enter_speed_mps=float(cfg.get("enter_speed_mps", d.enter_speed_mps)),
+            enter_yaw_rate=float(cfg.get("enter_yaw_rate", d.enter_yaw_rate)),
+            enter_updates=int(cfg.get("enter_updates", d.enter_updates)),
+            exit_nis=float(cfg.get("exit_nis", d.exit_nis)),
+            exit_updates=int(cfg.get("exit_updates", d.exit_updates)),
+            q_diag=tuple(float(v) for v in cfg.get("q_diag", d.q_diag)),
+            release_sigma=tuple(float(v) for v in cfg.get("release_sigma", d.release_sigma)),
+            reference_dt_s=reference_dt_s,
+        )
+
+    def __post_init__(self) -> None:
+        self.q = np.diag(np.asarray(self.q_diag, dtype=float) ** 2)
 
 
 @dataclass
 class IMMState:
-    x_models: list[np.ndarray]
-    p_models: list[np.ndarray]
+    x_models: np.ndarray
+    p_models: np.ndarray
     mu: np.ndarray
 
 
-class IMMEKF:
-    def __init__(self, x0: np.ndarray, p0: np.ndarray, mode_prob_init: np.ndarray, transition: np.ndarray):
+@dataclass
+class InnovationCache:
+    """Measurement-independent terms of one filter step for one R.
+
+    ``gate`` (the fused innovation-covariance inverse, or its inverse Cholesky
+    factor in square-root form) is filled when the track is gated; ``modes``
+    holds the per-mode update terms and is only built when the track is
+    actually updated.
+    """
+
+    r: np.ndarray
+    z_hat: np.ndarray
+    gate: np.ndarray | None = None
+    modes: tuple[Any, ...] | None = None
+
+
+class _IMMBase(ABC):
+    kernels: KernelBackend
+    x: np.ndarray
+    _cache: InnovationCache | None
+    _pending: list[tuple[float, np.ndarray, np.ndarray]]
+
+    @property
+    def pending_steps(self) -> int:
+        """Predictions applied to ``x`` by ``coast`` but not yet to the covariance."""
+        return len(self._pending)
+
+    def coast(self, dt: float, q_cv: np.ndarray, q_ctrv: np.ndarray) -> None:
+        """Mean-only prediction for a track that is not expected to be updated.
+
+        ``x`` is advanced exactly as ``predict`` would advance it (IMM mixing
+        and mode propagation of the means only). The covariance steps are
+        queued and replayed by ``materialize``, which every covariance consumer
+        calls first, so the filter is indistinguishable from one that predicted
+        eagerly. Meanwhile ``position_variance_bound`` gives a cheap gate radius.
+        """
+        if not self._pending:
+            p = self.p
+            self._coast_x = self.state.x_models
+            self._coast_mu = self.state.mu
+            self._bound = CoastBound(
+                pos=math.sqrt(_lambda_max_2x2(p)),
+                v=math.sqrt(p[3, 3]),
+                yaw=math.sqrt(p[4, 4]),
+                yaw_rate=math.sqrt(p[5, 5]),
+            )
+        self._pending.append((dt, q_cv, q_ctrv))
+
+        x_models, mu = self._coast_x, self._coast_mu
+        c_j = np.maximum(self.transition.T @ mu, 1e-12)
+        mixed_x = np.empty_like(x_models)
+        for j in range(2):
+            mu_ij = (self.transition[:, j] * mu) / c_j[j]
+            mixed_x[j] = mu_ij[0] * x_models[0] + mu_ij[1] * x_models[1]
+        self._grow_bound(x_models, mixed_x, dt, q_cv, q_ctrv)
+
+        self._coast_x = np.stack([f_cv(mixed_x[0], dt), f_ctrv(mixed_x[1], dt)])
+        self._coast_mu = c_j / np.sum(c_j)
+        xf = self._coast_mu[0] * self._coast_x[0] + self._coast_mu[1] * self._coast_x[1]
+        xf[4] = self.kernels.wrap_angle(xf[4])
+        self.x = xf
+        self._cache = None
+
+    def _grow_bound(
+        self, x_models: np.ndarray, mixed_x: np.ndarray, dt: float, q_cv: np.ndarray, q_ctrv: np.ndarray
+    ) -> None:
+        # Mixing adds at most the squared spread of the mode means; propagation
+        # adds the linearized motion Jacobian terms (triangle inequality on
+        # standard deviations, so any correlation is covered), then process noise.
+        b = self._bound
+        d = x_models[0] - x_models[1]
+        d[4] = self.kernels.wrap_angle(d[4])
+        pos = math.sqrt(b.pos**2 + d[0] ** 2 + d[1] ** 2)
+        v = math.sqrt(b.v**2 + d[3] ** 2)
+        yaw = math.sqrt(b.yaw**2 + d[4] ** 2)
+        yaw_rate = math.sqrt(b.yaw_rate**2 + d[5] ** 2)
+
+        speed = float(np.max(np.abs(mixed_x[:, 3])))
+        yaw = yaw + dt * yaw_rate
+        pos = pos + dt * v + speed * dt * yaw + speed * dt * dt * yaw_rate
+
+        qd = np.maximum(np.diagonal(q_cv), np.diagonal(q_ctrv))
+        b.pos = math.sqrt(pos**2 + max(qd[0], qd[1]))
+        b.v = math.sqrt(v**2 + qd[3])
+        b.yaw = math.sqrt(yaw**2 + qd[4])
+        b.yaw_rate = math.sqrt(yaw_rate**2 + qd[5])
+
+    def position_variance_bound(self, r: np.ndarray) -> float:
+        """Upper bound on the largest eigenvalue of the position innovation covariance.
+
+        A measurement farther than ``sqrt(gate * bound)`` from ``x[:2]`` cannot
+        pass a Mahalanobis gate of ``gate``. With nothing pending it is
+        lambda_max(P) + lambda_max(R), tight only when their leading
+        eigenvectors line up.
+        """
+        if not self._pending:
+            return _lambda_max_2x2(self.p) + _lambda_max_2x2(r)
+        spread = max(float(np.sum((xm[:2] - self.x[:2]) ** 2)) for xm in self._coast_x)
+        return self._bound.pos**2 + spread + _lambda_max_2x2(r)
+
+    def materialize(self) -> None:
+        """Replay the predictions deferred by ``coast`` on the full filter state."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        for dt, q_cv, q_ctrv in pending:
+            self.predict(dt, q_cv, q_ctrv)
+
+    def innovations(
+        self, zs: np.ndarray, r: np.ndarray, r_chol: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Fused-state innovations (K, 7) and Mahalanobis distances (K,) for a block of measurements."""
+        self.materialize()
+        cache = self._cache_for(r)
+        if cache.gate is None:
+            cache.gate = self._gate_matrix(r, r_chol)
+        innov = zs - cache.z_hat
+        innov[:, 3] = wrap_angle_array(innov[:, 3])
+        return innov, self._mahalanobis(cache.gate, innov)
+
+    def innovation_mahalanobis(self, z: np.ndarray, r: np.ndarray, r_chol: np.ndarray | None = None) -> float:
+        return float(self.innovations(z[None, :], r, r_chol)[1][0])
+
+    def _cache_for(self, r: np.ndarray) -> InnovationCache:
+        cache = self._cache
+        if cache is None or not np.array_equal(cache.r, r):
+            cache = InnovationCache(r=r.copy(), z_hat=h_meas(self.x))
+            self._cache = cache
+        return cache
+
+    def _mode_innovations(self, z: np.ndarray, innov: np.ndarray | None, cache: InnovationCache) -> np.ndarray:
+        # Per-mode innovations are the fused one shifted by the mode's predicted measurement.
+        if innov is None:
+            innov = z - cache.z_hat
+            innov[3] = self.kernels.wrap_angle(innov[3])
+        z_hat_modes = cache.modes[0]
+        d = innov[None, :] + (cache.z_hat[None, :] - z_hat_modes)
+        d[:, 3] = wrap_angle_array(d[:, 3])
+        return d
+
+    @abstractmethod
+    def _gate_matrix(self, r: np.ndarray, r_chol: np.ndarray | None) -> np.ndarray:
+        """The fused innovation covariance in the form ``_mahalanobis`` consumes."""
+
+    @abstractmethod
+    def _mahalanobis(self, gate: np.ndarray, innov: np.ndarray) -> np.ndarray:
+        """Squared Mahalanobis distance of each row of ``innov`` under ``gate``."""
+
+
+class IMMEKF(_IMMBase):
+    def __init__(
+        self,
+        x0: np.ndarray,
+        p0: np.ndarray,
+        mode_prob_init: np.ndarray,
+        transition: np.ndarray,
+        kernels: KernelBackend | None = None,
+        static: StaticPolicy | None = None,
+    ):
         self.transition = transition
+        self.kernels = kernels or NUMPY_KERNELS
         self.state = IMMState(
-            x_models=[x0.copy(), x0.copy()],
-            p_models=[p0.copy(), p0.copy()],
+            x_models=np.stack([x0, x0]).astype(float),
+            p_models=np.stack([p0, p0]).astype(float),
             mu=mode_prob_init.astype(float).copy(),
         )
-        self.x = x0.copy()
-        self.p = p0.copy()
+        # While static, (x, _p) is the constant-position filter and ``state`` is left as it was on entry.
+        self.static_policy = static
+        self.is_static = False
+        self._still_updates = 0
+        self._moving_updates = 0
+        self._pending = []
         self._fuse()
 
-    @staticmethod
-    def _f_cv(x: np.ndarray, dt: float) -> np.ndarray:
-        xn = x.copy()
-        px, py, pz, v, yaw, yaw_rate, l, w, h = x
-        xn[0] = px + v * dt * math.cos(yaw)
-        xn[1] = py + v * dt * math.sin(yaw)
-        xn[2] = pz
-        xn[3] = v
-        xn[4] = wrap_angle(yaw)
-        xn[5] = 0.95 * yaw_rate
-        xn[6] = max(0.05, l)
-        xn[7] = max(0.05, w)
-        xn[8] = max(0.05, h)
-        return xn
-
-    @staticmethod
-    def _f_ctrv(x: np.ndarray, dt: float) -> np.ndarray:
-        xn = x.copy()
-        px, py, pz, v, yaw, yaw_rate, l, w, h = x
-        if abs(yaw_rate) > 1e-4:
-            xn[0] = px + (v / yaw_rate) * (math.sin(yaw + yaw_rate * dt) - math.sin(yaw))
-            xn[1] = py - (v / yaw_rate) * (math.cos(yaw + yaw_rate * dt) - math.cos(yaw))
-        else:
-            xn[0] = px + v * dt * math.cos(yaw)
-            xn[1] = py + v * dt * math.sin(yaw)
-        xn[2] = pz
-        xn[3] = v
-        xn[4] = wrap_angle(yaw + yaw_rate * dt)
-        xn[5] = yaw_rate
-        xn[6] = max(0.05, l)
-        xn[7] = max(0.05, w)
-        xn[8] = max(0.05, h)
-        return xn
-
-    @staticmethod
-    def _h(x: np.ndarray) -> np.ndarray:
-        z = np.array([x[0], x[1], x[2], x[4], x[6], x[7], x[8]], dtype=float)
-        z[3] = wrap_angle(z[3])
-        return z
-
-    @staticmethod
-    def _jacobian_numeric(func, x: np.ndarray, eps: float = 1e-4) -> np.ndarray:
-        y0 = func(x)
-        j = np.zeros((y0.size, x.size), dtype=float)
-        for i in range(x.size):
-            xp = x.copy()
-            xp[i] += eps
-            yp = func(xp)
-            j[:, i] = (yp - y0) / eps
-        return j
-
-    def _mix(self) -> tuple[list[np.ndarray], list[np.ndarray], np.ndarray]:
-        mu_prev = self.state.mu
-        c_j = self.transition.T @ mu_prev
-        c_j = np.maximum(c_j, 1e-12)
-
-        mixed_x: list[np.ndarray] = []
-        mixed_p: list[np.ndarray] = []
-
-        for j in range(2):
-            mu_ij = (self.transition[:, j] * mu_prev) / c_j[j]
-            xj = sum(mu_ij[i] * self.state.x_models[i] for i in range(2))
-            pj = np.zeros((STATE_DIM, STATE_DIM), dtype=float)
-            for i in range(2):
-                dx = self.state.x_models[i] - xj
-                dx[4] = angle_diff(self.state.x_models[i][4], xj[4])
-                pj += mu_ij[i] * (self.state.p_models[i] + np.outer(dx, dx))
-            mixed_x.append(xj)
-            mixed_p.append(pj)
-
-        return mixed_x, mixed_p, c_j
+    @property
+    def p(self) -> np.ndarray:
+        """Fused covariance, built on first use after a step."""
+        self.materialize()
+        if self._p is None:
+            self._p = self.kernels.fuse(self.state.x_models, self.state.p_models, self.state.mu)[1]
+        return self._p
 
     def predict(self, dt: float, q_cv: np.ndarray, q_ctrv: np.ndarray) -> None:
-        mixed_x, mixed_p, c_j = self._mix()
+        self.materialize()
+        if self.is_static:
+            policy = self.static_policy
+            self._p = self._p + policy.q * (dt / policy.reference_dt_s)
+            self._cache = None
+            return
+        k = self.kernels
+        mixed_x, mixed_p, c_j = k.mix(self.state.x_models, self.state.p_models, self.state.mu, self.transition)
+        self.state.x_models, self.state.p_models = k.predict_models(mixed_x, mixed_p, dt, q_cv, q_ctrv)
+        self.state.mu = c_j / np.sum(c_j)
+        self._fuse()
 
-        funcs = [self._f_cv, self._f_ctrv]
-        qs = [q_cv, q_ctrv]
+    def update(
+        self,
+        z: np.ndarray,
+        r: np.ndarray,
+        r_chol: np.ndarray | None = None,
+        innov: np.ndarray | None = None,
+    ) -> None:
+        """Update with measurement ``z``; ``innov`` is its fused innovation from gating, if known."""
+        self.materialize()
+        if self.is_static:
+            self._static_update(z, r, innov)
+            return
+        cache = self._cache_for(r)
+        if cache.modes is None:
+            cache.modes = self.kernels.mode_gains(self.state.x_models, self.state.p_models, r)
+        _, s_inv, gains, p_post, log_norm = cache.modes
+
+        d = self._mode_innovations(z, innov, cache)
+        x_upd = self.state.x_models + np.einsum("jik,jk->ji", gains, d)
+        x_upd[:, 4] = wrap_angle_array(x_upd[:, 4])
+        mahal = np.einsum("jk,jkl,jl->j", d, s_inv, d)
+        likelihoods = np.exp(-0.5 * mahal + log_norm)
 
-        x_pred: list[np.ndarray] = []
-        p_pred: list[np.ndarray] = []
-        for j in range(2):
-            xj = funcs[j](mixed_x[j], dt)
-            fj = self._jacobian_numeric(lambda xx: funcs[j](xx, dt), mixed_x[j])
-            pj = fj @ mixed_p[j] @ fj.T + qs[j]
-            x_pred.append(xj)
-            p_pred.append(pj)
+        mu = self.state.mu * np.maximum(likelihoods, 1e-20)
+        mu = mu / np.sum(mu)
 
-        self.state.x_models = x_pred
-        self.state.p_models = p_pred
-        self.state.mu = c_j / np.sum(c_j)
+        self.state.x_models = x_upd
+        self.state.p_models = p_post
+        self.state.mu = mu
+        self._fuse()
+        if self.static_policy is not None:
+            self._check_still()
+
+    def coast(self, dt: float, q_cv: np.ndarray, q_ctrv: np.ndarray) -> None:
+        # The constant-position step is already as cheap as the deferred one.
+        if self.is_static:
+            self.predict(dt, q_cv, q_ctrv)
+            return
+        super().coast(dt, q_cv, q_ctrv)
+
+    def _check_still(self) -> None:
+        policy = self.static_policy
+        x = self.x
+        if abs(x[3]) < policy.enter_speed_mps and abs(x[5]) < policy.enter_yaw_rate:
+            self._still_updates += 1
+        else:
+            self._still_updates = 0
+        if self._still_updates < policy.enter_updates:
+            return
+        # Collapse to one constant-position filter with the rates pinned at zero.
+        p = self.p.copy()
+        p[_RATE_IDX, :] = 0.0
+        p[:, _RATE_IDX] = 0.0
+        self.x = self.x.copy()
+        self.x[_RATE_IDX] = 0.0
+        self._p = p
+        self._cache = None
+        self.is_static = True
+        self._still_updates = 0
+        self._moving_updates = 0
+
+    def _static_update(self, z: np.ndarray, r: np.ndarray, innov: np.ndarray | None) -> None:
+        cache = self._cache_for(r)
+        if innov is None:
+            innov = z - cache.z_hat
+            innov[3] = self.kernels.wrap_angle(innov[3])
+        p = self._p
+        ph = p[:, H_IDX]
+        s = ph[H_IDX, :] + r
+        gain = np.linalg.solve(s, ph.T).T
+        x = self.x + gain @ innov
+        x[4] = self.kernels.wrap_angle(x[4])
+        p = p - gain @ ph.T
+        self.x = x
+        self._p = 0.5 * (p + p.T)
+        self._cache = None
+
+        d_xy = innov[:2]
+        nis = float(d_xy @ np.linalg.solve(s[:2, :2], d_xy))
+        self._moving_updates = self._moving_updates + 1 if nis > self.static_policy.exit_nis else 0
+        if self._moving_updates >= self.static_policy.exit_updates:
+            self._release()
+
+    def _release(self) -> None:
+        """Back to the full IMM from the static estimate, with fresh rate uncertainty."""
+        p = self._p.copy()
+        sv, sw = self.static_policy.release_sigma
+        p[3, 3] = sv**2
+        p[5, 5] = sw**2
+        self.state.x_models = np.stack([self.x, self.x])
+        self.state.p_models = np.stack([p, p])
+        self.is_static = False
+        self._moving_updates = 0
         self._fuse()
 
-    def update(self, z: np.ndarray, r: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
-        likelihoods = np.zeros(2, dtype=float)
-        x_upd: list[np.ndarray] = []
-        p_upd: list[np.ndarray] = []
+    def _gate_matrix(self, r: np.ndarray, r_chol: np.ndarray | None) -> np.ndarray:
+        return self.kernels.gate_factors(self.x, self.p, r)[1]
 
-        for j in range(2):
-            xj = self.state.x_models[j]
-            pj = self.state.p_models[j]
+    def _mahalanobis(self, gate: np.ndarray, innov: np.ndarray) -> np.ndarray:
+        return np.einsum("ki,ij,kj->k", innov, gate, innov)
+
+    def _fuse(self) -> None:
+        mu = self.state.mu
+        xf = mu[0] * self.state.x_models[0] + mu[1] * self.state.x_models[1]
+        xf[4] = self.kernels.wrap_angle(xf[4])
+        self.x = xf
+        self._p: np.ndarray | None = None
+        self._cache = None
 
-            hj = self._h(xj)
-            innov = z - hj
-            innov[3] = angle_diff(z[3], hj[3])
 
-            h_jac = self._jacobian_numeric(self._h, xj)
-            s = h_jac @ pj @ h_jac.T + r
-            s = 0.5 * (s + s.T)
-            s_inv = np.linalg.inv(s)
-            k = pj @ h_jac.T @ s_inv
+_LAPACK: dict[str, Callable] = {}
 
-            xu = xj + k @ innov
-            xu[4] = wrap_angle(xu[4])
-            iu = np.eye(STATE_DIM)
-            pu = (iu - k @ h_jac) @ pj
-            pu = 0.5 * (pu + pu.T)
 
-            det_s = max(np.linalg.det(s), 1e-12)
-            mahal = float(innov.T @ s_inv @ innov)
-            norm = math.sqrt(((2 * math.pi) ** MEAS_DIM) * det_s)
-            likelihoods[j] = math.exp(-0.5 * mahal) / norm
+def _lapack(name: str) -> Callable:
+    # SciPy is imported on the first sqrt-filter call rather than with the package, then cached.
+    fn = _LAPACK.get(name)
+    if fn is None:
+        from scipy.linalg import lapack
 
-            x_upd.append(xu)
-            p_upd.append(pu)
+        fn = _LAPACK[name] = getattr(lapack, name)
+    return fn
 
-        mu = self.state.mu * np.maximum(likelihoods, 1e-20)
-        mu = mu / np.sum(mu)
+
+def _tria(a: np.ndarray) -> np.ndarray:
+    """Lower-triangular ``L`` with ``L @ L.T == a @ a.T`` for a wide ``a`` (or a stack of them)."""
+    if a.ndim == 3:
+        return np.stack([_tria(m) for m in a])
+    n = a.shape[0]
+    # R of the QR of a.T is the upper factor; only its triangle is meaningful.
+    qr = _lapack("dgeqrf")(a.T)[0]
+    return qr[:n].T * _LOWER_MASKS[n]
+
+
+def _sqrt_psd(q: np.ndarray) -> np.ndarray:
+    diag = np.diagonal(q)
+    if np.count_nonzero(q - np.diag(diag)) == 0:
+        return np.diag(np.sqrt(np.maximum(diag, 0.0)))
+    return np.linalg.cholesky(q)
+
+
+@dataclass
+class SqrtIMMState:
+    x_models: np.ndarray
+    s_models: np.ndarray
+    mu: np.ndarray
+
+
+class SqrtIMMEKF(_IMMBase):
+    """Square-root IMM-EKF: every covariance is carried as a lower Cholesky factor.
+
+    Predict, mixing, fusion and update are QR (array) updates of the factors, so
+    covariances stay positive definite without symmetrization, and mode
+    likelihoods come from triangular solves and the factor's log-determinant.
+    """
+
+    def __init__(
+        self,
+        x0: np.ndarray,
+        p0: np.ndarray,
+        mode_prob_init: np.ndarray,
+        transition: np.ndarray,
+        kernels: KernelBackend | None = None,
+    ):
+        self.transition = transition
+        # Square-root form runs on LAPACK; the backend only supplies angle wrapping.
+        self.kernels = kernels or NUMPY_KERNELS
+        s0 = np.linalg.cholesky(p0)
+        self.state = SqrtIMMState(
+            x_models=np.stack([x0, x0]).astype(float),
+            s_models=np.stack([s0, s0]),
+            mu=mode_prob_init.astype(float).copy(),
+        )
+        self._pending = []
+        self._fuse()
+
+    @property
+    def s(self) -> np.ndarray:
+        """Lower Cholesky factor of the fused covariance, built on first use after a step."""
+        self.materialize()
+        if self._s is None:
+            x_models = self.state.x_models
+            self._s = _tria(self._spread_array(x_models, self.state.s_models, self.state.mu, self._x_unwrapped))
+        return self._s
+
+    @property
+    def p(self) -> np.ndarray:
+        return self.s @ self.s.T
+
+    def predict(self, dt: float, q_cv: np.ndarray, q_ctrv: np.ndarray) -> None:
+        self.materialize()
+        mixed_x, mixed_s, c_j = self._mix()
+
+        x_pred = np.empty_like(mixed_x)
+        pre = np.empty((2, STATE_DIM, 2 * STATE_DIM), dtype=float)
+        for j, (func, q) in enumerate(((f_cv, q_cv), (f_ctrv, q_ctrv))):
+            x_pred[j] = func(mixed_x[j], dt)
+            fj = jacobian_numeric(lambda xx: func(xx, dt), mixed_x[j])
+            pre[j, :, :STATE_DIM] = fj @ mixed_s[j]
+            pre[j, :, STATE_DIM:] = _sqrt_psd(q)
+
+        self.state.x_models = x_pred
+        self.state.s_models = _tria(pre)
+        self.state.mu = c_j / np.sum(c_j)
+        self._fuse()
+
+    def update(
+        self,
+        z: np.ndarray,
+        r: np.ndarray,
+        r_chol: np.ndarray | None = None,
+        innov: np.ndarray | None = None,
+    ) -> None:
+        """Update with measurement ``z``; ``innov`` is its fused innovation from gating, if known."""
+        self.materialize()
+        cache = self._cache_for(r)
+        if cache.modes is None:
+            cache.modes = self._mode_terms(r, r_chol)
+        _, s_y_inv, gains, s_post, log_norm = cache.modes
+
+        d = self._mode_innovations(z, innov, cache)
+        e = np.einsum("jkl,jl->jk", s_y_inv, d)
+        x_upd = self.state.x_models + np.einsum("jik,jk->ji", gains, e)
+        x_upd[:, 4] = wrap_angle_array(x_upd[:, 4])
+        log_lik = -0.5 * np.einsum("jk,jk->j", e, e) + log_norm
+
+        mu = self.state.mu * np.exp(log_lik - np.max(log_lik))
+        mu = np.maximum(mu / np.sum(mu), 1e-12)
 
         self.state.x_models = x_upd
-        self.state.p_models = p_upd
-        self.state.mu = mu
+        self.state.s_models = s_post
+        self.state.mu = mu / np.sum(mu)
         self._fuse()
 
-        z_hat = self._h(self.x)
-        h_jac = self._jacobian_numeric(self._h, self.x)
-        s_fused = h_jac @ self.p @ h_jac.T + r
-        return z_hat, s_fused
-
-    def innovation_mahalanobis(self, z: np.ndarray, r: np.ndarray) -> float:
-        z_hat = self._h(self.x)
-        innov = z - z_hat
-        innov[3] = angle_diff(z[3], z_hat[3])
-        h_jac = self._jacobian_numeric(self._h, self.x)
-        s = h_jac @ self.p @ h_jac.T + r
-        s = 0.5 * (s + s.T)
-        s_inv = np.linalg.inv(s)
-        return float(innov.T @ s_inv @ innov)
+    def _mode_terms(self, r: np.ndarray, r_chol: np.ndarray | None) -> tuple[np.ndarray, ...]:
+        # The gate factors the fused covariance, which adds the spread of the mode means to the mode
+        # covariances, so each mode's innovation factor and gain need their own QR. They are built once
+        # per (state, r) in the innovation cache and shared by every update until the next step.
+        rc = np.linalg.cholesky(r) if r_chol is None else r_chol
+        n = MEAS_DIM + STATE_DIM
+        pre = np.zeros((2, n, n), dtype=float)
+        pre[:, :MEAS_DIM, :MEAS_DIM] = rc
+        pre[:, :MEAS_DIM, MEAS_DIM:] = self.state.s_models[:, H_IDX, :]
+        pre[:, MEAS_DIM:, MEAS_DIM:] = self.state.s_models
+        post = _tria(pre)
+
+        s_y = post[:, :MEAS_DIM, :MEAS_DIM]
+        s_y_inv = np.stack([_lapack("dtrtri")(s_y[j], lower=1)[0] for j in range(2)])
+        log_det = 2.0 * np.sum(np.log(np.abs(np.diagonal(s_y, axis1=1, axis2=2))), axis=1)
+        log_norm = -0.5 * (log_det + MEAS_DIM * _LOG_2PI)
+        z_hat = self.state.x_models[:, H_IDX]
+        z_hat[:, 3] = wrap_angle_array(z_hat[:, 3])
+        return z_hat, s_y_inv, post[:, MEAS_DIM:, :MEAS_DIM], post[:, MEAS_DIM:, MEAS_DIM:], log_norm
+
+    def _gate_matrix(self, r: np.ndarray, r_chol: np.ndarray | None) -> np.ndarray:
+        rc = np.linalg.cholesky(r) if r_chol is None else r_chol
+        s_y = _tria(np.hstack([self.s[H_IDX, :], rc]))
+        return _lapack("dtrtri")(s_y, lower=1)[0]
+
+    def _mahalanobis(self, gate: np.ndarray, innov: np.ndarray) -> np.ndarray:
+        e = innov @ gate.T
+        return np.einsum("ki,ki->k", e, e)
+
+    def _mix(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        x_models = self.state.x_models
+        s_models = self.state.s_models
+        c_j = np.maximum(self.transition.T @ self.state.mu, 1e-12)
+
+        mixed_x = np.empty_like(x_models)
+        pre = np.empty((2, STATE_DIM, 2 * (STATE_DIM + 1)), dtype=float)
+        for j in range(2):
+            mu_ij = (self.transition[:, j] * self.state.mu) / c_j[j]
+            xj = mu_ij[0] * x_models[0] + mu_ij[1] * x_models[1]
+            pre[j] = self._spread_array(x_models, s_models, mu_ij, xj)
+            mixed_x[j] = xj
+        return mixed_x, _tria(pre), c_j
+
+    def _spread_array(self, x_models: np.ndarray, s_models: np.ndarray, w: np.ndarray, xc: np.ndarray) -> np.ndarray:
+        blocks = []
+        for i in range(2):
+            dx = x_models[i] - xc
+            dx[4] = self.kernels.wrap_angle(x_models[i][4] - xc[4])
+            sw = np.sqrt(max(w[i], 0.0))
+            blocks.append(sw * s_models[i])
+            blocks.append(sw * dx[:, None])
+        return np.hstack(blocks)
 
     def _fuse(self) -> None:
         mu = self.state.mu
-        xf = sum(mu[i] * self.state.x_models[i] for i in range(2))
-        pf = np.zeros((STATE_DIM, STATE_DIM), dtype=float)
-        for i in range(2):
-            dx = self.state.x_models[i] - xf
-            dx[4] = angle_diff(self.state.x_models[i][4], xf[4])
-            pf += mu[i] * (self.state.p_models[i] + np.outer(dx, dx))
+        x_models = self.state.x_models
+        xf = mu[0] * x_models[0] + mu[1] * x_models[1]
+        self._x_unwrapped = xf.copy()
+        self._s: np.ndarray | None = None
+        xf[4] = self.kernels.wrap_angle(xf[4])
         self.x = xf
-        self.x[4] = wrap_angle(self.x[4])
-        self.p = 0.5 * (pf + pf.T)
+        self._cache = None
+
+
+def make_filter_class(filter_form: str) -> type:
+    if filter_form == "standard":
+        return IMMEKF
+    if filter_form == "sqrt":
+        return SqrtIMMEKF
+    raise ValueError(f"Unknown imm.filter_form '{filter_form}'. Use standard or sqrt.")
@@ -3,33 +3,34 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from .math_utils import wrap_angle
-from .models import Detection3D, FrameDetections, TrackOutput
+import numpy as np
 
+from .delta_tracks import DELTA_SCHEMA, decode_delta_tracks
+from .math_utils import wrap_angle_array
+from .models import MEAS_FIELDS, DetectionBatch, FrameDetections, TrackOutput, TrackOutputBatch
 
-def load_frames(path: str | Path) -> list[FrameDetections]:
+
+def load_frames(path: str | Path, keep_raw: bool = False) -> list[FrameDetections]:
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
     frames: list[FrameDetections] = []
     for frame in data["frames"]:
-        dets: list[Detection3D] = []
-        for d in frame.get("detections", []):
-            dets.append(
-                Detection3D(
-                    x=float(d["x"]),
-                    y=float(d["y"]),
-                    z=float(d["z"]),
-                    yaw=wrap_angle(float(d["yaw"])),
-                    l=float(d["l"]),
-                    w=float(d["w"]),
-                    h=float(d["h"]),
-                    score=float(d["score"]),
-                    label=str(d["label"]),
-                    raw=d,
-                )
+        if "z" in frame:
+            # Columnar frames (z rows, scores, labels), as written by the Sparse4D converter.
+            z = np.asarray(frame["z"], dtype=float).reshape(-1, len(MEAS_FIELDS))
+            z[:, 3] = wrap_angle_array(z[:, 3])
+            batch = DetectionBatch.from_columns(z, np.asarray(frame["scores"], dtype=float), frame["labels"])
+        else:
+            batch = DetectionBatch.from_rows(frame.get("detections", []), keep_raw=keep_raw)
+        frames.append(
+            FrameDetections(
+                timestamp_s=float(frame["timestamp_s"]),
+                batch=batch,
+                is_keyframe=bool(frame.get("is_keyframe", True)),
+                ego_pose=frame.get("ego_pose"),
             )
-        frames.append(FrameDetections(timestamp_s=float(frame["timestamp_s"]), detections=dets))
+        )
 
     frames.sort(key=lambda x: x.timestamp_s)
     return frames
@@ -40,7 +41,23 @@ def save_tracks(path: str | Path, rows: list[dict]) -> None:
         json.dump({"tracks": rows}, f, indent=2)
 
 
-def flatten_outputs(timestamp_s: float, outputs: list[TrackOutput]) -> list[dict]:
+def save_delta_tracks(path: str | Path, payload: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+
+def load_tracks(path: str | Path) -> list[dict]:
+    """Flat track rows from either output format."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("schema") == DELTA_SCHEMA:
+        return decode_delta_tracks(data)
+    return data["tracks"]
+
+
+def flatten_outputs(timestamp_s: float, outputs: TrackOutputBatch | list[TrackOutput]) -> list[dict]:
+    if isinstance(outputs, TrackOutputBatch):
+        return outputs.to_rows(timestamp_s)
     rows = []
     for out in outputs:
         r = out.to_dict()
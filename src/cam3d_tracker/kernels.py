@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from .geometry import bev_iou as _bev_iou
+from .math_utils import angle_diff, wrap_angle
+
+STATE_DIM = 9
+MEAS_DIM = 7
+
+# The measurement model only selects state entries, so its Jacobian is constant.
+H_IDX = np.array([0, 1, 2, 4, 6, 7, 8])
+H_MEAS = np.eye(STATE_DIM)[H_IDX]
+
+
+@dataclass(frozen=True)
+class KernelBackend:
+    """Filter and geometry primitives used on the tracker hot path.
+
+    Every backend takes and returns the same stacked arrays: per-mode states are
+    (2, 9), per-mode covariances (2, 9, 9), mode probabilities (2,).
+    """
+
+    name: str
+    wrap_angle: Callable[[float], float]
+    mix: Callable
+    predict_models: Callable
+    mode_gains: Callable
+    fuse: Callable
+    gate_factors: Callable
+    bev_iou: Callable[[np.ndarray, np.ndarray], float]
+
+    def __reduce__(self) -> tuple[Callable, tuple[str]]:
+        # Pickled by name (filters travel between tiled-tracker workers); the receiver rebuilds its own.
+        return get_kernels, (self.name,)
+
+
+def f_cv(x: np.ndarray, dt: float) -> np.ndarray:
+    xn = x.copy()
+    px, py, pz, v, yaw, yaw_rate, l, w, h = x
+    xn[0] = px + v * dt * math.cos(yaw)
+    xn[1] = py + v * dt * math.sin(yaw)
+    xn[2] = pz
+    xn[3] = v
+    xn[4] = wrap_angle(yaw)
+    xn[5] = 0.95 * yaw_rate
+    xn[6] = max(0.05, l)
+    xn[7] = max(0.05, w)
+    xn[8] = max(0.05, h)
+    return xn
+
+
+def f_ctrv(x: np.ndarray, dt: float) -> np.ndarray:
+    xn = x.copy()
+    px, py, pz, v, yaw, yaw_rate, l, w, h = x
+    if abs(yaw_rate) > 1e-4:
+        xn[0] = px + (v / yaw_rate) * (math.sin(yaw + yaw_rate * dt) - math.sin(yaw))
+        xn[1] = py - (v / yaw_rate) * (math.cos(yaw + yaw_rate * dt) - math.cos(yaw))
+    else:
+        xn[0] = px + v * dt * math.cos(yaw)
+        xn[1] = py + v * dt * math.sin(yaw)
+    xn[2] = pz
+    xn[3] = v
+    xn[4] = wrap_angle(yaw + yaw_rate * dt)
+    xn[5] = yaw_rate
+    xn[6] = max(0.05, l)
+    xn[7] = max(0.05, w)
+    xn[8] = max(0.05, h)
+    return xn
+
+
+def h_meas(x: np.ndarray) -> np.ndarray:
+    z = x[H_IDX]
+    z[3] = wrap_angle(z[3])
+    return z
+
+
+def jacobian_numeric(func, x: np.ndarray, eps: float = 1e-4) -> np.ndarray:
+    y0 = func(x)
+    j = np.zeros((y0.size, x.size), dtype=float)
+    for i in range(x.size):
+        xp = x.copy()
+        xp[i] += eps
+        yp = func(xp)
+        j[:, i] = (yp - y0) / eps
+    return j
+
+
+def _mix(
+    x_models: np.ndarray, p_models: np.ndarray, mu: np.ndarray, transition: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    c_j = np.maximum(transition.T @ mu, 1e-12)
+    mixed_x = np.empty_like(x_models)
+    mixed_p = np.empty_like(p_models)
+    for j in range(2):
+        mu_ij = (transition[:, j] * mu) / c_j[j]
+        xj = mu_ij[0] * x_models[0] + mu_ij[1] * x_models[1]
+        pj = np.zeros((STATE_DIM, STATE_DIM), dtype=float)
+        for i in range(2):
+            dx = x_models[i] - xj
+            dx[4] = angle_diff(x_models[i][4], xj[4])
+            pj += mu_ij[i] * (p_models[i] + np.outer(dx, dx))
+        mixed_x[j] = xj
+        mixed_p[j] = pj
+    return mixed_x, mixed_p, c_j
+
+
+def _predict_models(
+    mixed_x: np.ndarray, mixed_p: np.ndarray, dt: float, q_cv: np.ndarray, q_ctrv: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    x_pred = np.empty_like(mixed_x)
+    p_pred = np.empty_like(mixed_p)
+    for j, (func, q) in enumerate(((f_cv, q_cv), (f_ctrv, q_ctrv))):
+        x_pred[j] = func(mixed_x[j], dt)
+        fj = jacobian_numeric(lambda xx: func(xx, dt), mixed_x[j])
+        p_pred[j] = fj @ mixed_p[j] @ fj.T + q
+    return x_pred, p_pred
+
+
+def _mode_gains(
+    x_models: np.ndarray, p_models: np.ndarray, r: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Per-mode update terms that do not depend on the measurement.
+
+    Returns predicted measurements (2, 7), innovation covariance inverses
+    (2, 7, 7), gains (2, 9, 7), posterior covariances (2, 9, 9) and the log
+    normalizers of the mode likelihoods (2,).
+    """
+    z_hat = x_models[:, H_IDX]
+    for j in range(2):
+        z_hat[j, 3] = wrap_angle(z_hat[j, 3])
+    ph = p_models[:, :, H_IDX]
+    s = ph[:, H_IDX, :] + r
+    s = 0.5 * (s + np.swapaxes(s, 1, 2))
+    s_inv = np.linalg.inv(s)
+    k = ph @ s_inv
+    p_post = p_models - k @ np.swapaxes(ph, 1, 2)
+    p_post = 0.5 * (p_post + np.swapaxes(p_post, 1, 2))
+    det_s = np.maximum(np.linalg.det(s), 1e-12)
+    log_norm = -0.5 * (np.log(det_s) + MEAS_DIM * math.log(2.0 * math.pi))
+    return z_hat, s_inv, k, p_post, log_norm
+
+
+def _fuse(x_models: np.ndarray, p_models: np.ndarray, mu: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    xf = mu[0] * x_models[0] + mu[1] * x_models[1]
+    pf = np.zeros((STATE_DIM, STATE_DIM), dtype=float)
+    for i in range(2):
+        dx = x_models[i] - xf
+        dx[4] = angle_diff(x_models[i][4], xf[4])
+        pf += mu[i] * (p_models[i] + np.outer(dx, dx))
+    xf[4] = wrap_angle(xf[4])
+    return xf, 0.5 * (pf + pf.T)
+
+
+def _gate_factors(x: np.ndarray, p: np.ndarray, r: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Predicted measurement and innovation covariance inverse of the fused state."""
+    s = p[np.ix_(H_IDX, H_IDX)] + r
+    s = 0.5 * (s + s.T)
+    return h_meas(x), np.linalg.inv(s)
+
+
+NUMPY_KERNELS = KernelBackend(
+    name="numpy",
+    wrap_angle=wrap_angle,
+    mix=_mix,
+    predict_models=_predict_models,
+    mode_gains=_mode_gains,
+    fuse=_fuse,
+    gate_factors=_gate_factors,
+    bev_iou=_bev_iou,
+)
+
+_BACKENDS: dict[str, KernelBackend] = {"numpy": NUMPY_KERNELS}
+
+
+def numba_available() -> bool:
+    return importlib.util.find_spec("numba") is not None
+
+
+def get_kernels(name: str = "auto") -> KernelBackend:
+    """Return the kernel backend for ``name`` (``auto``, ``numpy`` or ``numba``).
+
+    ``auto`` picks Numba when it is importable and NumPy otherwise.
+    """
+    if name == "auto":
+        name = "numba" if numba_available() else "numpy"
+    if name not in _BACKENDS:
+        if name != "numba":
+            raise ValueError(f"Unknown kernel backend '{name}'. Use auto, numpy or numba.")
+        if not numba_available():
+            raise RuntimeError("kernel_backend 'numba' requires numba. Install with: pip install numba")
+        from . import _numba_kernels
+
+        _BACKENDS["numba"] = _numba_kernels.build_backend()
+    return _BACKENDS[name]
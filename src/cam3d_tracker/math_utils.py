@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import math
 
+import numpy as np
+
 
 def wrap_angle(theta: float) -> float:
-    while theta > math.pi:
-        theta -= 2.0 * math.pi
-    while theta < -math.pi:
-        theta += 2.0 * math.pi
-    return theta
+    if -math.pi <= theta <= math.pi:
+        return theta
+    wrapped = math.fmod(theta + math.pi, 2.0 * math.pi)
+    if wrapped < 0.0:
+        wrapped += 2.0 * math.pi
+    wrapped -= math.pi
+    # Keep +pi on the positive side.
+    if wrapped == -math.pi and theta > 0.0:
+        return math.pi
+    return wrapped
 
 
 def angle_diff(a: float, b: float) -> float:
@@ -17,3 +24,10 @@ def angle_diff(a: float, b: float) -> float:
 
 def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
+
+
+def wrap_angle_array(theta: np.ndarray) -> np.ndarray:
+    theta = np.asarray(theta, dtype=float)
+    out = np.mod(theta + math.pi, 2.0 * math.pi) - math.pi
+    # Keep +pi on the positive side, like wrap_angle.
+    return np.where((out == -math.pi) & (theta > 0.0), math.pi, out)
@@ -1,33 +1,161 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Iterator, Sequence
 
 import numpy as np
 
+from .math_utils import wrap_angle_array
+
+MEAS_FIELDS = ("x", "y", "z", "yaw", "l", "w", "h")
+STATE_FIELDS = ("x", "y", "z", "v", "yaw", "yaw_rate", "l", "w", "h")
+TRACK_STATUSES = ("confirmed", "lost", "tentative")
+
 
-@dataclass
 class Detection3D:
-    x: float
-    y: float
-    z: float
-    yaw: float
-    l: float
-    w: float
-    h: float
-    score: float
-    label: str
-    raw: dict[str, Any] = field(default_factory=dict)
+    __slots__ = ("x", "y", "z", "yaw", "l", "w", "h", "score", "label", "raw")
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        z: float,
+        yaw: float,
+        l: float,
+        w: float,
+        h: float,
+        score: float,
+        label: str,
+        raw: dict[str, Any] | None = None,
+    ) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+        self.yaw = yaw
+        self.l = l
+        self.w = w
+        self.h = h
+        self.score = score
+        self.label = label
+        self.raw = raw
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in (*MEAS_FIELDS, "score", "label"))
+        return f"Detection3D({fields})"
 
     @property
     def z_vec(self) -> np.ndarray:
         return np.array([self.x, self.y, self.z, self.yaw, self.l, self.w, self.h], dtype=float)
 
 
+class DetectionBatch:
+    """All detections of one frame in columnar form.
+
+    ``z`` is the contiguous (M, 7) measurement block ``[x, y, z, yaw, l, w, h]``,
+    ``label_codes`` index into ``label_names``. ``raw`` is only populated when the
+    caller asked to keep the source payloads.
+    """
+
+    __slots__ = ("z", "scores", "label_codes", "label_names", "raw")
+
+    def __init__(
+        self,
+        z: np.ndarray,
+        scores: np.ndarray,
+        label_codes: np.ndarray,
+        label_names: Sequence[str],
+        raw: list[dict[str, Any]] | None = None,
+    ) -> None:
+        self.z = np.ascontiguousarray(z, dtype=float).reshape(-1, len(MEAS_FIELDS))
+        self.scores = np.ascontiguousarray(scores, dtype=float).reshape(-1)
+        self.label_codes = np.ascontiguousarray(label_codes, dtype=np.int64).reshape(-1)
+        self.label_names = tuple(label_names)
+        self.raw = raw
+        if not (len(self.z) == len(self.scores) == len(self.label_codes)):
+            raise ValueError("DetectionBatch columns must have the same length")
+
+    @classmethod
+    def empty(cls) -> DetectionBatch:
+        return cls(np.empty((0, len(MEAS_FIELDS))), np.empty(0), np.empty(0, dtype=np.int64), ())
+
+    @classmethod
+    def from_columns(
+        cls,
+        z: np.ndarray,
+        scores: np.ndarray,
+        labels: Sequence[str],
+        raw: list[dict[str, Any]] | None = None,
+    ) -> DetectionBatch:
+        vocab: dict[str, int] = {}
+        codes = [vocab.setdefault(str(lbl), len(vocab)) for lbl in labels]
+        return cls(z, scores, np.array(codes, dtype=np.int64), tuple(vocab), raw)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict[str, Any]], keep_raw: bool = False) -> DetectionBatch:
+        if not rows:
+            return cls.empty()
+        z = np.array([[d[k] for k in MEAS_FIELDS] for d in rows], dtype=float)
+        z[:, 3] = wrap_angle_array(z[:, 3])
+        scores = np.array([d["score"] for d in rows], dtype=float)
+        raw = list(rows) if keep_raw else None
+        return cls.from_columns(z, scores, [d["label"] for d in rows], raw)
+
+    @classmethod
+    def from_detections(cls, dets: Sequence[Detection3D]) -> DetectionBatch:
+        if not dets:
+            return cls.empty()
+        z = np.array([[d.x, d.y, d.z, d.yaw, d.l, d.w, d.h] for d in dets], dtype=float)
+        scores = np.array([d.score for d in dets], dtype=float)
+        raw = [d.raw for d in dets] if any(d.raw is not None for d in dets) else None
+        return cls.from_columns(z, scores, [d.label for d in dets], raw)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __iter__(self) -> Iterator[Detection3D]:
+        for i in range(len(self)):
+            yield self.detection(i)
+
+    def labels(self) -> list[str]:
+        names = self.label_names
+        return [names[c] for c in self.label_codes]
+
+    def detection(self, i: int) -> Detection3D:
+        x, y, z, yaw, l, w, h = (float(v) for v in self.z[i])
+        return Detection3D(
+            x=x,
+            y=y,
+            z=z,
+            yaw=yaw,
+            l=l,
+            w=w,
+            h=h,
+            score=float(self.scores[i]),
+            label=self.label_names[self.label_codes[i]],
+            raw=self.raw[i] if self.raw is not None else None,
+        )
+
+    def to_list(self) -> list[Detection3D]:
+        return list(self)
+
+    def select(self, index: np.ndarray) -> DetectionBatch:
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        raw = [self.raw[i] for i in index] if self.raw is not None else None
+        return DetectionBatch(self.z[index], self.scores[index], self.label_codes[index], self.label_names, raw)
+
+
 @dataclass
 class FrameDetections:
     timestamp_s: float
-    detections: list[Detection3D]
+    batch: DetectionBatch
+    is_keyframe: bool = True
+    ego_pose: dict[str, Any] | None = None
+
+    @property
+    def detections(self) -> list[Detection3D]:
+        return self.batch.to_list()
 
 
 @dataclass
@@ -59,3 +187,125 @@ class TrackOutput:
             "hits": int(self.hits),
             "status": self.status,
         }
+
+
+def _frozen(values: Any, dtype: Any) -> np.ndarray:
+    # A read-only view: the caller's own array (if any) stays writable.
+    view = np.ascontiguousarray(values, dtype=dtype).view()
+    view.setflags(write=False)
+    return view
+
+
+class TrackOutputBatch:
+    """All reported tracks of one frame in columnar form, ordered by track id.
+
+    ``states`` is the contiguous (N, 9) block ``[x, y, z, v, yaw, yaw_rate, l, w, h]``,
+    ``label_codes`` index into ``label_names`` and ``status_codes`` into
+    ``TRACK_STATUSES``. The arrays are read-only; copy before modifying.
+    """
+
+    __slots__ = ("track_ids", "label_codes", "label_names", "scores", "states", "age_s", "hits", "status_codes")
+
+    def __init__(
+        self,
+        track_ids: np.ndarray,
+        label_codes: np.ndarray,
+        label_names: Sequence[str],
+        scores: np.ndarray,
+        states: np.ndarray,
+        age_s: np.ndarray,
+        hits: np.ndarray,
+        status_codes: np.ndarray,
+    ) -> None:
+        self.track_ids = _frozen(track_ids, np.int64).reshape(-1)
+        self.label_codes = _frozen(label_codes, np.int64).reshape(-1)
+        self.label_names = tuple(label_names)
+        self.scores = _frozen(scores, float).reshape(-1)
+        self.states = _frozen(states, float).reshape(-1, len(STATE_FIELDS))
+        self.age_s = _frozen(age_s, float).reshape(-1)
+        self.hits = _frozen(hits, np.int64).reshape(-1)
+        self.status_codes = _frozen(status_codes, np.int64).reshape(-1)
+
+    @classmethod
+    def empty(cls, label_names: Sequence[str] = ()) -> TrackOutputBatch:
+        none = np.empty(0)
+        return cls(none, none, label_names, none, np.empty((0, len(STATE_FIELDS))), none, none, none)
+
+    @classmethod
+    def from_outputs(cls, outputs: Sequence[TrackOutput]) -> TrackOutputBatch:
+        """Columnar copy of ``outputs``, in their given order."""
+        names = list(dict.fromkeys(o.label for o in outputs))
+        code = {name: k for k, name in enumerate(names)}
+        return cls(
+            track_ids=[o.track_id for o in outputs],
+            label_codes=[code[o.label] for o in outputs],
+            label_names=names,
+            scores=[o.score for o in outputs],
+            states=np.array([o.state for o in outputs], dtype=float).reshape(-1, len(STATE_FIELDS)),
+            age_s=[o.age_s for o in outputs],
+            hits=[o.hits for o in outputs],
+            status_codes=[TRACK_STATUSES.index(o.status) for o in outputs],
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Sequence[TrackOutputBatch], label_names: Sequence[str]) -> TrackOutputBatch:
+        """One batch, ordered by track id, from batches that share ``label_names``."""
+        if not batches:
+            return cls.empty(label_names)
+        ids = np.concatenate([b.track_ids for b in batches])
+        order = np.argsort(ids, kind="stable")
+        return cls(
+            ids[order],
+            np.concatenate([b.label_codes for b in batches])[order],
+            label_names,
+            np.concatenate([b.scores for b in batches])[order],
+            np.concatenate([b.states for b in batches])[order],
+            np.concatenate([b.age_s for b in batches])[order],
+            np.concatenate([b.hits for b in batches])[order],
+            np.concatenate([b.status_codes for b in batches])[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def __iter__(self) -> Iterator[TrackOutput]:
+        for i in range(len(self)):
+            yield self.output(i)
+
+    def labels(self) -> list[str]:
+        names = self.label_names
+        return [names[c] for c in self.label_codes.tolist()]
+
+    def statuses(self) -> list[str]:
+        return [TRACK_STATUSES[c] for c in self.status_codes.tolist()]
+
+    def output(self, i: int) -> TrackOutput:
+        return TrackOutput(
+            track_id=int(self.track_ids[i]),
+            label=self.label_names[self.label_codes[i]],
+            score=float(self.scores[i]),
+            state=self.states[i].copy(),
+            age_s=float(self.age_s[i]),
+            hits=int(self.hits[i]),
+            status=TRACK_STATUSES[self.status_codes[i]],
+        )
+
+    def to_outputs(self) -> list[TrackOutput]:
+        return list(self)
+
+    def to_rows(self, timestamp_s: float | None = None) -> list[dict[str, Any]]:
+        """``TrackOutput.to_dict`` rows (plus ``timestamp_s`` when given), built column by column."""
+        keys = ("track_id", "label", "score", *STATE_FIELDS, "age_s", "hits", "status")
+        columns = [
+            self.track_ids.tolist(),
+            self.labels(),
+            self.scores.tolist(),
+            *self.states.T.tolist(),
+            self.age_s.tolist(),
+            self.hits.tolist(),
+            self.statuses(),
+        ]
+        if timestamp_s is not None:
+            keys += ("timestamp_s",)
+            columns.append([float(timestamp_s)] * len(self))
+        return [dict(zip(keys, values)) for values in zip(*columns)]
@@ -1,5 +1,11 @@
 """nuScenes detector-to-tracker runtime bridge."""
 
-from .pipeline import run_nuscenes_tracking
-
 __all__ = ["run_nuscenes_tracking"]
+
+
+def __getattr__(name: str):
+    if name == "run_nuscenes_tracking":
+        from .pipeline import run_nuscenes_tracking
+
+        return run_nuscenes_tracking
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
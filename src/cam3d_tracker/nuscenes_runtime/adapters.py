@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
 
 import numpy as np
 
+from cam3d_tracker.math_utils import wrap_angle_array
+from cam3d_tracker.models import DetectionBatch
+
+# mmdet3d box layout [x, y, z, l, w, h, yaw] -> measurement layout [x, y, z, yaw, l, w, h].
+_BOX_TO_MEAS = [0, 1, 2, 6, 3, 4, 5]
+
 
 def default_input_adapter(frame: dict[str, Any], device: Any, torch: Any) -> dict[str, Any]:
     # This default adapter only passes metadata. Replace with your model-specific adapter.
     return {"frame": frame, "device": str(device)}
 
 
-def default_output_adapter(raw_output: Any, frame: dict[str, Any]) -> list[dict[str, Any]]:
+def default_output_adapter(raw_output: Any, frame: dict[str, Any]) -> DetectionBatch | list[dict[str, Any]]:
+    """Columnar ``DetectionBatch`` for tensor outputs; detection dicts are passed through."""
+    if isinstance(raw_output, DetectionBatch):
+        return raw_output
     if isinstance(raw_output, dict) and "detections" in raw_output:
         return _validate_detection_list(raw_output["detections"])
     if isinstance(raw_output, list):
@@ -18,15 +27,15 @@ def default_output_adapter(raw_output: Any, frame: dict[str, Any]) -> list[dict[
             return _validate_detection_list(raw_output)
         # Handle MMDet3D common output pattern [Det3DDataSample]
         if raw_output and hasattr(raw_output[0], "pred_instances_3d"):
-            return _mmdet3d_like_to_dets(raw_output[0].pred_instances_3d)
+            return _mmdet3d_like_to_batch(raw_output[0].pred_instances_3d)
     if hasattr(raw_output, "pred_instances_3d"):
-        return _mmdet3d_like_to_dets(raw_output.pred_instances_3d)
+        return _mmdet3d_like_to_batch(raw_output.pred_instances_3d)
     raise ValueError(
         "Output adapter could not parse raw model output. Provide detector.output_adapter in runtime YAML."
     )
 
 
-def _mmdet3d_like_to_dets(pred_instances_3d: Any) -> list[dict[str, Any]]:
+def _mmdet3d_like_to_batch(pred_instances_3d: Any) -> DetectionBatch:
     bboxes = None
     if hasattr(pred_instances_3d, "bboxes_3d"):
         b = pred_instances_3d.bboxes_3d
@@ -41,29 +50,32 @@ def _mmdet3d_like_to_dets(pred_instances_3d: Any) -> list[dict[str, Any]]:
         raise ValueError("MMDet3D-like output missing bboxes_3d/scores_3d/labels_3d")
 
     to_np = lambda x: x.detach().cpu().numpy() if hasattr(x, "detach") else np.asarray(x)
-    b_np = to_np(bboxes)
-    s_np = to_np(scores)
-    l_np = to_np(labels)
-
-    out: list[dict[str, Any]] = []
-    for i in range(len(b_np)):
-        bb = b_np[i]
-        if bb.shape[0] < 7:
-            continue
-        out.append(
-            {
-                "x": float(bb[0]),
-                "y": float(bb[1]),
-                "z": float(bb[2]),
-                "l": float(bb[3]),
-                "w": float(bb[4]),
-                "h": float(bb[5]),
-                "yaw": float(bb[6]),
-                "score": float(s_np[i]),
-                "label": int(l_np[i]),
-            }
-        )
-    return _validate_detection_list(out)
+    return boxes_to_batch(to_np(bboxes), to_np(scores), to_np(labels))
+
+
+def boxes_to_batch(
+    boxes: np.ndarray, scores: np.ndarray, label_ids: np.ndarray, class_names: Sequence[str] | None = None
+) -> DetectionBatch:
+    """Batch from mmdet3d-layout boxes ``(N, >=7)``, scores ``(N,)`` and integer class ids ``(N,)``.
+
+    Label names are ``class_names[id]``, or the id as a string (for
+    ``detector.label_map``) when no names are given.
+    """
+    boxes = np.asarray(boxes, dtype=float)
+    if boxes.ndim != 2 or boxes.shape[1] < 7:
+        return DetectionBatch.empty()
+    label_ids = np.asarray(label_ids, dtype=np.int64).reshape(-1)
+    z = boxes[:, _BOX_TO_MEAS]
+    z[:, 3] = wrap_angle_array(z[:, 3])
+    if class_names is None:
+        num = int(label_ids.max()) + 1 if label_ids.size else 0
+        class_names = [str(i) for i in range(num)]
+    return DetectionBatch(z, scores, label_ids, class_names)
+
+
+def rows_to_batch(rows: Sequence[dict[str, Any]], keep_raw: bool = False) -> DetectionBatch:
+    """Compatibility shim for output adapters that return one dict per detection."""
+    return DetectionBatch.from_rows(_validate_detection_list(list(rows)), keep_raw=keep_raw)
 
 
 def _validate_detection_list(dets: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
 import math
+from functools import lru_cache
+
+import numpy as np
+
+from cam3d_tracker.math_utils import wrap_angle, wrap_angle_array
+
+EGO_ROTATIONS = ("yaw", "quaternion")
 
 
 def quat_to_yaw(q_wxyz: list[float]) -> float:
@@ -10,6 +17,45 @@ def quat_to_yaw(q_wxyz: list[float]) -> float:
     return math.atan2(siny_cosp, cosy_cosp)
 
 
+def quat_to_yaw_array(q_wxyz: np.ndarray) -> np.ndarray:
+    """Yaw of each (w, x, y, z) row of an (M, 4) quaternion array."""
+    w, x, y, z = np.asarray(q_wxyz, dtype=float).reshape(-1, 4).T
+    return np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+def quat_to_rotation(q_wxyz: list[float]) -> np.ndarray:
+    w, x, y, z = np.asarray(q_wxyz, dtype=float) / np.linalg.norm(q_wxyz)
+    return np.array(
+        [
+            [1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)],
+            [2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)],
+            [2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)],
+        ]
+    )
+
+
+@lru_cache(maxsize=4096)
+def _pose_rotation(key: tuple[float, ...], rotation: str) -> np.ndarray:
+    # key is (yaw,) for yaw-only poses and the wxyz quaternion otherwise.
+    if rotation == "yaw":
+        c = math.cos(key[0])
+        s = math.sin(key[0])
+        rot = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+    else:
+        rot = quat_to_rotation(list(key))
+    rot.setflags(write=False)
+    return rot
+
+
+def pose_rotation(ego_pose: dict, rotation: str = "yaw") -> np.ndarray:
+    """Ego->global rotation matrix of a pose, cached per distinct pose."""
+    if rotation == "yaw":
+        return _pose_rotation((float(ego_pose["yaw"]),), rotation)
+    if rotation == "quaternion":
+        return _pose_rotation(tuple(float(v) for v in ego_pose["rotation"]), rotation)
+    raise ValueError(f"Unknown ego rotation '{rotation}'. Use one of {EGO_ROTATIONS}")
+
+
 def ego_to_global_xyzyaw(x: float, y: float, z: float, yaw: float, ego_pose: dict) -> tuple[float, float, float, float]:
     tx, ty, tz = ego_pose["translation"]
     ego_yaw = float(ego_pose["yaw"])
@@ -18,9 +64,26 @@ def ego_to_global_xyzyaw(x: float, y: float, z: float, yaw: float, ego_pose: dic
     gx = c * x - s * y + tx
     gy = s * x + c * y + ty
     gz = z + tz
-    gyaw = yaw + ego_yaw
-    while gyaw > math.pi:
-        gyaw -= 2.0 * math.pi
-    while gyaw < -math.pi:
-        gyaw += 2.0 * math.pi
-    return gx, gy, gz, gyaw
+    return gx, gy, gz, wrap_angle(yaw + ego_yaw)
+
+
+def ego_to_global_batch(xyzyaw: np.ndarray, ego_pose: dict, rotation: str = "yaw") -> np.ndarray:
+    """Transform an (M, 4) block of ego-frame [x, y, z, yaw] rows to the global frame.
+
+    ``rotation="yaw"`` applies only the pose heading (like ``ego_to_global_xyzyaw``),
+    ``"quaternion"`` applies the full pose rotation and takes the global yaw from
+    the rotated heading vector.
+    """
+    block = np.asarray(xyzyaw, dtype=float)
+    out = np.empty((block.shape[0], 4), dtype=float)
+    if block.shape[0] == 0:
+        return out
+    rot = pose_rotation(ego_pose, rotation)
+    out[:, :3] = block[:, :3] @ rot.T + np.asarray(ego_pose["translation"], dtype=float)
+    if rotation == "yaw":
+        out[:, 3] = wrap_angle_array(block[:, 3] + float(ego_pose["yaw"]))
+    else:
+        c = np.cos(block[:, 3])
+        s = np.sin(block[:, 3])
+        out[:, 3] = np.arctan2(rot[1, 0] * c + rot[1, 1] * s, rot[0, 0] * c + rot[0, 1] * s)
+    return out
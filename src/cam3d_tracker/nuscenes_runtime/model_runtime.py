@@ -1,9 +1,71 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+from pathlib import Path
 from typing import Any
 
+from cam3d_tracker.models import DetectionBatch
+
+from .adapters import rows_to_batch
 from .dynamic_import import import_symbol
 
+# Loaded runtimes kept for reuse within the process, keyed by everything that shapes the model.
+_WARM_RUNTIMES: dict[str, DetectorRuntime] = {}
+
+
+def prepared_checkpoint_path(checkpoint_path: str | Path, cache_dir: str | Path) -> Path:
+    """Where the cleaned state dict of ``checkpoint_path`` is cached.
+
+    The name is tied to the source file's resolved path, size and mtime, so a
+    replaced checkpoint gets a fresh entry instead of a stale one.
+    """
+    src = Path(checkpoint_path).resolve()
+    st = src.stat()
+    key = hashlib.sha1(f"{src}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{src.stem}.{key}.prepared.pt"
+
+
+def _clean_state_dict(ckpt: Any) -> dict[str, Any]:
+    state_dict = ckpt.get("state_dict", ckpt) if isinstance(ckpt, dict) else ckpt
+    if not isinstance(state_dict, dict):
+        raise ValueError("Checkpoint does not contain a valid state_dict")
+    return {(k[7:] if k.startswith("module.") else k): v for k, v in state_dict.items()}
+
+
+def _load_prepared(torch: Any, path: Path, mmap: bool) -> dict[str, Any]:
+    try:
+        # Tensors stay backed by the file; pages are read on first touch.
+        return torch.load(path, map_location="cpu", mmap=mmap, weights_only=True)
+    except TypeError:
+        # torch < 2.1: no mmap / weights_only arguments.
+        return torch.load(path, map_location="cpu")
+
+
+def load_state_dict(
+    torch: Any, checkpoint_path: str | Path, cache_dir: str | Path | None = None, mmap: bool = True
+) -> dict[str, Any]:
+    """Model-ready state dict of ``checkpoint_path`` (``module.`` prefixes stripped).
+
+    With ``cache_dir`` the cleaned dict is written there once, and later loads
+    read that file (memory-mapped when ``mmap``) instead of the full checkpoint.
+    """
+    if cache_dir is None:
+        return _clean_state_dict(torch.load(checkpoint_path, map_location="cpu"))
+
+    prepared = prepared_checkpoint_path(checkpoint_path, cache_dir)
+    if prepared.exists():
+        return _load_prepared(torch, prepared, mmap)
+
+    state = _clean_state_dict(torch.load(checkpoint_path, map_location="cpu"))
+    prepared.parent.mkdir(parents=True, exist_ok=True)
+    # Concurrent workers may prepare the same checkpoint; each renames its own complete file into place.
+    tmp = prepared.with_name(f"{prepared.name}.{os.getpid()}.tmp")
+    torch.save(state, tmp)
+    os.replace(tmp, prepared)
+    return state
+
 
 class DetectorRuntime:
     def __init__(
@@ -14,6 +76,8 @@ class DetectorRuntime:
         device: str,
         input_adapter_path: str,
         output_adapter_path: str,
+        checkpoint_cache_dir: str | None = None,
+        mmap_checkpoint: bool = True,
     ) -> None:
         try:
             import torch
@@ -26,19 +90,10 @@ class DetectorRuntime:
         output_adapter = import_symbol(output_adapter_path)
 
         self.model = model_class(**(model_kwargs or {}))
-        ckpt = torch.load(checkpoint_path, map_location="cpu")
-        state_dict = ckpt.get("state_dict", ckpt)
-        if not isinstance(state_dict, dict):
-            raise ValueError("Checkpoint does not contain a valid state_dict")
-
-        clean_state = {}
-        for k, v in state_dict.items():
-            if k.startswith("module."):
-                clean_state[k[7:]] = v
-            else:
-                clean_state[k] = v
+        clean_state = load_state_dict(torch, checkpoint_path, checkpoint_cache_dir, mmap_checkpoint)
 
-        missing, unexpected = self.model.load_state_dict(clean_state, strict=False)
+        mmapped = checkpoint_cache_dir is not None and mmap_checkpoint
+        missing, unexpected = self._load_into_model(clean_state, mmapped)
         if missing:
             print(f"[nuscenes_runtime] warning: missing keys: {len(missing)}")
         if unexpected:
@@ -51,7 +106,33 @@ class DetectorRuntime:
         self.input_adapter = input_adapter
         self.output_adapter = output_adapter
 
-    def infer(self, frame: dict[str, Any]) -> list[dict[str, Any]]:
+    def _load_into_model(self, state: dict[str, Any], mmapped: bool) -> tuple[list[str], list[str]]:
+        if mmapped:
+            try:
+                # Adopt the file-backed tensors instead of paging them all in to copy into fresh parameters.
+                return self.model.load_state_dict(state, strict=False, assign=True)
+            except TypeError:
+                # torch < 2.1: no assign argument.
+                pass
+        return self.model.load_state_dict(state, strict=False)
+
+    @classmethod
+    def warm(cls, **kwargs: Any) -> DetectorRuntime:
+        """A runtime built with ``kwargs``, reused if this process already loaded the same one."""
+        key = json.dumps(kwargs, sort_keys=True, default=str)
+        runtime = _WARM_RUNTIMES.get(key)
+        if runtime is None:
+            runtime = _WARM_RUNTIMES[key] = cls(**kwargs)
+        return runtime
+
+    def infer_batch(self, frame: dict[str, Any], keep_raw: bool = False) -> DetectionBatch:
+        """Detections of one frame as a ``DetectionBatch``, whichever form the output adapter returns."""
+        out = self.infer(frame)
+        if isinstance(out, DetectionBatch):
+            return out
+        return rows_to_batch(out, keep_raw=keep_raw)
+
+    def infer(self, frame: dict[str, Any]) -> DetectionBatch | list[dict[str, Any]]:
         with self._torch.no_grad():
             model_input = self.input_adapter(frame=frame, device=self.device, torch=self._torch)
             if hasattr(self.model, "predict"):
@@ -59,3 +140,7 @@ class DetectorRuntime:
             else:
                 raw = self.model(model_input)
         return self.output_adapter(raw_output=raw, frame=frame)
+
+
+def clear_warm_runtimes() -> None:
+    _WARM_RUNTIMES.clear()
@@ -2,35 +2,131 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+import numpy as np
 
 from cam3d_tracker.config import load_config
-from cam3d_tracker.math_utils import wrap_angle
-from cam3d_tracker.models import Detection3D
-from cam3d_tracker.tracker import Classical3DTracker
+from cam3d_tracker.delta_tracks import DeltaTrackEncoder
+from cam3d_tracker.io_utils import save_delta_tracks
+from cam3d_tracker.math_utils import wrap_angle_array
+from cam3d_tracker.models import DetectionBatch
+from cam3d_tracker.pipeline import decimate_frames, track_output_format
+from cam3d_tracker.tiling import make_tracker
 
 from .model_runtime import DetectorRuntime
 from .nuscenes_provider import load_nuscenes_frames
-from .math3d import ego_to_global_xyzyaw
+from .math3d import ego_to_global_batch
 
+_EGO_ORIGIN = {"translation": [0.0, 0.0, 0.0], "yaw": 0.0}
 
-def run_nuscenes_tracking(runtime_cfg: dict[str, Any]) -> None:
-    ncfg = runtime_cfg["nuscenes"]
-    dcfg = runtime_cfg["detector"]
-    tcfg = runtime_cfg["tracker"]
-    ocfg = runtime_cfg["output"]
+PIPELINE_MODES = ("in_process", "two_process")
 
-    tracker_cfg = load_config(tcfg["config_path"]).raw
-    tracker = Classical3DTracker(tracker_cfg)
 
-    runtime = DetectorRuntime(
+def _label_name(label: Any, label_map: dict) -> str:
+    # Class ids (ints, or their string form from array adapters) go through the label map.
+    if isinstance(label, str) and label.lstrip("-").isdigit():
+        label = int(label)
+    if isinstance(label, int):
+        label = label_map.get(str(label), label_map.get(int(label), str(label)))
+    return str(label)
+
+
+def _make_runtime(dcfg: dict[str, Any]) -> DetectorRuntime:
+    kwargs = dict(
         model_class_path=dcfg["model_class"],
         checkpoint_path=dcfg["checkpoint_path"],
         model_kwargs=dcfg.get("model_kwargs", {}),
         device=dcfg.get("device", "cpu"),
         input_adapter_path=dcfg.get("input_adapter", "cam3d_tracker.nuscenes_runtime.adapters:default_input_adapter"),
         output_adapter_path=dcfg.get("output_adapter", "cam3d_tracker.nuscenes_runtime.adapters:default_output_adapter"),
+        checkpoint_cache_dir=dcfg.get("checkpoint_cache_dir"),
+        mmap_checkpoint=bool(dcfg.get("mmap_checkpoint", True)),
+    )
+    if bool(dcfg.get("keep_warm", False)):
+        return DetectorRuntime.warm(**kwargs)
+    return DetectorRuntime(**kwargs)
+
+
+def _detect(runtime: DetectorRuntime, frame: dict[str, Any], dcfg: dict[str, Any]) -> DetectionBatch:
+    """Run the detector on one frame: score-filtered, label-mapped detections in the tracking frame."""
+    batch = runtime.infer_batch(frame, keep_raw=bool(dcfg.get("keep_raw_detections", False)))
+    keep = batch.scores >= float(dcfg.get("min_score", 0.0))
+    if not keep.all():
+        batch = batch.select(keep)
+    if not len(batch):
+        return DetectionBatch.empty()
+
+    z = batch.z.copy()
+    z[:, 3] = wrap_angle_array(z[:, 3])
+    if bool(dcfg.get("detections_in_ego_frame", True)) and bool(dcfg.get("transform_ego_to_global", True)):
+        if not frame.get("ego_pose"):
+            raise ValueError("Missing ego pose in frame; cannot transform ego->global")
+        z[:, :4] = ego_to_global_batch(z[:, :4], frame["ego_pose"], rotation=str(dcfg.get("ego_rotation", "yaw")))
+    # The label map applies once per vocabulary entry, not per detection. Entries mapped to one
+    # name share one code, so the prefilter's per-code NMS and top-k see them as one class.
+    label_map = dcfg.get("label_map", {})
+    names, lut = np.unique([_label_name(name, label_map) for name in batch.label_names], return_inverse=True)
+    codes = lut.reshape(-1)[batch.label_codes]
+    return DetectionBatch(z, batch.scores, codes, names.tolist(), batch.raw)
+
+
+def _roi_pose(frame: dict[str, Any], dcfg: dict[str, Any]) -> dict[str, Any] | None:
+    # Detections left in the ego frame are culled around the origin.
+    if bool(dcfg.get("detections_in_ego_frame", True)) and not bool(dcfg.get("transform_ego_to_global", True)):
+        return _EGO_ORIGIN
+    return frame.get("ego_pose")
+
+
+def _in_process_batches(
+    frames: list[dict[str, Any]], dcfg: dict[str, Any]
+) -> Iterator[tuple[dict[str, Any], DetectionBatch]]:
+    runtime = _make_runtime(dcfg)
+    for frame in frames:
+        yield frame, _detect(runtime, frame, dcfg)
+
+
+def _detect_into_ring(writer: Any, start: int, dcfg: dict[str, Any], frames: list[dict[str, Any]]) -> None:
+    """Detector process of the two-process mode: frames ``start..`` into the shared-memory ring."""
+    runtime = _make_runtime(dcfg)
+    for seq in range(start, len(frames)):
+        batch = _detect(runtime, frames[seq], dcfg)
+        # Label codes index the frame's own names, which travel with it, as in the in-process mode.
+        writer.put(seq, batch.z, batch.scores, batch.label_codes, batch.label_names)
+
+
+def _two_process_batches(
+    frames: list[dict[str, Any]], dcfg: dict[str, Any], pcfg: dict[str, Any]
+) -> Iterator[tuple[dict[str, Any], DetectionBatch]]:
+    from .shm_ring import consume_ring
+
+    if bool(dcfg.get("keep_raw_detections", False)):
+        raise ValueError("detector.keep_raw_detections is not supported with pipeline.mode: two_process")
+    ring = consume_ring(
+        _detect_into_ring,
+        (dcfg, frames),
+        slots=int(pcfg.get("ring_slots", 8)),
+        max_detections=int(pcfg.get("max_detections", 512)),
+        max_restarts=int(pcfg.get("max_restarts", 2)),
+        start_method=str(pcfg.get("start_method", "spawn")),
     )
+    for seq, z, scores, codes, names in ring:
+        # Views into shared memory; the slot is released when the tracker asks for the next frame.
+        yield frames[seq], DetectionBatch(z, scores, codes, names)
+
+
+def run_nuscenes_tracking(runtime_cfg: dict[str, Any]) -> None:
+    ncfg = runtime_cfg["nuscenes"]
+    dcfg = runtime_cfg["detector"]
+    tcfg = runtime_cfg["tracker"]
+    ocfg = runtime_cfg["output"]
+    pcfg = runtime_cfg.get("pipeline", {})
+
+    mode = str(pcfg.get("mode", "in_process"))
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline.mode '{mode}'. Use one of {PIPELINE_MODES}")
+
+    tracker_cfg = load_config(tcfg["config_path"]).raw
 
     frames = load_nuscenes_frames(
         dataroot=ncfg["dataroot"],
@@ -39,58 +135,32 @@ def run_nuscenes_tracking(runtime_cfg: dict[str, Any]) -> None:
         max_frames=ncfg.get("max_frames"),
         camera_order=ncfg.get("camera_order"),
     )
+    # Decimate before inference so skipped samples cost no detector time either.
+    frames = decimate_frames(frames, tracker_cfg.get("decimation", {}), lambda f: f.get("is_keyframe", True))
 
-    label_map = dcfg.get("label_map", {})
-    assume_ego_frame = bool(dcfg.get("detections_in_ego_frame", True))
-    to_global = bool(dcfg.get("transform_ego_to_global", True))
-    min_score = float(dcfg.get("min_score", 0.0))
+    io_cfg = tracker_cfg.get("io", {})
+    encoder = DeltaTrackEncoder(io_cfg.get("delta_precision")) if track_output_format(io_cfg) == "delta" else None
+
+    if mode == "two_process":
+        batches = _two_process_batches(frames, dcfg, pcfg)
+    else:
+        batches = _in_process_batches(frames, dcfg)
 
     all_rows: list[dict[str, Any]] = []
-    for frame in frames:
-        det_rows = runtime.infer(frame)
-        dets: list[Detection3D] = []
-        for d in det_rows:
-            score = float(d["score"])
-            if score < min_score:
+    with make_tracker(tracker_cfg) as tracker:
+        for frame, dets in batches:
+            outs = tracker.step_batch(frame["timestamp_s"], dets, ego_pose=_roi_pose(frame, dcfg))
+            if encoder is not None:
+                encoder.add(frame["timestamp_s"], outs, sample_token=frame["sample_token"])
                 continue
-
-            label = d["label"]
-            if isinstance(label, int):
-                label = label_map.get(str(label), label_map.get(int(label), str(label)))
-            label = str(label)
-
-            x = float(d["x"])
-            y = float(d["y"])
-            z = float(d["z"])
-            yaw = wrap_angle(float(d["yaw"]))
-            if assume_ego_frame and to_global:
-                if not frame.get("ego_pose"):
-                    raise ValueError("Missing ego pose in frame; cannot transform ego->global")
-                x, y, z, yaw = ego_to_global_xyzyaw(x, y, z, yaw, frame["ego_pose"])
-
-            dets.append(
-                Detection3D(
-                    x=x,
-                    y=y,
-                    z=z,
-                    yaw=yaw,
-                    l=float(d["l"]),
-                    w=float(d["w"]),
-                    h=float(d["h"]),
-                    score=score,
-                    label=label,
-                    raw=d,
-                )
-            )
-
-        outs = tracker.step(frame["timestamp_s"], dets)
-        for out in outs:
-            row = out.to_dict()
-            row["timestamp_s"] = frame["timestamp_s"]
-            row["sample_token"] = frame["sample_token"]
-            all_rows.append(row)
+            for row in outs.to_rows(frame["timestamp_s"]):
+                row["sample_token"] = frame["sample_token"]
+                all_rows.append(row)
 
     out_path = Path(ocfg["path"])
     out_path.parent.mkdir(parents=True, exist_ok=True)
+    if encoder is not None:
+        save_delta_tracks(out_path, encoder.payload())
+        return
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump({"tracks": all_rows}, f, indent=2)
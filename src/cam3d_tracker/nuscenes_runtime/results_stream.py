@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from json.decoder import scanstring
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+import numpy as np
+
+from .math3d import quat_to_yaw_array
+
+_WS = re.compile(r"\s*")
+_EMPTY_LIST = re.compile(r"\[\s*\]")
+# A sample's list ends where its last annotation object closes the list.
+_OBJECT_LIST_END = re.compile(r"\}\s*\]")
+
+
+class _Reader:
+    """Growable text window over a file; consumed text is dropped as parsing advances."""
+
+    def __init__(self, f: IO[str], chunk_chars: int) -> None:
+        self.f = f
+        self.chunk = chunk_chars
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                raise ValueError("Unexpected end of results JSON")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"Expected '{ch}' at results JSON offset ~{self.pos}, got '{self.buf[self.pos]}'")
+        self.pos += 1
+
+    def string(self) -> str:
+        self.expect('"')
+        while True:
+            try:
+                value, end = scanstring(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self, decoder: json.JSONDecoder) -> None:
+        self.peek()
+        while True:
+            try:
+                _, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            # A bare number can decode early at the window edge; make sure it is complete.
+            if end == len(self.buf) and self.more():
+                continue
+            self.pos = end
+            return
+
+    def list_text(self) -> str:
+        if self.peek() != "[":
+            raise ValueError(f"Expected a list of annotations at results JSON offset ~{self.pos}")
+        while True:
+            m = _EMPTY_LIST.match(self.buf, self.pos) or _OBJECT_LIST_END.search(self.buf, self.pos)
+            if m is not None:
+                text = self.buf[self.pos : m.end()]
+                self.pos = m.end()
+                return text
+            if not self.more():
+                raise ValueError("Unterminated annotation list in results JSON")
+
+
+def iter_result_slices(path: str | Path, chunk_chars: int = 1 << 23) -> Iterator[tuple[str, str]]:
+    """Yield ``(sample_token, annotation_list_json)`` from a nuScenes results file without loading it whole.
+
+    Only ``results`` is split; other top-level keys are skipped. Each sample's
+    list is located by its closing ``}]`` (annotations are flat objects, as in
+    every nuScenes results file) and returned as raw JSON text, so callers can
+    decode it wherever it is cheapest.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        r = _Reader(f, chunk_chars)
+        r.expect("{")
+        while r.peek() != "}":
+            key = r.string()
+            r.expect(":")
+            if key != "results":
+                r.skip_value(decoder)
+            else:
+                r.expect("{")
+                while r.peek() != "}":
+                    token = r.string()
+                    r.expect(":")
+                    yield token, r.list_text()
+                    if r.peek() == ",":
+                        r.pos += 1
+                r.pos += 1
+            if r.peek() == ",":
+                r.pos += 1
+
+
+def convert_annotations(annos: list[dict[str, Any]], allowed_labels: set[str]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """nuScenes annotations -> measurement rows (M, 7), scores (M,) and labels."""
+    # Tracking-only entries have no detection_name; this bridge is detection-only.
+    keep = [a for a in annos if a.get("detection_name") and (not allowed_labels or a["detection_name"] in allowed_labels)]
+    if not keep:
+        return np.empty((0, 7)), np.empty(0), []
+    t = np.array([a["translation"] for a in keep], dtype=float)
+    s = np.array([a["size"] for a in keep], dtype=float)  # nuScenes order: [w, l, h]
+    q = np.array([a["rotation"] for a in keep], dtype=float)
+    z = np.column_stack([t, quat_to_yaw_array(q), s[:, 1], s[:, 0], s[:, 2]])
+    scores = np.array([a["detection_score"] for a in keep], dtype=float)
+    return z, scores, [str(a["detection_name"]) for a in keep]
+
+
+def _convert_chunk(items: list[tuple[str, str, float]], allowed_labels: set[str]) -> list[str]:
+    frames: list[str] = []
+    for token, text, ts in items:
+        try:
+            annos = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Results for sample '{token}' are not a list of flat annotation objects") from exc
+        z, scores, labels = convert_annotations(annos, allowed_labels)
+        frames.append(
+            json.dumps(
+                {"timestamp_s": ts, "sample_token": token, "z": z.tolist(), "scores": scores.tolist(), "labels": labels}
+            )
+        )
+    return frames
+
+
+def convert_results_stream(
+    results_nusc_path: str | Path,
+    token_to_timestamp_s: dict[str, float],
+    output_path: str | Path,
+    allowed_labels: set[str],
+    trace_tokens: set[str] | None = None,
+    workers: int = 1,
+    tokens_per_task: int = 64,
+) -> int:
+    """Convert a results file into columnar tracker frames, writing them as they are produced.
+
+    Samples are decoded and converted in ``workers`` processes, ``tokens_per_task``
+    at a time, with at most two tasks per worker in flight, so memory stays
+    bounded by the window rather than the file size. Frames keep the input
+    order; ``load_frames`` sorts them by timestamp.
+    """
+
+    def tasks() -> Iterator[list[tuple[str, str, float]]]:
+        chunk: list[tuple[str, str, float]] = []
+        for token, text in iter_result_slices(results_nusc_path):
+            if token not in token_to_timestamp_s:
+                continue
+            if trace_tokens is not None and token not in trace_tokens:
+                continue
+            chunk.append((token, text, token_to_timestamp_s[token]))
+            if len(chunk) >= tokens_per_task:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    n_frames = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        out.write('{"schema": "cam3d_detections_v1", "frames": [\n')
+
+        def write(frames: list[str]) -> None:
+            nonlocal n_frames
+            for frame in frames:
+                out.write(",\n" if n_frames else "")
+                out.write(frame)
+                n_frames += 1
+
+        if workers <= 1:
+            for chunk in tasks():
+                write(_convert_chunk(chunk, allowed_labels))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: deque = deque()
+                for chunk in tasks():
+                    pending.append(pool.submit(_convert_chunk, chunk, allowed_labels))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+        out.write("\n]}\n")
+    return n_frames
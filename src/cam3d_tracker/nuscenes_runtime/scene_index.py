@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+INDEX_NAME = "index.json"
+
+
+def select_scenes(
+    scenes: list[dict[str, Any]],
+    names: list[str] | None = None,
+    patterns: list[str] | None = None,
+    split: str | None = None,
+) -> list[dict[str, Any]]:
+    """Scenes matching any of ``names``, glob ``patterns`` or the devkit ``split``, in table order."""
+    wanted = set(names or [])
+    if split:
+        from nuscenes.utils.splits import create_splits_scenes
+
+        split_scenes = create_splits_scenes().get(split)
+        if not split_scenes:
+            raise ValueError(f"Unknown split '{split}'. Use one of train/val/test/mini_train/mini_val/...")
+        wanted.update(split_scenes)
+
+    out = [s for s in scenes if s["name"] in wanted or any(fnmatch.fnmatch(s["name"], p) for p in patterns or [])]
+    missing = sorted(set(names or []) - {s["name"] for s in out})
+    if missing:
+        raise ValueError(f"Scenes not found: {', '.join(missing)}")
+    return out
+
+
+class SceneTables:
+    """Samples of a NuScenes instance grouped per scene, and annotations indexed by token, in one pass."""
+
+    def __init__(self, nusc: Any) -> None:
+        self.version = nusc.version
+        self.scenes = nusc.scene
+        self.samples_by_scene: dict[str, list[dict[str, Any]]] = {}
+        for sample in nusc.sample:
+            self.samples_by_scene.setdefault(sample["scene_token"], []).append(sample)
+        # Timestamps increase along sample -> next, so sorting reproduces the linked order.
+        for samples in self.samples_by_scene.values():
+            samples.sort(key=lambda s: s["timestamp"])
+        self.ann_by_token = {ann["token"]: ann for ann in nusc.sample_annotation}
+
+    def samples(self, scene: dict[str, Any]) -> list[dict[str, Any]]:
+        return self.samples_by_scene.get(scene["token"], [])
+
+    def trace(self, scene: dict[str, Any]) -> tuple[list[str], dict[str, float]]:
+        samples = self.samples(scene)
+        return [s["token"] for s in samples], {s["token"]: float(s["timestamp"]) * 1e-6 for s in samples}
+
+    def annotations(self, sample: dict[str, Any]) -> list[dict[str, Any]]:
+        return [self.ann_by_token[t] for t in sample["anns"]]
+
+
+_WORKER_TABLES: SceneTables | None = None
+
+
+def _run_one(build: Callable, scene: dict[str, Any], out_dir: Path) -> dict[str, Any]:
+    return build(_WORKER_TABLES, scene, out_dir)
+
+
+def build_scene_shards(
+    tables: SceneTables,
+    scenes: list[dict[str, Any]],
+    out_dir: str | Path,
+    build: Callable[[SceneTables, dict[str, Any], Path], dict[str, Any]],
+    workers: int = 1,
+) -> list[dict[str, Any]]:
+    """Run ``build(tables, scene, out_dir)`` per scene and return its index entries in scene order.
+
+    Workers are forked so they share the loaded tables instead of pickling them;
+    without fork support the scenes are built serially.
+    """
+    global _WORKER_TABLES
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if workers <= 1 or len(scenes) <= 1 or "fork" not in mp.get_all_start_methods():
+        return [build(tables, s, out_dir) for s in scenes]
+
+    _WORKER_TABLES = tables
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(scenes)), mp_context=mp.get_context("fork")) as pool:
+            return list(pool.map(_run_one, [build] * len(scenes), scenes, [out_dir] * len(scenes)))
+    finally:
+        _WORKER_TABLES = None
+
+
+def write_index(out_dir: str | Path, version: str, entries: list[dict[str, Any]]) -> Path:
+    """Merge per-scene entries into ``out_dir/index.json``, keyed by scene name.
+
+    Entries from other scripts writing to the same directory (trace and GT
+    shards) are kept and extended.
+    """
+    path = Path(out_dir) / INDEX_NAME
+    index: dict[str, Any] = {"version": version, "scenes": {}}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != version:
+            raise ValueError(f"{path} belongs to {index.get('version')}, not {version}")
+    for entry in entries:
+        index["scenes"].setdefault(entry["scene_name"], {}).update(entry)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return path
+
+
+def build_trace_shard(tables: SceneTables, scene: dict[str, Any], out_dir: Path) -> dict[str, Any]:
+    """Write ``<scene>_tokens.json`` and ``<scene>_timestamps.json``; return the scene's index entry."""
+    tokens, token_to_ts = tables.trace(scene)
+    name = scene["name"]
+    write_json(out_dir / f"{name}_tokens.json", {"version": tables.version, "scene_name": name, "sample_tokens": tokens})
+    write_json(out_dir / f"{name}_timestamps.json", token_to_ts)
+    return {
+        "scene_name": name,
+        "num_samples": len(tokens),
+        "tokens": f"{name}_tokens.json",
+        "timestamps": f"{name}_timestamps.json",
+    }
+
+
+def add_scene_args(p: Any) -> None:
+    p.add_argument("--scene-name", nargs="+", default=[], help="Scene name(s), e.g. scene-0103")
+    p.add_argument("--scene-glob", nargs="+", default=[], help="Scene name glob(s), e.g. 'scene-01*'")
+    p.add_argument("--split", help="Whole devkit split, e.g. val or mini_val")
+    p.add_argument("--out-dir", help="Write one shard per scene plus index.json here")
+    p.add_argument("--workers", type=int, default=1, help="Processes used to build scenes (with --out-dir)")
+
+
+def write_json(path: str | Path, payload: Any) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
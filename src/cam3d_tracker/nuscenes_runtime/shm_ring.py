@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from cam3d_tracker.models import MEAS_FIELDS
+
+_MEAS_DIM = len(MEAS_FIELDS)
+
+
+class DetectionRing:
+    """``slots`` fixed-size detection frames (z, scores, label codes) in one shared-memory block."""
+
+    def __init__(self, shm: SharedMemory, slots: int, max_detections: int) -> None:
+        self.shm = shm
+        self.slots = slots
+        self.max_detections = max_detections
+        m = max_detections
+        self.z = np.ndarray((slots, m, _MEAS_DIM), dtype=np.float64, buffer=shm.buf)
+        offset = self.z.nbytes
+        self.scores = np.ndarray((slots, m), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += self.scores.nbytes
+        self.codes = np.ndarray((slots, m), dtype=np.int64, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def nbytes(slots: int, max_detections: int) -> int:
+        return slots * max_detections * (_MEAS_DIM + 2) * 8
+
+    @classmethod
+    def create(cls, slots: int, max_detections: int) -> DetectionRing:
+        return cls(SharedMemory(create=True, size=cls.nbytes(slots, max_detections)), slots, max_detections)
+
+    @classmethod
+    def attach(cls, name: str, slots: int, max_detections: int) -> DetectionRing:
+        return cls(SharedMemory(name=name), slots, max_detections)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, z: np.ndarray, scores: np.ndarray, codes: np.ndarray) -> int:
+        """Copy one frame into ``slot``; a frame larger than ``max_detections`` raises ``ValueError``."""
+        n = len(scores)
+        if n > self.max_detections:
+            raise ValueError(f"frame has {n} detections; raise pipeline.max_detections (now {self.max_detections})")
+        self.z[slot, :n] = z
+        self.scores[slot, :n] = scores
+        self.codes[slot, :n] = codes
+        return n
+
+    def view(self, slot: int, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.z[slot, :n], self.scores[slot, :n], self.codes[slot, :n]
+
+    def close(self) -> None:
+        # Views into the buffer must be gone before the mapping can be closed.
+        del self.z, self.scores, self.codes
+        self.shm.close()
+
+
+class RingWriter:
+    """Producer side: blocks while every slot is still waiting for the consumer."""
+
+    def __init__(self, ring: DetectionRing, free: Any, ready: Any) -> None:
+        self.ring = ring
+        self.free = free
+        self.ready = ready
+
+    def put(self, seq: int, z: np.ndarray, scores: np.ndarray, codes: np.ndarray, meta: Any = None) -> None:
+        """Publish frame ``seq``; ``meta`` is a small picklable value sent along with it through the queue."""
+        self.free.acquire()
+        n = self.ring.write(seq % self.ring.slots, z, scores, codes)
+        self.ready.put((seq, n, meta))
+
+
+def _producer_main(
+    ring_name: str, slots: int, max_detections: int, free: Any, ready: Any, start: int, target: Callable, args: tuple
+) -> None:
+    ring = DetectionRing.attach(ring_name, slots, max_detections)
+    try:
+        target(RingWriter(ring, free, ready), start, *args)
+        ready.put(None)
+    except Exception:
+        # Not a crash to restart from: the same frame would fail again.
+        ready.put(RuntimeError(f"detector process failed:\n{traceback.format_exc()}"))
+    finally:
+        ring.close()
+
+
+def consume_ring(
+    target: Callable[..., None],
+    args: tuple = (),
+    slots: int = 8,
+    max_detections: int = 512,
+    max_restarts: int = 2,
+    start_method: str = "spawn",
+    poll_s: float = 0.5,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray, np.ndarray, Any]]:
+    """Run ``target(writer, start, *args)`` in a child process and yield ``(seq, z, scores, codes, meta)`` in order.
+
+    ``target`` must call ``writer.put(seq, ...)`` for ``seq = start, start + 1, ...``.
+    Yielded arrays are views into shared memory, valid until the next
+    iteration, when their slot is handed back to the producer. If the producer
+    dies, it is restarted at the first unconsumed ``seq`` up to
+    ``max_restarts`` times; an exception raised by ``target`` is re-raised
+    here instead. The shared-memory block is always unlinked on exit.
+    """
+    ctx = mp.get_context(start_method)
+    ring = DetectionRing.create(slots, max_detections)
+    proc = None
+    next_seq = 0
+    restarts = 0
+    try:
+        while True:
+            # Fresh semaphore and queue per producer: a crash can leave a slot acquired but never published.
+            free = ctx.Semaphore(slots)
+            ready = ctx.Queue()
+            proc = ctx.Process(
+                target=_producer_main,
+                args=(ring.name, slots, max_detections, free, ready, next_seq, target, args),
+                daemon=True,
+            )
+            proc.start()
+            finished = False
+            dead_polls = 0
+            while True:
+                try:
+                    msg = ready.get(timeout=poll_s)
+                except queue.Empty:
+                    if proc.is_alive():
+                        continue
+                    # One more poll picks up messages still in flight from the dead producer.
+                    dead_polls += 1
+                    if dead_polls > 1:
+                        break
+                    continue
+                if msg is None:
+                    finished = True
+                    break
+                if isinstance(msg, BaseException):
+                    raise msg
+                seq, n, meta = msg
+                yield (seq, *ring.view(seq % slots, n), meta)
+                next_seq = seq + 1
+                free.release()
+            proc.join()
+            if finished:
+                return
+            restarts += 1
+            if restarts > max_restarts:
+                raise RuntimeError(
+                    f"Detector process died {restarts} times (last exit code {proc.exitcode}) at frame {next_seq}"
+                )
+            print(f"[nuscenes_runtime] detector process exited with {proc.exitcode}; restarting at frame {next_seq}")
+    finally:
+        if proc is not None and proc.is_alive():
+            proc.kill()
+            proc.join()
+        try:
+            ring.close()
+        except BufferError:
+            # The consumer still holds a yielded view (it raised mid-frame); the mapping goes with the process.
+            pass
+        ring.shm.unlink()
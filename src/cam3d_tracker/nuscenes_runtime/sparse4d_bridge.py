@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
-import math
 import os
 import subprocess
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from cam3d_tracker.pipeline import run_tracking
+from cam3d_tracker.config import load_config
+from cam3d_tracker.delta_tracks import encode_rows
+from cam3d_tracker.io_utils import load_tracks, save_delta_tracks
+from cam3d_tracker.pipeline import run_tracking, track_output_format
+
+from .results_stream import convert_results_stream
+from .sparse4d_shards import ShardJob, run_shards, write_shard_ann_files
 
 
 DEFAULT_ALLOWED_LABELS = {
@@ -28,6 +33,11 @@ def run_sparse4d_to_tracker(cfg: dict[str, Any]) -> None:
     tcfg = cfg["tracker"]
     ocfg = cfg["output"]
 
+    shard_cfg = scfg.get("shards", {})
+    if bool(scfg.get("run_inference", True)) and int(shard_cfg.get("num_shards", 0)) > 1:
+        _run_sharded(cfg, shard_cfg)
+        return
+
     if bool(scfg.get("run_inference", True)):
         _run_sparse4d_detection_only(scfg)
 
@@ -43,6 +53,8 @@ def run_sparse4d_to_tracker(cfg: dict[str, Any]) -> None:
         output_path=detections_json,
         allowed_labels=allowed,
         trace_tokens=trace_tokens,
+        workers=int(ccfg.get("workers", 1)),
+        tokens_per_task=int(ccfg.get("tokens_per_task", 64)),
     )
 
     run_tracking(
@@ -52,16 +64,135 @@ def run_sparse4d_to_tracker(cfg: dict[str, Any]) -> None:
     )
 
 
+def _run_sharded(cfg: dict[str, Any], shard_cfg: dict[str, Any]) -> None:
+    """Run Sparse4D over scene-aligned shards concurrently; convert and track each shard as soon as it finishes.
+
+    Shard outputs are merged into the configured detections/tracks files in
+    dataset order, with track ids offset so they stay unique.
+    """
+    scfg = cfg["sparse4d"]
+    ccfg = cfg["conversion"]
+    ocfg = cfg["output"]
+    repo_root = Path(scfg["repo_root"]).resolve()
+    results_name = Path(scfg["results_nusc_path"]).name
+    work_dir = Path(shard_cfg.get("work_dir") or Path(ocfg["detections_path"]).parent / "sparse4d_shards").resolve()
+
+    token_to_ts = _load_token_timestamps(ccfg)
+    trace_tokens = _load_trace_tokens(ccfg)
+    allowed = set(ccfg.get("allowed_labels", sorted(DEFAULT_ALLOWED_LABELS)))
+    jobs = write_shard_ann_files(
+        _resolve(repo_root, scfg["ann_file"]), int(shard_cfg["num_shards"]), work_dir, results_name, trace_tokens
+    )
+
+    finished = run_shards(
+        jobs,
+        lambda job: _detection_command(scfg, str(job.ann_file), job.format_dir),
+        cwd=repo_root,
+        env=_detector_env(repo_root),
+        max_concurrent=int(shard_cfg.get("max_concurrent", 1)),
+        cpu_affinity=shard_cfg.get("cpu_affinity") or (),
+        slot_env=shard_cfg.get("slot_env") or (),
+        max_retries=int(shard_cfg.get("max_retries", 1)),
+        poll_s=float(shard_cfg.get("poll_s", 1.0)),
+    )
+    for job in finished:
+        _convert_sparse4d_results_to_tracker_input(
+            results_nusc_path=job.results_path,
+            token_to_timestamp_s=token_to_ts,
+            output_path=_shard_detections(job),
+            allowed_labels=allowed,
+            trace_tokens=trace_tokens,
+            workers=int(ccfg.get("workers", 1)),
+            tokens_per_task=int(ccfg.get("tokens_per_task", 64)),
+        )
+        run_tracking(
+            config_path=cfg["tracker"]["config_path"],
+            detections_path=str(_shard_detections(job)),
+            output_path=str(_shard_tracks(job)),
+        )
+
+    io_cfg = load_config(cfg["tracker"]["config_path"]).raw.get("io", {})
+    _merge_shard_outputs(jobs, Path(ocfg["detections_path"]), Path(ocfg["tracks_path"]), io_cfg)
+
+
+def _shard_detections(job: ShardJob) -> Path:
+    return job.format_dir / "detections_for_tracker.json"
+
+
+def _shard_tracks(job: ShardJob) -> Path:
+    return job.format_dir / "tracks.json"
+
+
+def _merge_shard_outputs(jobs: list[ShardJob], detections_path: Path, tracks_path: Path, io_cfg: dict[str, Any]) -> None:
+    """Concatenate the shard outputs in dataset order, holding one shard in memory at a time."""
+    for path in (detections_path, tracks_path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    _dump_json_list(detections_path, {"schema": "cam3d_detections_v1"}, "frames", _shard_frames(jobs))
+    if track_output_format(io_cfg) == "delta":
+        # Shards are re-encoded together; decoded values are already on the quantization grid.
+        save_delta_tracks(tracks_path, encode_rows(_shard_track_rows(jobs), io_cfg.get("delta_precision")))
+        return
+    _dump_json_list(tracks_path, {}, "tracks", _shard_track_rows(jobs))
+
+
+def _shard_frames(jobs: list[ShardJob]) -> Iterator[dict[str, Any]]:
+    for job in jobs:
+        with open(_shard_detections(job), "r", encoding="utf-8") as f:
+            frames = json.load(f)["frames"]
+        yield from frames
+
+
+def _shard_track_rows(jobs: list[ShardJob]) -> Iterator[dict[str, Any]]:
+    # Each shard numbers its tracks from 1; offset them past the previous shards' ids.
+    id_offset = 0
+    for job in jobs:
+        rows = load_tracks(_shard_tracks(job))
+        for row in rows:
+            row["track_id"] += id_offset
+        id_offset = max([id_offset] + [row["track_id"] for row in rows])
+        yield from rows
+
+
+def _dump_json_list(path: Path, head: dict[str, Any], key: str, items: Iterable[Any]) -> None:
+    """Write ``{**head, key: [*items]}`` as ``json.dump`` would, without building the list."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for k, v in head.items():
+            f.write(f"{json.dumps(k)}: {json.dumps(v)}, ")
+        f.write(f"{json.dumps(key)}: [")
+        for i, item in enumerate(items):
+            if i:
+                f.write(", ")
+            json.dump(item, f)
+        f.write("]}")
+
+
+def _resolve(root: Path, path: str) -> Path:
+    p = Path(path)
+    return p if p.is_absolute() else root / p
+
+
+def _detector_env(repo_root: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = f"{repo_root}:{env.get('PYTHONPATH', '')}".rstrip(":")
+    return env
+
+
 def _run_sparse4d_detection_only(scfg: dict[str, Any]) -> None:
     repo_root = Path(scfg["repo_root"]).resolve()
     results_json = Path(scfg["results_nusc_path"]).resolve()
     format_dir = results_json.parent
     format_dir.mkdir(parents=True, exist_ok=True)
 
+    cmd = _detection_command(scfg, scfg["ann_file"], format_dir)
+    subprocess.run(cmd, cwd=repo_root, env=_detector_env(repo_root), check=True)
+
+
+def _detection_command(scfg: dict[str, Any], ann_file: str, format_dir: Path) -> list[str]:
     cfg_options = {
         "data_root": scfg["nuscenes_dataroot"],
         "data.test.data_root": scfg["nuscenes_dataroot"],
-        "data.test.ann_file": scfg["ann_file"],
+        "data.test.ann_file": ann_file,
         "data.test.tracking": False,
     }
     cfg_options.update(scfg.get("cfg_options", {}))
@@ -78,11 +209,7 @@ def _run_sparse4d_detection_only(scfg: dict[str, Any]) -> None:
     ]
     for k, v in cfg_options.items():
         cmd.append(f"{k}={_to_mmcv_value(v)}")
-
-    env = dict(os.environ)
-    env["PYTHONPATH"] = f"{repo_root}:{env.get('PYTHONPATH', '')}".rstrip(":")
-
-    subprocess.run(cmd, cwd=repo_root, env=env, check=True)
+    return cmd
 
 
 def _to_mmcv_value(v: Any) -> str:
@@ -160,67 +287,21 @@ def _load_trace_tokens(ccfg: dict[str, Any]) -> set[str] | None:
     return tokens
 
 
-def _quat_wxyz_to_yaw(q: list[float]) -> float:
-    w, x, y, z = q
-    siny_cosp = 2.0 * (w * z + x * y)
-    cosy_cosp = 1.0 - 2.0 * (y * y + z * z)
-    return math.atan2(siny_cosp, cosy_cosp)
-
-
 def _convert_sparse4d_results_to_tracker_input(
     results_nusc_path: Path,
     token_to_timestamp_s: dict[str, float],
     output_path: Path,
     allowed_labels: set[str],
     trace_tokens: set[str] | None,
-) -> None:
-    with open(results_nusc_path, "r", encoding="utf-8") as f:
-        nusc = json.load(f)
-
-    by_token = nusc["results"]
-    frames: list[dict[str, Any]] = []
-
-    for token, annos in by_token.items():
-        if token not in token_to_timestamp_s:
-            continue
-        if trace_tokens is not None and token not in trace_tokens:
-            continue
-        dets = []
-        for a in annos:
-            name = a.get("detection_name")
-            if not name:
-                # Skip tracking-only fields; this bridge is detection-only.
-                continue
-            if allowed_labels and name not in allowed_labels:
-                continue
-
-            t = a["translation"]
-            s = a["size"]  # nuScenes order: [w, l, h]
-            q = a["rotation"]
-
-            dets.append(
-                {
-                    "x": float(t[0]),
-                    "y": float(t[1]),
-                    "z": float(t[2]),
-                    "yaw": float(_quat_wxyz_to_yaw(q)),
-                    "l": float(s[1]),
-                    "w": float(s[0]),
-                    "h": float(s[2]),
-                    "score": float(a["detection_score"]),
-                    "label": str(name),
-                }
-            )
-
-        frames.append(
-            {
-                "timestamp_s": token_to_timestamp_s[token],
-                "sample_token": token,
-                "detections": dets,
-            }
-        )
-
-    frames.sort(key=lambda x: x["timestamp_s"])
-    out = {"schema": "cam3d_detections_v1", "frames": frames}
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+    workers: int = 1,
+    tokens_per_task: int = 64,
+) -> int:
+    return convert_results_stream(
+        results_nusc_path,
+        token_to_timestamp_s,
+        output_path,
+        allowed_labels,
+        trace_tokens=trace_tokens,
+        workers=workers,
+        tokens_per_task=tokens_per_task,
+    )
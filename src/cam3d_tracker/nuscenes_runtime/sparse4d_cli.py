@@ -3,7 +3,6 @@ from __future__ import annotations
 import argparse
 
 from .config import load_runtime_config
-from .sparse4d_bridge import run_sparse4d_to_tracker
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -15,6 +14,8 @@ def build_parser() -> argparse.ArgumentParser:
 def main() -> None:
     args = build_parser().parse_args()
     cfg = load_runtime_config(args.config)
+    from .sparse4d_bridge import run_sparse4d_to_tracker
+
     run_sparse4d_to_tracker(cfg)
 
 
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import pickle
+import queue
+import subprocess
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+# Without scene tokens, consecutive infos more than this apart start a new scene (samples are 0.5 s apart).
+_SCENE_GAP_US = 2_000_000
+
+
+@dataclass
+class ShardJob:
+    index: int
+    ann_file: Path
+    format_dir: Path
+    results_path: Path
+    log_path: Path
+    num_samples: int
+    attempts: int = 0
+
+
+def scene_groups(infos: Sequence[dict[str, Any]]) -> list[list[int]]:
+    """Indices of ``infos`` split into contiguous runs of one scene each."""
+    groups: list[list[int]] = []
+    prev: dict[str, Any] | None = None
+    for i, info in enumerate(infos):
+        if prev is None:
+            new_scene = True
+        elif "scene_token" in info and "scene_token" in prev:
+            new_scene = info["scene_token"] != prev["scene_token"]
+        else:
+            dt = int(info["timestamp"]) - int(prev["timestamp"])
+            new_scene = dt < 0 or dt > _SCENE_GAP_US
+        if new_scene:
+            groups.append([])
+        groups[-1].append(i)
+        prev = info
+    return groups
+
+
+def plan_shards(infos: Sequence[dict[str, Any]], num_shards: int) -> list[list[int]]:
+    """Split ``infos`` into at most ``num_shards`` ordered shards of whole scenes with similar sample counts.
+
+    Temporal detectors carry state from one sample to the next, so a scene is
+    never cut across shards.
+    """
+    groups = scene_groups(infos)
+    num_shards = max(1, min(num_shards, len(groups)))
+    shards: list[list[int]] = []
+    remaining = len(infos)
+    current: list[int] = []
+    for k, group in enumerate(groups):
+        current.extend(group)
+        left_shards = num_shards - len(shards)
+        left_groups = len(groups) - k - 1
+        if left_shards > 1 and (len(current) >= remaining / left_shards or left_groups < left_shards):
+            shards.append(current)
+            remaining -= len(current)
+            current = []
+    if current:
+        shards.append(current)
+    return shards
+
+
+def write_shard_ann_files(
+    ann_file: str | Path,
+    num_shards: int,
+    work_dir: str | Path,
+    results_name: str,
+    sample_tokens: set[str] | None = None,
+) -> list[ShardJob]:
+    """Write one ann pkl per shard under ``work_dir/shard_XXX`` and return the jobs in dataset order.
+
+    With ``sample_tokens`` only those samples are kept, so a scene trace does
+    not pay for inference on the rest of the split.
+    """
+    with open(ann_file, "rb") as f:
+        data = pickle.load(f)
+    infos = data["infos"] if isinstance(data, dict) else data
+    if sample_tokens is not None:
+        infos = [info for info in infos if info["token"] in sample_tokens]
+    if not infos:
+        raise ValueError(f"No samples to run in {ann_file}")
+
+    jobs: list[ShardJob] = []
+    for k, index in enumerate(plan_shards(infos, num_shards)):
+        shard_dir = Path(work_dir) / f"shard_{k:03d}"
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        subset = [infos[i] for i in index]
+        payload = dict(data, infos=subset) if isinstance(data, dict) else subset
+        shard_ann = shard_dir / "ann.pkl"
+        with open(shard_ann, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        jobs.append(
+            ShardJob(
+                index=k,
+                ann_file=shard_ann,
+                format_dir=shard_dir,
+                results_path=shard_dir / results_name,
+                log_path=shard_dir / "test.log",
+                num_samples=len(subset),
+            )
+        )
+    return jobs
+
+
+def _launch(cmd: list[str], cwd: Path, env: dict[str, str], cpus: list[int] | None, log_path: Path) -> subprocess.Popen:
+    with open(log_path, "ab") as log:
+        proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+    # Pinned from outside rather than with preexec_fn, which is unsafe to fork with from a thread.
+    # The shard's workers start after this and inherit the mask.
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(proc.pid, set(cpus))
+        except ProcessLookupError:
+            pass
+    return proc
+
+
+def run_shards(
+    jobs: list[ShardJob],
+    command: Callable[[ShardJob], list[str]],
+    cwd: Path,
+    env: dict[str, str],
+    max_concurrent: int = 1,
+    cpu_affinity: Sequence[Sequence[int]] = (),
+    slot_env: Sequence[dict[str, Any]] = (),
+    max_retries: int = 1,
+    poll_s: float = 1.0,
+) -> Iterator[ShardJob]:
+    """Run ``command(job)`` for every shard, ``max_concurrent`` at a time, yielding jobs as they succeed.
+
+    Shards are launched and reaped by a scheduler thread, so slots keep
+    filling while the caller works on a finished shard. Concurrent slot ``i``
+    is pinned to ``cpu_affinity[i]`` and gets ``slot_env[i]`` (both cycled). A
+    shard that exits non-zero or leaves no results file is re-queued up to
+    ``max_retries`` times; once every shard has settled, a RuntimeError lists
+    the ones that still failed. Closing the iterator early kills the running
+    shards.
+    """
+    finished: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    scheduler = threading.Thread(
+        target=_schedule_shards,
+        args=(jobs, command, cwd, env, max(1, max_concurrent), cpu_affinity, slot_env, max_retries, poll_s),
+        kwargs={"finished": finished, "stop": stop},
+        name="sparse4d-shards",
+        daemon=True,
+    )
+    scheduler.start()
+    try:
+        while True:
+            item = finished.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        scheduler.join()
+
+
+def _schedule_shards(
+    jobs: list[ShardJob],
+    command: Callable[[ShardJob], list[str]],
+    cwd: Path,
+    env: dict[str, str],
+    max_concurrent: int,
+    cpu_affinity: Sequence[Sequence[int]],
+    slot_env: Sequence[dict[str, Any]],
+    max_retries: int,
+    poll_s: float,
+    finished: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    # Puts each succeeded job on ``finished``, then None, or the exception that ended the run.
+    pending = deque(jobs)
+    running: dict[int, tuple[ShardJob, subprocess.Popen]] = {}
+    failed: list[ShardJob] = []
+    try:
+        while (pending or running) and not stop.is_set():
+            for slot in range(max_concurrent):
+                if slot in running or not pending:
+                    continue
+                job = pending.popleft()
+                job.attempts += 1
+                job.results_path.unlink(missing_ok=True)
+                slot_vars = slot_env[slot % len(slot_env)] if slot_env else {}
+                cpus = list(cpu_affinity[slot % len(cpu_affinity)]) if cpu_affinity else None
+                proc = _launch(
+                    command(job), cwd, dict(env, **{k: str(v) for k, v in slot_vars.items()}), cpus, job.log_path
+                )
+                running[slot] = (job, proc)
+
+            codes = {slot: proc.poll() for slot, (_, proc) in running.items()}
+            done = [slot for slot, code in codes.items() if code is not None]
+            if not done:
+                stop.wait(poll_s)
+                continue
+            for slot in done:
+                job, _ = running.pop(slot)
+                if codes[slot] == 0 and job.results_path.exists():
+                    finished.put(job)
+                elif job.attempts <= max_retries:
+                    pending.append(job)
+                else:
+                    failed.append(job)
+        if failed:
+            detail = ", ".join(f"shard {j.index} (see {j.log_path})" for j in sorted(failed, key=lambda j: j.index))
+            finished.put(RuntimeError(f"Sparse4D inference failed after {max_retries + 1} attempts: {detail}"))
+        else:
+            finished.put(None)
+    except Exception as exc:
+        finished.put(exc)
+    finally:
+        for _, proc in running.values():
+            proc.kill()
+            proc.wait()
@@ -1,18 +1,59 @@
 from __future__ import annotations
 
+from typing import Callable, Sequence, TypeVar
+
 from .config import load_config
-from .io_utils import flatten_outputs, load_frames, save_tracks
-from .tracker import Classical3DTracker
+from .delta_tracks import DeltaTrackEncoder
+from .io_utils import flatten_outputs, load_frames, save_delta_tracks, save_tracks
+from .tiling import make_tracker
+
+T = TypeVar("T")
+
+DECIMATION_MODES = ("none", "every_k", "keyframes")
+TRACK_OUTPUT_FORMATS = ("rows", "delta")
+
+
+def decimate_frames(
+    frames: Sequence[T], decimation_cfg: dict, is_keyframe: Callable[[T], bool] = lambda f: f.is_keyframe
+) -> list[T]:
+    """Frames kept by ``decimation.mode``: all, every k-th, or keyframes only."""
+    mode = str(decimation_cfg.get("mode", "none"))
+    if mode == "none":
+        return list(frames)
+    if mode == "every_k":
+        k = int(decimation_cfg.get("every_k", 1))
+        if k < 1:
+            raise ValueError("decimation.every_k must be >= 1")
+        return list(frames[::k])
+    if mode == "keyframes":
+        return [f for f in frames if is_keyframe(f)]
+    raise ValueError(f"Unknown decimation mode '{mode}'. Use one of {DECIMATION_MODES}")
+
+
+def track_output_format(io_cfg: dict) -> str:
+    fmt = str(io_cfg.get("track_output_format", "rows"))
+    if fmt not in TRACK_OUTPUT_FORMATS:
+        raise ValueError(f"Unknown io.track_output_format '{fmt}'. Use one of {TRACK_OUTPUT_FORMATS}")
+    return fmt
 
 
 def run_tracking(config_path: str, detections_path: str, output_path: str) -> None:
     cfg = load_config(config_path).raw
-    tracker = Classical3DTracker(cfg)
-    frames = load_frames(detections_path)
+    io_cfg = cfg.get("io", {})
+    keep_raw = bool(io_cfg.get("keep_raw_detections", False))
+    frames = decimate_frames(load_frames(detections_path, keep_raw=keep_raw), cfg.get("decimation", {}))
+    encoder = DeltaTrackEncoder(io_cfg.get("delta_precision")) if track_output_format(io_cfg) == "delta" else None
 
     rows: list[dict] = []
-    for frame in frames:
-        outputs = tracker.step(frame.timestamp_s, frame.detections)
-        rows.extend(flatten_outputs(frame.timestamp_s, outputs))
+    with make_tracker(cfg) as tracker:
+        for frame in frames:
+            outputs = tracker.step_batch(frame.timestamp_s, frame.batch, ego_pose=frame.ego_pose)
+            if encoder is not None:
+                encoder.add(frame.timestamp_s, outputs)
+            else:
+                rows.extend(flatten_outputs(frame.timestamp_s, outputs))
 
+    if encoder is not None:
+        save_delta_tracks(output_path, encoder.payload())
+        return
     save_tracks(output_path, rows)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .geometry import bev_iou_pairs
+from .models import DetectionBatch
+
+NMS_MODES = ("none", "bev_iou", "center")
+
+
+@dataclass
+class PrefilterStats:
+    input: int = 0
+    below_score: int = 0
+    nms: int = 0
+    top_k: int = 0
+
+    @property
+    def removed(self) -> int:
+        return self.below_score + self.nms + self.top_k
+
+    @property
+    def kept(self) -> int:
+        return self.input - self.removed
+
+
+def _per_class(table: dict[str, Any], label: str, cast=float):
+    return cast(table.get(label, table.get("default", 0)))
+
+
+def nms_keep(
+    z: np.ndarray, scores: np.ndarray, mode: str, iou_threshold: float = 0.5, center_dist_m: float = 1.0
+) -> np.ndarray:
+    """Greedy NMS over one class; returns a keep mask in input order.
+
+    ``z`` rows are measurements ``[x, y, z, yaw, l, w, h]``. Only pairs whose
+    bounding circles overlap (or that lie within ``center_dist_m``) are compared.
+    """
+    n = z.shape[0]
+    keep = np.ones(n, dtype=bool)
+    if n < 2 or mode == "none":
+        return keep
+    order = np.argsort(-scores, kind="stable")
+    zs = z[order]
+    dist = np.hypot(zs[:, None, 0] - zs[None, :, 0], zs[:, None, 1] - zs[None, :, 1])
+    if mode == "center":
+        overlap = dist <= center_dist_m
+    else:
+        radius = 0.5 * np.hypot(zs[:, 4], zs[:, 5])
+        cand = np.triu(dist < radius[:, None] + radius[None, :], k=1)
+        ii, jj = np.nonzero(cand)
+        rows = zs[:, [0, 1, 3, 4, 5]]
+        overlap = np.zeros((n, n), dtype=bool)
+        overlap[ii, jj] = bev_iou_pairs(rows[ii], rows[jj]) > iou_threshold
+    np.fill_diagonal(overlap, False)
+
+    alive = np.ones(n, dtype=bool)
+    for i in range(n):
+        if alive[i]:
+            alive[i + 1 :] &= ~overlap[i, i + 1 :]
+    keep[order] = alive
+    return keep
+
+
+class DetectionPrefilter:
+    """Per-class score threshold, NMS and top-K applied to a DetectionBatch before association."""
+
+    def __init__(self, cfg: dict[str, Any]) -> None:
+        self.enabled = bool(cfg.get("enabled", False))
+        self.score_threshold = dict(cfg.get("score_threshold", {}))
+        nms_cfg = cfg.get("nms", {})
+        self.nms_mode = str(nms_cfg.get("mode", "none"))
+        if self.nms_mode not in NMS_MODES:
+            raise ValueError(f"Unknown prefilter.nms.mode '{self.nms_mode}'. Use one of {NMS_MODES}")
+        self.iou_threshold = float(nms_cfg.get("iou_threshold", 0.5))
+        self.center_dist_m = dict(nms_cfg.get("center_dist_m", {"default": 1.0}))
+        self.top_k = dict(cfg.get("top_k", {}))
+
+    def __call__(self, batch: DetectionBatch) -> tuple[DetectionBatch, PrefilterStats]:
+        stats = PrefilterStats(input=len(batch))
+        if not self.enabled or len(batch) == 0:
+            return batch, stats
+
+        # Thresholds per interned batch label, expanded to one value per detection.
+        names = batch.label_names
+        codes = batch.label_codes
+        min_score = np.array([_per_class(self.score_threshold, n) for n in names], dtype=float)[codes]
+        keep = batch.scores >= min_score
+        stats.below_score = int(np.count_nonzero(~keep))
+
+        for code, name in enumerate(names):
+            idx = np.flatnonzero(keep & (codes == code))
+            if idx.size == 0:
+                continue
+            if self.nms_mode != "none":
+                nms = nms_keep(
+                    batch.z[idx],
+                    batch.scores[idx],
+                    self.nms_mode,
+                    self.iou_threshold,
+                    _per_class(self.center_dist_m, name),
+                )
+                stats.nms += int(np.count_nonzero(~nms))
+                keep[idx[~nms]] = False
+                idx = idx[nms]
+            k = _per_class(self.top_k, name, int)
+            if 0 < k < idx.size:
+                drop = idx[np.argsort(-batch.scores[idx], kind="stable")[k:]]
+                keep[drop] = False
+                stats.top_k += drop.size
+
+        if stats.removed == 0:
+            return batch, stats
+        return batch.select(keep), stats
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import numpy as np
+
+
+@dataclass
+class RoiStats:
+    detections: int = 0
+    tracks: int = 0
+
+
+def pose_xy_yaw(ego_pose: dict[str, Any]) -> tuple[float, float, float]:
+    """BEV position and heading of an ego pose (``yaw`` key, else the wxyz ``rotation``)."""
+    tx, ty = (float(v) for v in ego_pose["translation"][:2])
+    if "yaw" in ego_pose:
+        return tx, ty, float(ego_pose["yaw"])
+    w, x, y, z = (float(v) for v in ego_pose["rotation"])
+    return tx, ty, math.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+class RegionOfInterest:
+    """Per-class range and forward/rear/lateral box around the ego pose.
+
+    Limits of 0 are disabled. Tracks get ``track_margin_m`` of slack on every
+    limit so objects sitting on the boundary are not retired and reborn.
+    """
+
+    def __init__(self, cfg: dict[str, Any]) -> None:
+        self.enabled = bool(cfg.get("enabled", False))
+        self.radius_m = dict(cfg.get("radius_m", {}))
+        box = cfg.get("box", {})
+        self.forward_m = float(box.get("forward_m", 0.0))
+        self.rear_m = float(box.get("rear_m", 0.0))
+        self.half_width_m = float(box.get("half_width_m", 0.0))
+        self.track_margin_m = float(cfg.get("track_margin_m", 0.0))
+        self._radius_cache: dict[tuple[str, ...], np.ndarray] = {}
+
+    def _radius(self, names: Sequence[str]) -> np.ndarray:
+        key = tuple(names)
+        radius = self._radius_cache.get(key)
+        if radius is None:
+            default = self.radius_m.get("default", 0.0)
+            radius = np.array([float(self.radius_m.get(n, default)) for n in key], dtype=float)
+            radius[radius <= 0.0] = np.inf
+            self._radius_cache[key] = radius
+        return radius
+
+    def inside(
+        self,
+        xy: np.ndarray,
+        label_codes: np.ndarray,
+        label_names: Sequence[str],
+        ego_pose: dict[str, Any],
+        margin_m: float = 0.0,
+    ) -> np.ndarray:
+        """Mask of the (N, 2) BEV positions that lie inside the region."""
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        tx, ty, yaw = pose_xy_yaw(ego_pose)
+        dx = xy[:, 0] - tx
+        dy = xy[:, 1] - ty
+        keep = np.hypot(dx, dy) <= self._radius(label_names)[label_codes] + margin_m
+        if self.forward_m > 0.0 or self.rear_m > 0.0 or self.half_width_m > 0.0:
+            c = math.cos(yaw)
+            s = math.sin(yaw)
+            lon = c * dx + s * dy
+            lat = -s * dx + c * dy
+            if self.forward_m > 0.0:
+                keep &= lon <= self.forward_m + margin_m
+            if self.rear_m > 0.0:
+                keep &= lon >= -(self.rear_m + margin_m)
+            if self.half_width_m > 0.0:
+                keep &= np.abs(lat) <= self.half_width_m + margin_m
+        return keep
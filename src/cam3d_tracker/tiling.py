@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import itertools
+import traceback
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import numpy as np
+
+from .models import Detection3D, DetectionBatch, TrackOutput, TrackOutputBatch
+from .prefilter import PrefilterStats
+from .roi import RoiStats
+from .tracker import Classical3DTracker, TrackNode, _Association
+
+TileKey = tuple[int, int]
+
+
+def tile_keys(xy: np.ndarray, tile_size_m: float) -> np.ndarray:
+    """(N, 2) integer tile indices of BEV points; tile (i, j) covers ``[i, i + 1) * tile_size_m`` in x, likewise y."""
+    return np.floor(np.asarray(xy, dtype=float).reshape(-1, 2) / tile_size_m).astype(np.int64)
+
+
+def tile_routes(xy: np.ndarray, tile_size_m: float, overlap_m: float) -> dict[TileKey, np.ndarray]:
+    """Detection indices per tile: each point's own tile plus every neighbour within ``overlap_m`` of it.
+
+    Diagonal neighbours are included when the point is within ``overlap_m``
+    of both edges, so the halo is a square band rather than a rounded one.
+    """
+    keys = tile_keys(xy, tile_size_m)
+    if not len(keys):
+        return {}
+    offset = np.asarray(xy, dtype=float).reshape(-1, 2) - keys * tile_size_m
+    near = {-1: offset < overlap_m, 0: np.ones_like(offset, dtype=bool), 1: tile_size_m - offset < overlap_m}
+    idx_parts, key_parts = [], []
+    for dx, dy in itertools.product((-1, 0, 1), repeat=2):
+        sel = np.flatnonzero(near[dx][:, 0] & near[dy][:, 1])
+        idx_parts.append(sel)
+        key_parts.append(keys[sel] + (dx, dy))
+    idx = np.concatenate(idx_parts)
+    uniq, inverse = np.unique(np.concatenate(key_parts), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(uniq)))[:-1]
+    return {(int(k[0]), int(k[1])): np.sort(part) for k, part in zip(uniq, np.split(idx[order], bounds))}
+
+
+@dataclass
+class _TileClaims:
+    # (detection index in the frame, track id, stage, cost) per proposed match.
+    claims: list[tuple[int, int, int, float]]
+    retired: int
+
+
+@dataclass
+class _TileResult:
+    outputs: TrackOutputBatch
+    handovers: list[tuple[TileKey, TrackNode]]
+    n_tracks: int
+
+
+def _sync_labels(trk: Classical3DTracker, label_names: Sequence[str]) -> None:
+    # Both sides intern the configured classes first and runtime labels in arrival order, so the
+    # tile's vocabulary is always a prefix of the coordinator's.
+    for name in label_names[len(trk.tables.names) :]:
+        trk.tables.intern(name)
+    if trk.tables.names != list(label_names):
+        raise RuntimeError("tile label vocabulary diverged from the coordinator's")
+
+
+class _Tiles:
+    """One worker's tile trackers, stepped in two phases so the coordinator can settle shared detections.
+
+    ``propose`` predicts and associates every tile and reports its matches
+    without applying them; ``commit`` applies all but the revoked ones, then
+    prunes, collects outputs and hands over tracks that moved to another tile.
+    A tile left without tracks is dropped.
+    """
+
+    def __init__(self, cfg: dict, tile_size_m: float) -> None:
+        self.cfg = cfg
+        self.tile_size_m = tile_size_m
+        self.trackers: dict[TileKey, Classical3DTracker] = {}
+        self._held: dict[TileKey, tuple[list[_Association], DetectionBatch]] = {}
+        # Tiles step one after another, so one class_threads pool serves them all.
+        class_threads = int(cfg["tracker"].get("class_threads", 0))
+        self._pool = (
+            ThreadPoolExecutor(max_workers=class_threads, thread_name_prefix="track3d-class")
+            if class_threads > 1
+            else None
+        )
+
+    def propose(
+        self,
+        jobs: dict[TileKey, tuple[list[TrackNode], np.ndarray, DetectionBatch, np.ndarray]],
+        dt: float,
+        roi_pose: dict[str, Any] | None,
+        label_names: Sequence[str],
+    ) -> dict[TileKey, _TileClaims]:
+        """Associate each tile in ``jobs`` against its routed detections.
+
+        ``label_names`` is the coordinator's label vocabulary; detection and
+        track label codes index it, so each tile interns any labels it has not
+        seen yet.
+        """
+        self._held.clear()
+        out: dict[TileKey, _TileClaims] = {}
+        for key, (incoming, det_ids, batch, det_codes) in jobs.items():
+            trk = self.trackers.get(key)
+            if trk is None:
+                trk = self.trackers[key] = Classical3DTracker(self.cfg, pool=self._pool)
+            _sync_labels(trk, label_names)
+            for node in incoming:
+                trk.tracks[node.track_id] = node
+            assocs = trk._associate_all(batch, det_codes, dt, roi_pose)
+            self._held[key] = (assocs, batch)
+            claims = [
+                (int(det_ids[di]), tid, *a.ranks[(tid, di)]) for a in assocs for tid, di in a.matches
+            ]
+            out[key] = _TileClaims(claims=claims, retired=sum(len(a.retired) for a in assocs))
+        return out
+
+    def commit(self, revoked: dict[TileKey, list[int]]) -> dict[TileKey, _TileResult]:
+        """Apply the proposed matches except the ``revoked`` track ids, which count a miss instead."""
+        results: dict[TileKey, _TileResult] = {}
+        for key, (assocs, batch) in self._held.items():
+            trk = self.trackers[key]
+            trk._commit_all(assocs, batch, frozenset(revoked.get(key, ())))
+            trk._prune()
+            outputs = trk._output_batch()
+
+            handovers: list[tuple[TileKey, TrackNode]] = []
+            if trk.tracks:
+                tids = list(trk.tracks)
+                dest = tile_keys(np.array([trk.tracks[t].filt.x[:2] for t in tids]), self.tile_size_m)
+                for tid, (i, j) in zip(tids, dest.tolist()):
+                    if (i, j) != key:
+                        handovers.append(((i, j), trk.tracks.pop(tid)))
+            if not trk.tracks:
+                del self.trackers[key]
+            results[key] = _TileResult(outputs=outputs, handovers=handovers, n_tracks=len(trk.tracks))
+        self._held.clear()
+        return results
+
+    def close(self) -> None:
+        self.trackers.clear()
+        self._held.clear()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def _worker_main(conn: Any, cfg: dict, tile_size_m: float) -> None:
+    tiles = _Tiles(cfg, tile_size_m)
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        try:
+            conn.send(getattr(tiles, msg[0])(*msg[1:]))
+        except Exception:
+            conn.send(RuntimeError(f"tile worker failed:\n{traceback.format_exc()}"))
+    tiles.close()
+    conn.close()
+
+
+class _LocalWorker:
+    def __init__(self, cfg: dict, tile_size_m: float) -> None:
+        self._tiles = _Tiles(cfg, tile_size_m)
+        self._result: Any = None
+
+    def submit(self, op: str, *args: Any) -> None:
+        self._result = getattr(self._tiles, op)(*args)
+
+    def result(self) -> Any:
+        return self._result
+
+    def close(self) -> None:
+        self._tiles.close()
+
+
+class _ProcessWorker:
+    def __init__(self, ctx: Any, cfg: dict, tile_size_m: float, index: int) -> None:
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_worker_main, args=(child, cfg, tile_size_m), name=f"track3d-tile-{index}", daemon=True
+        )
+        self._proc.start()
+        child.close()
+
+    def submit(self, op: str, *args: Any) -> None:
+        self._conn.send((op, *args))
+
+    def result(self) -> Any:
+        res = self._conn.recv()
+        if isinstance(res, BaseException):
+            raise res
+        return res
+
+    def close(self) -> None:
+        if self._proc.is_alive():
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._proc.join(timeout=5.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        self._conn.close()
+
+
+def _close_workers(workers: list[Any]) -> None:
+    for w in workers:
+        w.close()
+
+
+class TiledTracker:
+    """``Classical3DTracker`` split over square BEV tiles, each tracked by its own tracker.
+
+    Tiles are spread round-robin over ``tiling.workers`` processes (0 runs
+    them all in this process). This process prefilters and ROI-culls each
+    frame, sends every detection to its own tile and to any tile within
+    ``overlap_m`` of it, and starts tracks for detections no tile matched,
+    with ids from one global counter. Tiles first propose their matches; a
+    detection claimed by tracks in several tiles goes to the best claim (the
+    earliest association stage, then the lowest cost) and the other tracks
+    count a miss that frame. After each frame a track whose position lies in
+    another tile is handed to that tile, keeping its id, and tiles left
+    without tracks are dropped. Tracks only see detections routed to their
+    tile, so ``overlap_m`` must exceed how far a track moves in a frame plus
+    its gate radius; within that, the output matches a single tracker's
+    except where a losing track had a second-best detection it would have
+    taken in one joint assignment.
+    """
+
+    def __init__(self, cfg: dict) -> None:
+        tiling = cfg.get("tiling", {})
+        self.tile_size_m = float(tiling.get("tile_size_m", 200.0))
+        self.overlap_m = float(tiling.get("overlap_m", 10.0))
+        n_workers = int(tiling.get("workers", 0))
+        if self.tile_size_m <= 0.0:
+            raise ValueError("tiling.tile_size_m must be > 0")
+        if not 0.0 <= self.overlap_m < 0.5 * self.tile_size_m:
+            raise ValueError("tiling.overlap_m must be >= 0 and less than half of tiling.tile_size_m")
+        if n_workers < 0:
+            raise ValueError("tiling.workers must be >= 0")
+
+        # Owns prefilter, ROI, dt and the global id counter; its own track table stays empty.
+        self._proto = Classical3DTracker(cfg)
+        if n_workers == 0:
+            self._workers: list[_LocalWorker | _ProcessWorker] = [_LocalWorker(cfg, self.tile_size_m)]
+        else:
+            import multiprocessing
+
+            ctx = multiprocessing.get_context()
+            self._workers = [_ProcessWorker(ctx, cfg, self.tile_size_m, k) for k in range(n_workers)]
+        self._finalizer = weakref.finalize(self, _close_workers, self._workers)
+
+        self._tile_worker: dict[TileKey, int] = {}
+        self._next_worker = 0
+        self._live_tiles: set[TileKey] = set()
+        # Births and handovers waiting to join their tile on the next frame.
+        self._incoming: dict[TileKey, list[TrackNode]] = {}
+        self.last_prefilter_stats = PrefilterStats()
+        self.last_roi_stats = RoiStats()
+
+    def close(self) -> None:
+        """Stop the worker processes and their thread pools."""
+        self._finalizer()
+
+    def __enter__(self) -> TiledTracker:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _queue(self, key: TileKey, node: TrackNode) -> None:
+        if key not in self._tile_worker:
+            self._tile_worker[key] = self._next_worker
+            self._next_worker = (self._next_worker + 1) % len(self._workers)
+        self._incoming.setdefault(key, []).append(node)
+
+    def step_batch(
+        self,
+        timestamp_s: float,
+        detections: DetectionBatch | Sequence[Detection3D],
+        ego_pose: dict[str, Any] | None = None,
+    ) -> TrackOutputBatch:
+        """Same contract as ``Classical3DTracker.step_batch``."""
+        proto = self._proto
+        batch, det_codes, roi_pose = proto._prepare(detections, ego_pose)
+        self.last_prefilter_stats = proto.last_prefilter_stats
+        self.last_roi_stats = proto.last_roi_stats
+        dt = proto._compute_dt(timestamp_s)
+
+        routes = tile_routes(batch.z[:, :2], self.tile_size_m, self.overlap_m)
+        no_dets = np.empty(0, dtype=np.int64)
+        jobs: list[dict] = [{} for _ in self._workers]
+        # Tiles without tracks have nothing to match; their detections go straight to births.
+        for key in sorted(self._live_tiles | set(self._incoming)):
+            idx = routes.get(key, no_dets)
+            jobs[self._tile_worker[key]][key] = (self._incoming.pop(key, []), idx, batch.select(idx), det_codes[idx])
+        busy = []
+        for w, job in zip(self._workers, jobs):
+            if job:
+                w.submit("propose", job, dt, roi_pose, tuple(proto.tables.names))
+                busy.append(w)
+
+        # Each detection goes to its best claim; other claimants are revoked and count a miss.
+        best: dict[int, tuple[int, float, TileKey, int]] = {}
+        revoked: dict[TileKey, list[int]] = {}
+        for w in busy:
+            for key, res in w.result().items():
+                self.last_roi_stats.tracks += res.retired
+                for di, tid, stage, cost in res.claims:
+                    claim = (stage, cost, key, tid)
+                    prev = best.get(di)
+                    if prev is None:
+                        best[di] = claim
+                        continue
+                    loser = max(prev, claim)
+                    best[di] = min(prev, claim)
+                    revoked.setdefault(loser[2], []).append(loser[3])
+        for w in busy:
+            w.submit("commit", revoked)
+
+        matched = np.zeros(len(batch), dtype=bool)
+        matched[list(best)] = True
+        outputs: list[TrackOutputBatch] = []
+        for w in busy:
+            for key, res in w.result().items():
+                outputs.append(res.outputs)
+                for dest, node in res.handovers:
+                    self._queue(dest, node)
+                if res.n_tracks:
+                    self._live_tiles.add(key)
+                else:
+                    self._live_tiles.discard(key)
+        # The worker dropped its empty tiles; forget their placement unless a track is on its way in.
+        for key in [k for k in self._tile_worker if k not in self._live_tiles and k not in self._incoming]:
+            del self._tile_worker[key]
+
+        # Births go through the single tracker's own spawn and prune rules, in detection order.
+        proto.tracks = {n.track_id: n for n in proto._spawn(batch, det_codes, np.flatnonzero(~matched).tolist())}
+        proto._prune()
+        births = list(proto.tracks.values())
+        proto.tracks = {}
+        if births:
+            dest = tile_keys(np.array([n.filt.x[:2] for n in births]), self.tile_size_m)
+            for node, (i, j) in zip(births, dest.tolist()):
+                self._queue((i, j), node)
+        proto._last_timestamp_s = timestamp_s
+
+        return TrackOutputBatch.concatenate(outputs, proto.tables.names)
+
+    def step(
+        self,
+        timestamp_s: float,
+        detections: DetectionBatch | Sequence[Detection3D],
+        ego_pose: dict[str, Any] | None = None,
+    ) -> list[TrackOutput]:
+        """``step_batch`` as a list of ``TrackOutput``."""
+        return self.step_batch(timestamp_s, detections, ego_pose).to_outputs()
+
+
+def make_tracker(cfg: dict) -> Classical3DTracker | TiledTracker:
+    """``TiledTracker`` when ``tiling.enabled``, else the single ``Classical3DTracker``."""
+    if bool(cfg.get("tiling", {}).get("enabled", False)):
+        return TiledTracker(cfg)
+    return Classical3DTracker(cfg)
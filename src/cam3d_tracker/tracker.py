@@ -1,31 +1,70 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Collection, Sequence
 
 import numpy as np
-from scipy.optimize import linear_sum_assignment
 
-from .geometry import bev_iou, yaw_cost
-from .imm_ekf import IMMEKF, STATE_DIM
-from .math_utils import clamp
-from .models import Detection3D, TrackOutput
+from .assignment import INVALID_COST, make_assignment_solver
+from .class_tables import ClassTables
+from .geometry import yaw_cost_array
+from .imm_ekf import IMMEKF, STATE_DIM, SqrtIMMEKF, StaticPolicy, make_filter_class
+from .kernels import get_kernels
+from .models import TRACK_STATUSES, Detection3D, DetectionBatch, TrackOutput, TrackOutputBatch
+from .prefilter import DetectionPrefilter, PrefilterStats
+from .roi import RegionOfInterest, RoiStats
+
+
+PROCESS_NOISE_MODELS = ("fixed", "dt_scaled")
+_Q_CACHE_SIZE = 32
 
 
 @dataclass
 class TrackNode:
     track_id: int
     label: str
-    filt: IMMEKF
+    label_code: int
+    filt: IMMEKF | SqrtIMMEKF
     score_ema: float
     hits: int
     misses: int
     age_s: float
     time_since_update_s: float
     status: str
+    # Auction price from the last association, the warm start for the next one.
+    assign_price: float = 0.0
+
+
+@dataclass
+class _Association:
+    """One partition's matches, held apart from the update so a tiled run can veto contested ones."""
+
+    matches: list[tuple[int, int]] = field(default_factory=list)
+    pair_innov: dict[tuple[int, int], np.ndarray] = field(default_factory=dict)
+    unmatched_tracks: list[int] = field(default_factory=list)
+    unmatched_dets: list[int] = field(default_factory=list)
+    # (stage, cost) per match, lower is better: which claim wins when tiles share a detection.
+    ranks: dict[tuple[int, int], tuple[int, float]] = field(default_factory=dict)
+    retired: list[int] = field(default_factory=list)
+
+    def add(self, found: list[tuple[int, int, float]], stage: int) -> None:
+        if not found:
+            return
+        for tid, di, cost in found:
+            self.matches.append((tid, di))
+            self.ranks[(tid, di)] = (stage, cost)
+        tids = {m[0] for m in found}
+        dids = {m[1] for m in found}
+        self.unmatched_tracks = [tid for tid in self.unmatched_tracks if tid not in tids]
+        self.unmatched_dets = [di for di in self.unmatched_dets if di not in dids]
 
 
 class Classical3DTracker:
-    def __init__(self, cfg: dict):
+    def __init__(self, cfg: dict, pool: ThreadPoolExecutor | None = None):
         self.cfg = cfg
         self.assoc_cfg = cfg["association"]
         self.tracker_cfg = cfg["tracker"]
@@ -34,35 +73,75 @@ class Classical3DTracker:
 
         self.q_cv = np.diag(np.array(self.noise_cfg["process_cv_diag"], dtype=float) ** 2)
         self.q_ctrv = np.diag(np.array(self.noise_cfg["process_ctrv_diag"], dtype=float) ** 2)
+        self._noise_model = str(self.noise_cfg.get("process_noise_model", "fixed"))
+        if self._noise_model not in PROCESS_NOISE_MODELS:
+            raise ValueError(
+                f"Unknown process_noise_model '{self._noise_model}'. Use one of {PROCESS_NOISE_MODELS}"
+            )
+        self._dt_ref = float(self.noise_cfg.get("reference_dt_s", 0.5))
+        self._q_cache: OrderedDict[float, tuple[np.ndarray, np.ndarray]] = OrderedDict()
         self.transition = np.array(self.imm_cfg["transition"], dtype=float)
         self.mode_prob_init = np.array(self.imm_cfg["mode_prob_init"], dtype=float)
         self.mode_prob_init = self.mode_prob_init / np.sum(self.mode_prob_init)
 
+        self.tables = ClassTables(cfg)
+        self.kernels = get_kernels(str(self.tracker_cfg.get("kernel_backend", "auto")))
+        self._filter_cls = make_filter_class(str(self.imm_cfg.get("filter_form", "standard")))
+        self._static_policy = StaticPolicy.from_config(self.imm_cfg.get("static", {}), self._dt_ref)
+        if self._static_policy is not None and self._filter_cls is not IMMEKF:
+            raise ValueError("imm.static requires imm.filter_form: standard")
+        # Only the standard filter takes the static policy.
+        self._filter_kwargs = {"static": self._static_policy} if self._static_policy is not None else {}
+        self._gate = float(self.assoc_cfg["maha_gate_threshold"])
+        self._center_gate_m = float(self.assoc_cfg["second_stage_center_gate_m"])
+        self._solver = make_assignment_solver(self.assoc_cfg)
+        w = self.assoc_cfg["cost_weights"]
+        self._w_maha = float(w["maha"])
+        self._w_iou = float(w["iou"])
+        self._w_yaw = float(w["yaw"])
+        self._existence_decay = float(self.tracker_cfg["existence_decay"])
+        self._init_score_threshold = float(self.tracker_cfg["init_score_threshold"])
+        self._confirm_score_threshold = float(self.tracker_cfg["confirm_score_threshold"])
+
+        self.prefilter = DetectionPrefilter(cfg.get("prefilter", {}))
+        self.last_prefilter_stats = PrefilterStats()
+        self.roi = RegionOfInterest(cfg.get("roi", {}))
+        self.last_roi_stats = RoiStats()
+
+        cascade = self.assoc_cfg.get("cascade", {})
+        self._cascade = bool(cascade.get("enabled", False))
+        self._cascade_high_score = float(cascade.get("high_score_threshold", 0.5))
+        self._lazy_lost = bool(self.tracker_cfg.get("lazy_lost_predict", False))
+        self._class_threads = int(self.tracker_cfg.get("class_threads", 0))
+        # A pool passed in is shared (tile trackers share one per worker) and left open by close().
+        self._pool = pool
+        self._pool_finalizer: weakref.finalize | None = None
+
         self.tracks: dict[int, TrackNode] = {}
         self._next_id = 1
         self._last_timestamp_s: float | None = None
 
-    def _max_age_for_label(self, label: str) -> float:
-        table = self.tracker_cfg["max_age_s"]
-        return float(table.get(label, table["default"]))
-
-    def _meas_cov_for_label(self, label: str) -> np.ndarray:
-        meas_map = self.noise_cfg["meas_by_class"]
-        vals = np.array(meas_map.get(label, meas_map["default"]), dtype=float)
-        return np.diag(vals**2)
-
-    def _init_track(self, det: Detection3D) -> TrackNode:
+    def _init_track(self, z: np.ndarray, score: float, label_code: int) -> TrackNode:
+        px, py, pz, yaw, l, w, h = (float(v) for v in z)
         x0 = np.array(
-            [det.x, det.y, det.z, 0.0, det.yaw, 0.0, max(det.l, 0.05), max(det.w, 0.05), max(det.h, 0.05)],
+            [px, py, pz, 0.0, yaw, 0.0, max(l, 0.05), max(w, 0.05), max(h, 0.05)],
             dtype=float,
         )
         p0 = np.diag(np.array([6.0, 6.0, 3.0, 4.0, 0.8, 0.8, 1.0, 1.0, 1.0], dtype=float) ** 2)
-        filt = IMMEKF(x0=x0, p0=p0, mode_prob_init=self.mode_prob_init, transition=self.transition)
+        filt = self._filter_cls(
+            x0=x0,
+            p0=p0,
+            mode_prob_init=self.mode_prob_init,
+            transition=self.transition,
+            kernels=self.kernels,
+            **self._filter_kwargs,
+        )
         node = TrackNode(
             track_id=self._next_id,
-            label=det.label,
+            label=self.tables.names[label_code],
+            label_code=label_code,
             filt=filt,
-            score_ema=det.score,
+            score_ema=score,
             hits=1,
             misses=0,
             age_s=0.0,
@@ -77,47 +156,106 @@ class Classical3DTracker:
             return float(self.tracker_cfg["dt_fallback_s"])
         return max(1e-3, float(timestamp_s - self._last_timestamp_s))
 
-    def _predict_all(self, dt: float) -> None:
-        for trk in self.tracks.values():
-            trk.filt.predict(dt=dt, q_cv=self.q_cv, q_ctrv=self.q_ctrv)
+    def process_noise(self, dt: float) -> tuple[np.ndarray, np.ndarray]:
+        """(q_cv, q_ctrv) for a prediction over ``dt`` seconds.
+
+        ``dt_scaled`` treats the configured sigmas as the noise accumulated over
+        ``reference_dt_s`` and scales the variances linearly with dt (white-noise
+        random walk), so skipping frames widens the prediction accordingly.
+        """
+        if self._noise_model == "fixed":
+            return self.q_cv, self.q_ctrv
+        key = round(dt, 4)
+        q = self._q_cache.get(key)
+        if q is None:
+            scale = key / self._dt_ref
+            q = (self.q_cv * scale, self.q_ctrv * scale)
+            self._q_cache[key] = q
+            if len(self._q_cache) > _Q_CACHE_SIZE:
+                self._q_cache.popitem(last=False)
+        else:
+            self._q_cache.move_to_end(key)
+        return q
+
+    def _dt_ratio(self, dt: float) -> float:
+        return 1.0 if self._noise_model == "fixed" else dt / self._dt_ref
+
+    def _predict(self, track_ids: list[int], dt: float, q: tuple[np.ndarray, np.ndarray], decay: float) -> None:
+        q_cv, q_ctrv = q
+        for tid in track_ids:
+            trk = self.tracks[tid]
+            if self._lazy_lost and trk.status == "lost":
+                # Covariance work is deferred until a detection lands within reach (or forever, if none does).
+                trk.filt.coast(dt=dt, q_cv=q_cv, q_ctrv=q_ctrv)
+            else:
+                trk.filt.predict(dt=dt, q_cv=q_cv, q_ctrv=q_ctrv)
             trk.age_s += dt
             trk.time_since_update_s += dt
-            trk.score_ema *= float(self.tracker_cfg["existence_decay"])
-
-    def _cost_matrix(self, track_ids: list[int], detections: list[Detection3D]) -> np.ndarray:
-        c = np.full((len(track_ids), len(detections)), fill_value=1e6, dtype=float)
-        gate = float(self.assoc_cfg["maha_gate_threshold"])
-        w = self.assoc_cfg["cost_weights"]
+            trk.score_ema *= decay
+
+    def _outside_roi(self, track_ids: list[int], ego_pose: dict[str, Any]) -> list[int]:
+        if not track_ids:
+            return []
+        xy = np.array([self.tracks[t].filt.x[:2] for t in track_ids])
+        codes = np.array([self.tracks[t].label_code for t in track_ids], dtype=np.int64)
+        inside = self.roi.inside(xy, codes, self.tables.names, ego_pose, self.roi.track_margin_m)
+        return [track_ids[k] for k in np.flatnonzero(~inside)]
+
+    def _cost_matrix(
+        self, track_ids: list[int], zs: np.ndarray, det_codes: np.ndarray
+    ) -> tuple[np.ndarray, dict[tuple[int, int], np.ndarray]]:
+        """Association cost plus the fused innovation of every pair that passed the gate.
+
+        Columns are the rows of ``zs``. The innovations are handed to the update
+        step so matched pairs do not recompute them.
+        """
+        c = np.full((len(track_ids), len(zs)), fill_value=1e6, dtype=float)
+        pair_innov: dict[tuple[int, int], np.ndarray] = {}
+        gate = self._gate
+
+        # Detection boxes in state layout [x, y, z, v, yaw, yaw_rate, l, w, h] for bev_iou.
+        boxes = np.zeros((len(zs), STATE_DIM), dtype=float)
+        boxes[:, [0, 1, 2, 4, 6, 7, 8]] = zs
 
         for i, tid in enumerate(track_ids):
             trk = self.tracks[tid]
-            r = self._meas_cov_for_label(trk.label)
-            for j, det in enumerate(detections):
-                if det.label != trk.label:
-                    continue
-                maha = trk.filt.innovation_mahalanobis(det.z_vec, r)
-                if maha > gate:
+            cand = np.flatnonzero(det_codes == trk.label_code)
+            if cand.size == 0:
+                continue
+            code = trk.label_code
+            if trk.filt.pending_steps:
+                # Cheap radius test first: detections beyond it cannot pass the Mahalanobis gate.
+                d = zs[cand, :2] - trk.filt.x[:2]
+                reach = gate * trk.filt.position_variance_bound(self.tables.meas_cov[code])
+                cand = cand[np.einsum("ij,ij->i", d, d) <= reach]
+                if cand.size == 0:
                     continue
-                iou_term = 1.0 - bev_iou(trk.filt.x, np.array([det.x, det.y, det.z, 0.0, det.yaw, 0.0, det.l, det.w, det.h]))
-                yaw_term = yaw_cost(trk.filt.x[4], det.yaw)
-                c[i, j] = (
-                    float(w["maha"]) * (maha / gate)
-                    + float(w["iou"]) * iou_term
-                    + float(w["yaw"]) * yaw_term
-                )
-        return c
+            innov, maha = trk.filt.innovations(zs[cand], self.tables.meas_cov[code], self.tables.meas_chol[code])
+            ok = maha <= gate
+            if not np.any(ok):
+                continue
+            cand = cand[ok]
+            innov = innov[ok]
+            x = trk.filt.x
+            iou_term = 1.0 - np.array([self.kernels.bev_iou(x, boxes[j]) for j in cand])
+            yaw_term = yaw_cost_array(x[4], zs[cand, 3])
+            c[i, cand] = self._w_maha * (maha[ok] / gate) + self._w_iou * iou_term + self._w_yaw * yaw_term
+            for k, j in enumerate(cand):
+                pair_innov[(tid, int(j))] = innov[k]
+        return c, pair_innov
 
     def _second_stage_center_match(
         self,
         unmatched_tracks: list[int],
         unmatched_dets: list[int],
-        detections: list[Detection3D],
-    ) -> list[tuple[int, int]]:
-        out: list[tuple[int, int]] = []
+        batch: DetectionBatch,
+        det_codes: np.ndarray,
+        gate: float,
+    ) -> list[tuple[int, int, float]]:
+        out: list[tuple[int, int, float]] = []
         if not unmatched_tracks or not unmatched_dets:
             return out
 
-        gate = float(self.assoc_cfg["second_stage_center_gate_m"])
         used_dets: set[int] = set()
         for tid in unmatched_tracks:
             trk = self.tracks[tid]
@@ -126,84 +264,282 @@ class Classical3DTracker:
             for dj in unmatched_dets:
                 if dj in used_dets:
                     continue
-                det = detections[dj]
-                if det.label != trk.label:
+                if det_codes[dj] != trk.label_code:
                     continue
-                dist = float(np.linalg.norm(np.array([det.x - trk.filt.x[0], det.y - trk.filt.x[1]])))
+                z = batch.z[dj]
+                dist = math.hypot(z[0] - trk.filt.x[0], z[1] - trk.filt.x[1])
                 if dist < best_dist and dist <= gate:
                     best_dist = dist
                     best = dj
             if best is not None:
-                out.append((tid, best))
+                out.append((tid, best, best_dist))
                 used_dets.add(best)
         return out
 
-    def step(self, timestamp_s: float, detections: list[Detection3D]) -> list[TrackOutput]:
-        dt = self._compute_dt(timestamp_s)
-        self._predict_all(dt)
-
-        track_ids = list(self.tracks.keys())
-        matches: list[tuple[int, int]] = []
-        unmatched_track_ids = track_ids.copy()
-        unmatched_det_ids = list(range(len(detections)))
+    def _center_cost_matrix(
+        self, track_ids: list[int], zs: np.ndarray, det_codes: np.ndarray, gate: float
+    ) -> np.ndarray:
+        """Center distance over ``gate`` for same-class pairs within ``gate``; 1e6 elsewhere."""
+        xy = np.array([self.tracks[tid].filt.x[:2] for tid in track_ids])
+        codes = np.array([self.tracks[tid].label_code for tid in track_ids], dtype=np.int64)
+        dist = np.hypot(xy[:, None, 0] - zs[None, :, 0], xy[:, None, 1] - zs[None, :, 1])
+        ok = (codes[:, None] == det_codes[None, :]) & (dist <= gate)
+        return np.where(ok, dist / gate, 1e6)
+
+    def _solve(
+        self, track_ids: list[int], cols: list[int], cost: np.ndarray, keep_prices: bool = True
+    ) -> list[tuple[int, int, float]]:
+        """Gated (track id, detection, cost) matches of ``cost``, whose rows are ``track_ids`` and columns ``cols``.
+
+        Track prices are read and stored only with ``keep_prices``; a cost on
+        another scale than the gated one must not seed the next frame.
+        """
+        prices = None
+        if self._solver.warm_start and keep_prices:
+            prices = np.array([self.tracks[tid].assign_price for tid in track_ids])
+        row_ind, col_ind, prices = self._solver.solve(cost, prices)
+        if prices is not None and keep_prices:
+            for tid, price in zip(track_ids, prices.tolist()):
+                self.tracks[tid].assign_price = price
+        return [
+            (track_ids[r_i], cols[c_i], float(cost[r_i, c_i]))
+            for r_i, c_i in zip(row_ind, col_ind)
+            if cost[r_i, c_i] < INVALID_COST
+        ]
+
+    def _associate(
+        self,
+        track_ids: list[int],
+        det_ids: np.ndarray,
+        batch: DetectionBatch,
+        det_codes: np.ndarray,
+        center_gate: float,
+    ) -> _Association:
+        """Assignment on the gated cost, then the center-distance fallback, for ``track_ids`` x ``det_ids``.
+
+        Matches and gating innovations are keyed by batch index.
+        """
+        if self._cascade:
+            return self._associate_cascade(track_ids, det_ids, batch, det_codes, center_gate)
+        out = _Association(unmatched_tracks=list(track_ids), unmatched_dets=[int(d) for d in det_ids])
+        if not track_ids or not out.unmatched_dets:
+            return out
 
-        if track_ids and detections:
-            cost = self._cost_matrix(track_ids, detections)
-            row_ind, col_ind = linear_sum_assignment(cost)
+        cols = out.unmatched_dets
+        cost, local_innov = self._cost_matrix(track_ids, batch.z[det_ids], det_codes[det_ids])
+        out.pair_innov = {(tid, cols[j]): v for (tid, j), v in local_innov.items()}
+        out.add(self._solve(track_ids, cols, cost), stage=0)
+        second = self._second_stage_center_match(out.unmatched_tracks, out.unmatched_dets, batch, det_codes, center_gate)
+        out.add([(tid, di, dist / center_gate) for tid, di, dist in second], stage=1)
+        return out
 
-            gated_matches: list[tuple[int, int]] = []
-            for r_i, c_i in zip(row_ind, col_ind):
-                if cost[r_i, c_i] >= 1e5:
-                    continue
-                gated_matches.append((track_ids[r_i], c_i))
-
-            matched_tids = {m[0] for m in gated_matches}
-            matched_dids = {m[1] for m in gated_matches}
-            unmatched_track_ids = [tid for tid in track_ids if tid not in matched_tids]
-            unmatched_det_ids = [di for di in unmatched_det_ids if di not in matched_dids]
-            matches.extend(gated_matches)
-
-            second = self._second_stage_center_match(unmatched_track_ids, unmatched_det_ids, detections)
-            if second:
-                m2_tids = {m[0] for m in second}
-                m2_dids = {m[1] for m in second}
-                unmatched_track_ids = [tid for tid in unmatched_track_ids if tid not in m2_tids]
-                unmatched_det_ids = [di for di in unmatched_det_ids if di not in m2_dids]
-                matches.extend(second)
+    def _associate_cascade(
+        self,
+        track_ids: list[int],
+        det_ids: np.ndarray,
+        batch: DetectionBatch,
+        det_codes: np.ndarray,
+        center_gate: float,
+    ) -> _Association:
+        """``_associate`` in stages, each a smaller assignment than the single one.
+
+        Confirmed tracks take high-score detections, then lost tracks take any
+        remaining detection, both on the gated cost. Tentative tracks and the
+        tracks still unmatched then take what is left on center distance alone.
+        """
+        out = _Association(unmatched_tracks=list(track_ids), unmatched_dets=[int(d) for d in det_ids])
+        high = batch.scores >= self._cascade_high_score
+
+        for stage, (status, high_only) in enumerate((("confirmed", True), ("lost", False))):
+            tids = [tid for tid in out.unmatched_tracks if self.tracks[tid].status == status]
+            cols = [di for di in out.unmatched_dets if high[di] or not high_only]
+            if not tids or not cols:
+                continue
+            cost, local_innov = self._cost_matrix(tids, batch.z[cols], det_codes[cols])
+            out.pair_innov.update({(tid, cols[j]): v for (tid, j), v in local_innov.items()})
+            out.add(self._solve(tids, cols, cost), stage)
+
+        tids, remaining = out.unmatched_tracks, out.unmatched_dets
+        if tids and remaining:
+            cost = self._center_cost_matrix(tids, batch.z[remaining], det_codes[remaining], center_gate)
+            out.add(self._solve(tids, remaining, cost, keep_prices=False), stage=2)
+        return out
 
+    def _update_matched(
+        self, matches: list[tuple[int, int]], pair_innov: dict[tuple[int, int], np.ndarray], batch: DetectionBatch
+    ) -> None:
         for tid, det_idx in matches:
             trk = self.tracks[tid]
-            det = detections[det_idx]
-            r = self._meas_cov_for_label(trk.label)
-            trk.filt.update(det.z_vec, r)
+            code = trk.label_code
+            trk.filt.update(
+                batch.z[det_idx],
+                self.tables.meas_cov[code],
+                self.tables.meas_chol[code],
+                innov=pair_innov.get((tid, det_idx)),
+            )
             trk.hits += 1
             trk.misses = 0
             trk.time_since_update_s = 0.0
-            trk.score_ema = 0.6 * trk.score_ema + 0.4 * det.score
+            trk.score_ema = 0.6 * trk.score_ema + 0.4 * float(batch.scores[det_idx])
 
-            min_hits = int(self.tracker_cfg["min_hits"].get(trk.label, self.tracker_cfg["min_hits"]["default"]))
-            if trk.status == "tentative" and trk.hits >= min_hits and trk.score_ema >= float(self.tracker_cfg["confirm_score_threshold"]):
+            if (
+                trk.status == "tentative"
+                and trk.hits >= self.tables.min_hits[trk.label_code]
+                and trk.score_ema >= self._confirm_score_threshold
+            ):
                 trk.status = "confirmed"
             elif trk.status == "lost":
                 trk.status = "confirmed"
 
-        for tid in unmatched_track_ids:
+    def _mark_missed(self, track_ids: list[int]) -> None:
+        for tid in track_ids:
             trk = self.tracks[tid]
             trk.misses += 1
             if trk.status == "confirmed":
                 trk.status = "lost"
 
-        for di in unmatched_det_ids:
-            det = detections[di]
-            if det.score < float(self.tracker_cfg["init_score_threshold"]):
+    def _associate_partition(
+        self,
+        track_ids: list[int],
+        det_ids: np.ndarray,
+        batch: DetectionBatch,
+        det_codes: np.ndarray,
+        dt: float,
+        q: tuple[np.ndarray, np.ndarray],
+        ego_pose: dict[str, Any] | None,
+    ) -> _Association:
+        """Predict, ROI-check and associate one group of tracks against ``det_ids``.
+
+        Only touches the group's own tracks, so class partitions can run
+        concurrently. Tracks that left the ROI are listed in ``retired`` for
+        the caller to delete.
+        """
+        self._predict(track_ids, dt, q, self._existence_decay ** self._dt_ratio(dt))
+        retired = self._outside_roi(track_ids, ego_pose) if ego_pose is not None else []
+        if retired:
+            gone = set(retired)
+            track_ids = [tid for tid in track_ids if tid not in gone]
+
+        # Position spread grows with sqrt(dt) under dt-scaled noise; never shrink the configured gate.
+        center_gate = self._center_gate_m * math.sqrt(max(1.0, self._dt_ratio(dt)))
+        assoc = self._associate(track_ids, det_ids, batch, det_codes, center_gate)
+        assoc.retired = retired
+        return assoc
+
+    def _commit_partition(self, assoc: _Association, batch: DetectionBatch, revoked: Collection[int]) -> None:
+        """Update the matched tracks of ``assoc``; unmatched tracks and those in ``revoked`` count a miss."""
+        if revoked:
+            kept = [m for m in assoc.matches if m[0] not in revoked]
+            self._update_matched(kept, assoc.pair_innov, batch)
+            self._mark_missed(assoc.unmatched_tracks + [m[0] for m in assoc.matches if m[0] in revoked])
+        else:
+            self._update_matched(assoc.matches, assoc.pair_innov, batch)
+            self._mark_missed(assoc.unmatched_tracks)
+
+    def _class_partitions(self, det_codes: np.ndarray) -> list[tuple[list[int], np.ndarray]]:
+        tids_by_code: dict[int, list[int]] = {}
+        for tid, trk in self.tracks.items():
+            tids_by_code.setdefault(trk.label_code, []).append(tid)
+        codes = sorted(set(tids_by_code) | {int(c) for c in det_codes})
+        return [(tids_by_code.get(c, []), np.flatnonzero(det_codes == c)) for c in codes]
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._class_threads, thread_name_prefix="track3d-class")
+            self._pool_finalizer = weakref.finalize(self, self._pool.shutdown, wait=False)
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the thread pool this tracker started, if any; a later threaded step starts a new one."""
+        if self._pool_finalizer is not None:
+            self._pool_finalizer()
+            self._pool_finalizer = None
+            self._pool = None
+
+    def __enter__(self) -> Classical3DTracker:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _prepare(
+        self, detections: DetectionBatch | Sequence[Detection3D], ego_pose: dict[str, Any] | None
+    ) -> tuple[DetectionBatch, np.ndarray, dict[str, Any] | None]:
+        """Prefilter and ROI-cull a frame's detections; returns them, their class codes and the ROI pose."""
+        batch = detections if isinstance(detections, DetectionBatch) else DetectionBatch.from_detections(detections)
+        batch, self.last_prefilter_stats = self.prefilter(batch)
+        self.last_roi_stats = RoiStats()
+        use_roi = self.roi.enabled and ego_pose is not None
+        if use_roi and len(batch):
+            inside = self.roi.inside(batch.z[:, :2], batch.label_codes, batch.label_names, ego_pose)
+            self.last_roi_stats.detections = int(inside.size - np.count_nonzero(inside))
+            if self.last_roi_stats.detections:
+                batch = batch.select(inside)
+        det_codes = self.tables.codes_for(batch.label_names)[batch.label_codes]
+        return batch, det_codes, ego_pose if use_roi else None
+
+    def _associate_all(
+        self, batch: DetectionBatch, det_codes: np.ndarray, dt: float, roi_pose: dict[str, Any] | None
+    ) -> list[_Association]:
+        """Predict and associate every track against ``batch``, deleting tracks that left the ROI."""
+        q = self.process_noise(dt)
+        if self._class_threads > 1:
+            # Classes never interact, so each partition is associated on its own.
+            assocs = list(
+                self._thread_pool().map(
+                    lambda part: self._associate_partition(part[0], part[1], batch, det_codes, dt, q, roi_pose),
+                    self._class_partitions(det_codes),
+                )
+            )
+        else:
+            assocs = [
+                self._associate_partition(
+                    list(self.tracks.keys()), np.arange(len(batch)), batch, det_codes, dt, q, roi_pose
+                )
+            ]
+        for assoc in assocs:
+            for tid in assoc.retired:
+                del self.tracks[tid]
+        return assocs
+
+    def _commit_all(
+        self, assocs: list[_Association], batch: DetectionBatch, revoked: Collection[int] = frozenset()
+    ) -> None:
+        if self._class_threads > 1 and len(assocs) > 1:
+            list(self._thread_pool().map(lambda assoc: self._commit_partition(assoc, batch, revoked), assocs))
+        else:
+            for assoc in assocs:
+                self._commit_partition(assoc, batch, revoked)
+
+    def _advance(
+        self, batch: DetectionBatch, det_codes: np.ndarray, dt: float, roi_pose: dict[str, Any] | None
+    ) -> tuple[list[int], list[int]]:
+        """Predict, associate and update every track against ``batch``.
+
+        Deletes tracks that left the ROI and returns them, plus the unmatched
+        detections in ascending order.
+        """
+        assocs = self._associate_all(batch, det_codes, dt, roi_pose)
+        self._commit_all(assocs, batch)
+        retired = [tid for a in assocs for tid in a.retired]
+        # Births in detection order, as in the serial path, so track ids do not depend on threading.
+        return retired, sorted(di for a in assocs for di in a.unmatched_dets)
+
+    def _spawn(self, batch: DetectionBatch, det_codes: np.ndarray, det_ids: list[int]) -> list[TrackNode]:
+        """New tentative tracks for the detections ``det_ids`` that clear the init score threshold."""
+        nodes: list[TrackNode] = []
+        for di in det_ids:
+            score = float(batch.scores[di])
+            if score < self._init_score_threshold:
                 continue
-            node = self._init_track(det)
-            self.tracks[node.track_id] = node
+            nodes.append(self._init_track(batch.z[di], score, int(det_codes[di])))
+        return nodes
 
+    def _prune(self) -> None:
+        max_age_s = self.tables.max_age_s
         to_delete: list[int] = []
         for tid, trk in self.tracks.items():
-            max_age = self._max_age_for_label(trk.label)
-            if trk.time_since_update_s > max_age:
+            if trk.time_since_update_s > max_age_s[trk.label_code]:
                 to_delete.append(tid)
             if trk.status == "tentative" and trk.misses > 0:
                 to_delete.append(tid)
@@ -213,22 +549,42 @@ class Classical3DTracker:
         for tid in set(to_delete):
             self.tracks.pop(tid, None)
 
-        self._last_timestamp_s = timestamp_s
+    def _output_batch(self) -> TrackOutputBatch:
+        nodes = sorted(
+            (trk for trk in self.tracks.values() if trk.status in ("confirmed", "lost")), key=lambda t: t.track_id
+        )
+        return TrackOutputBatch(
+            track_ids=[t.track_id for t in nodes],
+            label_codes=[t.label_code for t in nodes],
+            label_names=self.tables.names,
+            scores=np.clip([t.score_ema for t in nodes], 0.0, 1.0),
+            states=np.array([t.filt.x for t in nodes], dtype=float).reshape(-1, STATE_DIM),
+            age_s=[t.age_s for t in nodes],
+            hits=[t.hits for t in nodes],
+            status_codes=[TRACK_STATUSES.index(t.status) for t in nodes],
+        )
 
-        outputs: list[TrackOutput] = []
-        for trk in self.tracks.values():
-            if trk.status not in {"confirmed", "lost"}:
-                continue
-            out = TrackOutput(
-                track_id=trk.track_id,
-                label=trk.label,
-                score=clamp(trk.score_ema, 0.0, 1.0),
-                state=trk.filt.x.copy(),
-                age_s=trk.age_s,
-                hits=trk.hits,
-                status=trk.status,
-            )
-            outputs.append(out)
+    def step_batch(
+        self,
+        timestamp_s: float,
+        detections: DetectionBatch | Sequence[Detection3D],
+        ego_pose: dict[str, Any] | None = None,
+    ) -> TrackOutputBatch:
+        """Advance to ``timestamp_s``; ``ego_pose`` (translation plus yaw or rotation) enables ROI culling."""
+        batch, det_codes, roi_pose = self._prepare(detections, ego_pose)
+        retired, unmatched_det_ids = self._advance(batch, det_codes, self._compute_dt(timestamp_s), roi_pose)
+        self.last_roi_stats.tracks = len(retired)
+        for node in self._spawn(batch, det_codes, unmatched_det_ids):
+            self.tracks[node.track_id] = node
+        self._prune()
+        self._last_timestamp_s = timestamp_s
+        return self._output_batch()
 
-        outputs.sort(key=lambda t: (t.track_id, t.label))
-        return outputs
+    def step(
+        self,
+        timestamp_s: float,
+        detections: DetectionBatch | Sequence[Detection3D],
+        ego_pose: dict[str, Any] | None = None,
+    ) -> list[TrackOutput]:
+        """``step_batch`` as a list of ``TrackOutput``."""
+        return self.step_batch(timestamp_s, detections, ego_pose).to_outputs()
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from cam3d_tracker.config import load_config
+from cam3d_tracker.tracker import Classical3DTracker
+
+DEFAULT_CONFIG = Path(__file__).resolve().parents[1] / "configs" / "default.yaml"
+
+
+@pytest.fixture
+def tracker_cfg():
+    """``tracker_cfg(section, **values)``: the default config on the NumPy backend, ``values`` set in ``section``."""
+
+    def make(section=None, **values):
+        cfg = load_config(DEFAULT_CONFIG).raw
+        cfg["tracker"]["kernel_backend"] = "numpy"
+        if section is not None:
+            cfg.setdefault(section, {}).update(values)
+        return cfg
+
+    return make
+
+
+@pytest.fixture
+def tracker_factory(tracker_cfg):
+    """``tracker_factory(section, **values)``: a ``Classical3DTracker`` on ``tracker_cfg(section, **values)``."""
+
+    def make(section=None, **values):
+        return Classical3DTracker(tracker_cfg(section, **values))
+
+    return make
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from cam3d_tracker.nuscenes_runtime.adapters import default_output_adapter, rows_to_batch
+from cam3d_tracker.nuscenes_runtime.pipeline import _detect
+from cam3d_tracker.prefilter import DetectionPrefilter
+
+_BOXES = np.array(
+    [
+        [1.0, 2.0, 0.5, 4.5, 1.9, 1.6, 0.3, 0.0, 0.0],
+        [5.0, -1.0, 0.8, 0.7, 0.7, 1.7, 4.0, 0.0, 0.0],
+        [9.0, 3.0, 0.5, 4.2, 1.8, 1.5, -0.2, 0.0, 0.0],
+    ]
+)
+_SCORES = np.array([0.9, 0.1, 0.6])
+_LABELS = np.array([0, 5, 0])
+
+
+class _Runtime:
+    def __init__(self, raw_output):
+        self.raw_output = raw_output
+
+    def infer_batch(self, frame, keep_raw=False):
+        out = default_output_adapter(self.raw_output, frame)
+        return out if not isinstance(out, list) else rows_to_batch(out, keep_raw=keep_raw)
+
+
+def _rows():
+    return [
+        {"x": b[0], "y": b[1], "z": b[2], "l": b[3], "w": b[4], "h": b[5], "yaw": b[6], "score": s, "label": int(c)}
+        for b, s, c in zip(_BOXES, _SCORES, _LABELS)
+    ]
+
+
+def test_array_and_dict_adapters_give_the_same_detections():
+    dcfg = {"min_score": 0.5, "transform_ego_to_global": False, "label_map": {0: "car", 5: "pedestrian"}}
+    pred = SimpleNamespace(bboxes_3d=_BOXES, scores_3d=_SCORES, labels_3d=_LABELS)
+    frame = {"timestamp_s": 0.0}
+
+    arrays = _detect(_Runtime([SimpleNamespace(pred_instances_3d=pred)]), frame, dcfg)
+    dicts = _detect(_Runtime({"detections": _rows()}), frame, dcfg)
+
+    for batch in (arrays, dicts):
+        assert batch.labels() == ["car", "car"]
+        assert np.array_equal(batch.scores, [0.9, 0.6])
+    assert np.allclose(arrays.z, dicts.z)
+    assert np.allclose(arrays.z[0], [1.0, 2.0, 0.5, 0.3, 4.5, 1.9, 1.6])
+    # Yaw is wrapped to (-pi, pi].
+    assert abs(arrays.z[:, 3]).max() <= np.pi
+
+
+def test_dict_adapter_keeps_raw_rows():
+    dcfg = {"transform_ego_to_global": False, "keep_raw_detections": True}
+    batch = _detect(_Runtime(_rows()), {"timestamp_s": 0.0}, dcfg)
+    assert batch.raw[1]["label"] == 5
+    assert batch.labels() == ["0", "5", "0"]
+
+
+def test_label_map_merges_codes_mapped_to_one_name():
+    # Detector classes 0 and 1 both map to "car": one code, so per-class NMS sees the duplicate.
+    rows = [
+        {"x": 0.0, "y": 0.0, "z": 0.0, "l": 4.0, "w": 2.0, "h": 1.5, "yaw": 0.0, "score": 0.9, "label": 0},
+        {"x": 0.2, "y": 0.1, "z": 0.0, "l": 4.0, "w": 2.0, "h": 1.5, "yaw": 0.0, "score": 0.8, "label": 1},
+    ]
+    dcfg = {"transform_ego_to_global": False, "label_map": {0: "car", 1: "car"}}
+    batch = _detect(_Runtime(rows), {"timestamp_s": 0.0}, dcfg)
+    assert batch.label_names == ("car",)
+    assert batch.label_codes.tolist() == [0, 0]
+
+    prefilter = DetectionPrefilter({"enabled": True, "nms": {"mode": "center", "center_dist_m": {"default": 1.0}}})
+    kept, stats = prefilter(batch)
+    assert kept.scores.tolist() == [0.9] and stats.nms == 1
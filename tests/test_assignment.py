@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from cam3d_tracker.assignment import AuctionAssignment, make_assignment_solver
+from cam3d_tracker.config import load_config
+from cam3d_tracker.models import DetectionBatch
+from cam3d_tracker.tracker import Classical3DTracker
+
+
+def test_auction_matches_scipy_within_epsilon():
+    rng = np.random.default_rng(0)
+    eps = 1e-4
+    for warm in (False, True):
+        solver = AuctionAssignment(eps, warm_start=warm)
+        for _ in range(100):
+            n, m = rng.integers(1, 30, size=2)
+            cost = rng.uniform(0.0, 1.2, (n, m))
+            cost[rng.uniform(size=(n, m)) < rng.uniform(0.3, 0.95)] = 1e6
+            ref_r, ref_c = linear_sum_assignment(cost)
+            ok = cost[ref_r, ref_c] < 1e5
+
+            prices = rng.uniform(0.0, 2.0, n) if warm else None
+            rows, cols, _ = solver.solve(cost, prices)
+            assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+            assert (cost[rows, cols] < 1e5).all()
+            assert len(rows) == ok.sum()
+            assert cost[rows, cols].sum() <= cost[ref_r, ref_c][ok].sum() + min(n, m) * eps + 1e-9
+
+
+def _run(assoc):
+    cfg = load_config("configs/default.yaml").raw
+    cfg["association"].update(assoc)
+    tracker = Classical3DTracker(cfg)
+    rng = np.random.default_rng(1)
+    starts = rng.uniform(-40.0, 40.0, size=(12, 2))
+    vel = rng.normal(0.0, 2.0, size=(12, 2))
+    rows = []
+    for k in range(15):
+        t = 0.5 * k
+        xy = starts + vel * t + rng.normal(scale=0.05, size=starts.shape)
+        z = np.column_stack([xy, np.full((12, 5), [0.5, 0.0, 4.5, 1.9, 1.6])])
+        for out in tracker.step(t, DetectionBatch.from_columns(z, np.full(12, 0.9), ["car"] * 12)):
+            rows.append((t, out.track_id, out.status))
+    return rows
+
+
+def test_tracker_with_auction_solver_gives_the_same_tracks():
+    ref = _run({})
+    assert _run({"solver": "auction"}) == ref
+    assert _run({"solver": "auction", "auction_warm_start": True}) == ref
+
+
+def test_unknown_solver_is_rejected():
+    with pytest.raises(ValueError):
+        make_assignment_solver({"solver": "greedy"})
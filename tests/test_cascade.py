@@ -0,0 +1,54 @@
+import numpy as np
+
+from cam3d_tracker.models import DetectionBatch
+
+
+def _batch(xy, scores):
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    z = np.column_stack([xy, np.zeros(len(xy)), np.zeros(len(xy)), np.tile([4.0, 1.8, 1.6], (len(xy), 1))])
+    return DetectionBatch.from_columns(z, scores, ["car"] * len(xy))
+
+
+def test_cascade_tracks_through_clutter_like_the_single_stage(tracker_factory):
+    rng = np.random.default_rng(2)
+    starts = np.array([[0.0, 0.0], [0.0, 20.0], [0.0, -20.0]])
+    runs = {}
+    for cascade in (False, True):
+        tracker = tracker_factory("association", cascade={"enabled": cascade, "high_score_threshold": 0.5})
+        rows = []
+        for k in range(20):
+            t = 0.5 * k
+            cars = starts + [5.0 * t, 0.0] + rng.normal(scale=0.1, size=(3, 2))
+            # Low-score clutter never starts tracks (below init_score_threshold) but crowds the cost matrix.
+            clutter = rng.uniform(-30.0, 80.0, size=(30, 2))
+            batch = _batch(np.vstack([cars, clutter]), np.r_[np.full(3, 0.9), np.full(30, 0.1)])
+            rows.append([(o.track_id, o.status, o.hits) for o in tracker.step(t, batch)])
+        runs[cascade] = rows
+    assert runs[True][-1] == [(1, "confirmed", 20), (2, "confirmed", 20), (3, "confirmed", 20)]
+    assert runs[True] == runs[False]
+
+
+def test_confirmed_tracks_take_high_score_detections_first(tracker_factory):
+    tracker = tracker_factory("association", cascade={"enabled": True, "high_score_threshold": 0.5})
+    for k in range(4):
+        tracker.step(0.5 * k, _batch([[2.0 * k, 0.0]], [0.9]))
+    # A low-score detection sits on the (lagging) prediction; the real one is a metre ahead of it.
+    out = tracker.step(2.0, _batch([[7.0, 0.0], [8.0, 0.0]], [0.2, 0.9]))
+    assert [o.track_id for o in out] == [1]
+    assert out[0].state[0] > 7.5
+
+
+def test_center_distance_stage_leaves_auction_prices_alone(tracker_factory):
+    tracker = tracker_factory(
+        "association",
+        cascade={"enabled": True, "high_score_threshold": 0.5},
+        solver="auction",
+        auction_warm_start=True,
+    )
+    prices = []
+    for k in range(3):
+        tracker.step(0.5 * k, _batch([[2.0 * k, 0.0]], [0.9]))
+        prices.append(tracker.tracks[1].assign_price)
+    # The tentative track's second hit is a center-distance match; only the gated stage sets a price.
+    assert prices[:2] == [0.0, 0.0]
+    assert tracker.tracks[1].status == "confirmed" and prices[2] > 0.0
@@ -0,0 +1,19 @@
+import numpy as np
+
+from cam3d_tracker.class_tables import ClassTables
+from cam3d_tracker.config import load_config
+
+
+def test_class_tables_intern_and_defaults():
+    cfg = load_config("configs/default.yaml").raw
+    tables = ClassTables(cfg)
+
+    ped = tables.codes["pedestrian"]
+    assert np.allclose(np.diag(tables.meas_cov[ped]), np.array(cfg["noise"]["meas_by_class"]["pedestrian"]) ** 2)
+    assert np.allclose(tables.meas_chol[ped] @ tables.meas_chol[ped].T, tables.meas_cov[ped])
+    assert tables.max_age_s[ped] == 2.0
+
+    code = tables.intern("barrier")
+    assert tables.intern("barrier") == code
+    assert tables.max_age_s[code] == cfg["tracker"]["max_age_s"]["default"]
+    assert tables.min_hits[code] == cfg["tracker"]["min_hits"]["default"]
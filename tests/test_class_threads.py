@@ -0,0 +1,51 @@
+import numpy as np
+
+from cam3d_tracker.models import DetectionBatch
+from cam3d_tracker.tiling import TiledTracker
+
+LABELS = ["car", "pedestrian", "truck", "bicycle"]
+
+
+def test_class_threads_match_serial_step_for_step(tracker_factory):
+    rng = np.random.default_rng(11)
+    starts = rng.uniform(-40, 40, size=(24, 2))
+    velocity = rng.normal(scale=1.5, size=(24, 2))
+    labels = [LABELS[k % len(LABELS)] for k in range(24)]
+    serial = tracker_factory("tracker", class_threads=0)
+    threaded = tracker_factory("tracker", class_threads=4)
+
+    for k in range(25):
+        t = 0.5 * k
+        # Objects blink in and out so births, misses and deletions all happen.
+        alive = rng.random(24) > 0.2
+        xy = starts[alive] + velocity[alive] * t + rng.normal(scale=0.2, size=(int(alive.sum()), 2))
+        yaw = np.arctan2(velocity[alive, 1], velocity[alive, 0])
+        z = np.column_stack([xy, np.zeros(len(xy)), yaw, np.tile([4.0, 1.8, 1.6], (len(xy), 1))])
+        batch = DetectionBatch.from_columns(z, rng.uniform(0.3, 0.95, len(xy)), [l for l, a in zip(labels, alive) if a])
+
+        a = serial.step(t, batch)
+        b = threaded.step(t, batch)
+        assert [(o.track_id, o.label, o.status, o.hits) for o in a] == [(o.track_id, o.label, o.status, o.hits) for o in b]
+        assert all(np.array_equal(x.state, y.state) for x, y in zip(a, b))
+        assert list(serial.tracks) == list(threaded.tracks)
+
+
+def test_close_shuts_down_the_pool_and_tiles_share_one(tracker_cfg, tracker_factory):
+    trk = tracker_factory("tracker", class_threads=4)
+    with trk:
+        trk.step(0.0, DetectionBatch.from_columns(np.array([[0, 0, 0, 0, 4, 1.8, 1.6]]), [0.9], ["car"]))
+        pool = trk._pool
+        assert pool is not None
+    assert trk._pool is None and pool._shutdown
+
+    cfg = tracker_cfg("tiling", enabled=True, tile_size_m=20.0, overlap_m=5.0, workers=0)
+    cfg["tracker"]["class_threads"] = 4
+    with TiledTracker(cfg) as tiled:
+        for k in range(3):
+            z = np.array([[5.0, 5.0, 0, 0, 4, 1.8, 1.6], [45.0, 5.0, 0, 0, 0.6, 0.6, 1.7]])
+            tiled.step(0.5 * k, DetectionBatch.from_columns(z, [0.9, 0.9], ["car", "pedestrian"]))
+        tiles = tiled._workers[0]._tiles
+        shared = tiles._pool
+        assert len(tiles.trackers) == 2
+        assert all(t._pool is shared for t in tiles.trackers.values())
+    assert shared._shutdown
@@ -0,0 +1,49 @@
+import numpy as np
+
+from cam3d_tracker.delta_tracks import DeltaTrackEncoder, decode_delta_tracks, encode_rows
+from cam3d_tracker.io_utils import flatten_outputs
+from cam3d_tracker.models import DetectionBatch
+
+
+def _run(tracker, encoder):
+    rng = np.random.default_rng(5)
+    rows = []
+    for k in range(30):
+        t = 0.5 * k
+        # A moving car for the whole run and a pedestrian that disappears halfway.
+        z = [[2.0 * t, 0.0, 0.5, 0.0, 4.5, 1.9, 1.6]]
+        labels = ["car"]
+        if k < 15:
+            z.append([5.0, 8.0 + 0.6 * t, 0.8, 1.57, 0.7, 0.7, 1.7])
+            labels.append("pedestrian")
+        z = np.array(z) + rng.normal(scale=0.05, size=(len(z), 7))
+        outs = tracker.step(t, DetectionBatch.from_columns(z, np.full(len(z), 0.9), labels))
+        encoder.add(t, outs)
+        rows.extend(flatten_outputs(t, outs))
+    return rows
+
+
+def test_delta_round_trip_within_precision(tracker_factory):
+    encoder = DeltaTrackEncoder({"default": 0.01, "yaw": 0.001})
+    rows = _run(tracker_factory(), encoder)
+    payload = encoder.payload()
+    decoded = decode_delta_tracks(payload)
+
+    assert len(decoded) == len(rows)
+    for full, dec in zip(rows, decoded):
+        assert list(dec) == list(full)
+        for key, value in full.items():
+            if isinstance(value, float) and key != "timestamp_s":
+                step = 0.001 if key in ("yaw", "yaw_rate", "score", "age_s") else 0.01
+                assert abs(dec[key] - value) <= 0.5 * step + 1e-9, key
+            else:
+                assert dec[key] == value, key
+
+    born = [tid for f in payload["frames"] for tid in f["born"]]
+    died = [tid for f in payload["frames"] for tid in f["died"]]
+    assert sorted(born) == sorted(int(k) for k in payload["tracks"])
+    assert len(died) == 1 and payload["tracks"][str(died[0])]["label"] == "pedestrian"
+    # Unchanged fields are not repeated: far fewer values than the full row output.
+    assert sum(len(r) - 2 for f in payload["frames"] for r in f["rows"]) < 0.8 * 13 * len(rows)
+
+    assert decode_delta_tracks(encode_rows(decoded)) == decoded
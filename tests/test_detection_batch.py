@@ -0,0 +1,16 @@
+import numpy as np
+
+from cam3d_tracker.io_utils import load_frames
+
+
+def test_load_frames_builds_array_batches():
+    frames = load_frames("data/sample_detections.json")
+    batch = frames[1].batch
+    assert batch.z.shape == (3, 7)
+    assert batch.raw is None
+    det = batch.detection(0)
+    assert np.allclose(det.z_vec, batch.z[0])
+    assert batch.label_names[batch.label_codes[0]] == det.label
+
+    kept = load_frames("data/sample_detections.json", keep_raw=True)
+    assert kept[1].batch.raw[0]["label"] == det.label
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from cam3d_tracker.evaluation import build_scenes, evaluate_tracking
+
+
+def _write_scene(tmp_path, name, n_frames=6):
+    results, timestamps, tracks = {}, {}, []
+    for k in range(n_frames):
+        token = f"{name}_{k}"
+        timestamps[token] = 100.0 * len(name) + 0.5 * k
+        results[token] = []
+        for obj, (label, y) in enumerate((("car", 0.0), ("car", 8.0), ("pedestrian", 20.0))):
+            x = 2.0 * k + obj
+            results[token].append(
+                {"translation": [x, y, 0.0], "detection_name": label, "tracking_id": f"{name}_inst{obj}"}
+            )
+            tracks.append({"track_id": 10 * obj + 1, "label": label, "score": 0.8, "x": x + 0.1, "y": y,
+                           "timestamp_s": timestamps[token], "status": "confirmed"})
+    gt_path = tmp_path / f"{name}_gt.json"
+    ts_path = tmp_path / f"{name}_ts.json"
+    gt_path.write_text(json.dumps({"results": results}))
+    ts_path.write_text(json.dumps(timestamps))
+    return gt_path, ts_path, tracks
+
+
+def test_perfect_tracks_score_one_and_swaps_count_as_id_switches(tmp_path):
+    gt_a, ts_a, trk_a = _write_scene(tmp_path, "a")
+    gt_b, ts_b, trk_b = _write_scene(tmp_path, "bb")
+    tracks_path = tmp_path / "tracks.json"
+    tracks_path.write_text(json.dumps({"tracks": trk_a + trk_b}))
+
+    scenes = build_scenes([gt_a, gt_b], tracks_path, timestamps=[ts_a, ts_b])
+    metrics = evaluate_tracking(scenes)
+    assert metrics["overall"]["mota"] == pytest.approx(1.0)
+    assert metrics["overall"]["idf1"] == pytest.approx(1.0)
+    assert metrics["overall"]["amota"] == pytest.approx(1.0)
+    assert metrics["overall"]["ids"] == 0
+
+    # Swap the two car identities from frame 3 on in scene "a".
+    for row in trk_a:
+        if row["label"] == "car" and row["timestamp_s"] >= 101.5:
+            row["track_id"] = 11 if row["track_id"] == 1 else 1
+    tracks_path.write_text(json.dumps({"tracks": trk_a + trk_b}))
+    scenes = build_scenes([gt_a, gt_b], tracks_path, timestamps=[ts_a, ts_b])
+    swapped = evaluate_tracking(scenes)
+    assert swapped["classes"]["car"]["ids"] == 2
+    assert swapped["classes"]["car"]["idf1"] < 1.0
+    assert evaluate_tracking(scenes, workers=2) == swapped
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("numpy", "scipy", "yaml", "torch", "nuscenes", "numba")
+# Total self import time of everything `--help` loads, in microseconds. The
+# interpreter's own startup imports sit well below this; scipy alone is ~400 ms.
+BUDGET_US = 150_000
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "cam3d_tracker.cli",
+        "cam3d_tracker.eval_cli",
+        "cam3d_tracker.nuscenes_runtime.cli",
+        "cam3d_tracker.nuscenes_runtime.sparse4d_cli",
+    ],
+)
+def test_cli_help_import_budget(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", module, "--help"], capture_output=True, text=True, check=True
+    )
+    rows = [line[len("import time:") :].split("|") for line in proc.stderr.splitlines() if line.startswith("import time:")]
+    rows = [r for r in rows if r[0].strip().isdigit()]
+    loaded = {r[2].strip().split(".")[0] for r in rows}
+    assert not loaded & set(HEAVY)
+    assert sum(int(r[0]) for r in rows) < BUDGET_US
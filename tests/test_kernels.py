@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+from cam3d_tracker.config import load_config
+from cam3d_tracker.io_utils import load_frames
+from cam3d_tracker.kernels import NUMPY_KERNELS, get_kernels
+from cam3d_tracker.math_utils import wrap_angle
+from cam3d_tracker.tracker import Classical3DTracker
+
+pytest.importorskip("numba")
+
+
+def _random_models(rng):
+    x = rng.normal(size=(2, 9))
+    x[:, 3] = rng.uniform(0.0, 10.0, size=2)
+    x[:, 4] = rng.uniform(-math.pi, math.pi, size=2)
+    x[:, 6:] = rng.uniform(0.5, 5.0, size=(2, 3))
+    a = rng.normal(size=(2, 9, 9))
+    p = a @ a.transpose(0, 2, 1) + np.eye(9)
+    mu = rng.dirichlet([1.0, 1.0])
+    return x, p, mu
+
+
+def test_numba_kernels_match_numpy():
+    nb = get_kernels("numba")
+    rng = np.random.default_rng(0)
+    transition = np.array([[0.95, 0.05], [0.05, 0.95]])
+    q = np.diag(rng.uniform(0.1, 1.0, size=9) ** 2)
+    r = np.diag(rng.uniform(0.2, 2.0, size=7) ** 2)
+
+    for theta in (0.1, 3.5, -7.0, 40.0, math.pi, -math.pi):
+        assert nb.wrap_angle(theta) == pytest.approx(wrap_angle(theta), abs=1e-12)
+
+    for _ in range(20):
+        x, p, mu = _random_models(rng)
+        for name in ("mix", "fuse"):
+            args = (x, p, mu, transition) if name == "mix" else (x, p, mu)
+            for a, b in zip(getattr(NUMPY_KERNELS, name)(*args), getattr(nb, name)(*args)):
+                assert np.allclose(a, b, atol=1e-9)
+        for a, b in zip(NUMPY_KERNELS.predict_models(x, p, 0.5, q, q), nb.predict_models(x, p, 0.5, q, q)):
+            assert np.allclose(a, b, atol=1e-7)
+        for a, b in zip(NUMPY_KERNELS.mode_gains(x, p, r), nb.mode_gains(x, p, r)):
+            assert np.allclose(a, b, rtol=1e-7, atol=1e-9)
+        for a, b in zip(NUMPY_KERNELS.gate_factors(x[0], p[0], r), nb.gate_factors(x[0], p[0], r)):
+            assert np.allclose(a, b, rtol=1e-7, atol=1e-9)
+
+        box_b = x[0].copy()
+        box_b[:2] += rng.normal(scale=1.0, size=2)
+        box_b[4] += rng.normal(scale=0.5)
+        assert nb.bev_iou(x[0], box_b) == pytest.approx(NUMPY_KERNELS.bev_iou(x[0], box_b), abs=1e-9)
+
+
+def test_tracker_backends_agree():
+    cfg = load_config("configs/default.yaml").raw
+    frames = load_frames("data/sample_detections.json")
+    results = []
+    for backend in ("numpy", "numba"):
+        cfg["tracker"]["kernel_backend"] = backend
+        tracker = Classical3DTracker(cfg)
+        results.append([tracker.step(f.timestamp_s, f.batch) for f in frames])
+
+    for outs_np, outs_nb in zip(*results):
+        assert [o.track_id for o in outs_np] == [o.track_id for o in outs_nb]
+        for a, b in zip(outs_np, outs_nb):
+            assert np.allclose(a.state, b.state, atol=1e-6)
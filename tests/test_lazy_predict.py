@@ -0,0 +1,59 @@
+import numpy as np
+
+from cam3d_tracker.imm_ekf import IMMEKF, SqrtIMMEKF
+from cam3d_tracker.models import DetectionBatch
+
+_Q_CV = np.diag(np.array([0.8, 0.8, 0.4, 1.2, 0.15, 0.2, 0.05, 0.05, 0.05]) ** 2)
+_Q_CTRV = np.diag(np.array([0.6, 0.6, 0.4, 1.0, 0.3, 0.4, 0.05, 0.05, 0.05]) ** 2)
+_R = np.diag(np.array([0.5, 0.4, 0.3, 0.2, 0.3, 0.3, 0.3]) ** 2)
+
+
+def test_coast_matches_eager_predict_and_bounds_the_gate():
+    rng = np.random.default_rng(0)
+    trans = np.array([[0.95, 0.05], [0.05, 0.95]])
+    for cls in (IMMEKF, SqrtIMMEKF):
+        for _ in range(20):
+            x0 = np.array([0.0, 0.0, 0.0, rng.uniform(-15, 15), rng.uniform(-3, 3), rng.normal(0, 0.5), 4.0, 2.0, 1.6])
+            a = rng.normal(size=(9, 9)) * rng.uniform(0.05, 1.5)
+            p0 = a @ a.T + 0.01 * np.eye(9)
+            mu = rng.dirichlet([1.0, 1.0])
+            eager, lazy = cls(x0, p0, mu, trans), cls(x0, p0, mu, trans)
+            z = x0[[0, 1, 2, 4, 6, 7, 8]] + rng.normal(size=7)
+            eager.update(z, _R)
+            lazy.update(z, _R)
+            for _ in range(8):
+                dt = rng.uniform(0.05, 1.0)
+                eager.predict(dt, _Q_CV, _Q_CTRV)
+                lazy.coast(dt, _Q_CV, _Q_CTRV)
+                assert np.array_equal(eager.x, lazy.x)
+                s_xy = eager.p[:2, :2] + _R[:2, :2]
+                assert np.linalg.eigvalsh(s_xy).max() <= lazy.position_variance_bound(_R)
+            assert lazy.pending_steps == 8
+            assert np.array_equal(eager.p, lazy.p)
+            assert lazy.pending_steps == 0
+
+
+def _run(tracker):
+    rng = np.random.default_rng(3)
+    rows = []
+    for k in range(30):
+        t = 0.5 * k
+        z, labels = [], []
+        # Occluded for three frames, then seen again.
+        if not 8 <= k < 11:
+            z.append([3.0 * t, 0.0, 0.5, 0.0, 4.5, 1.9, 1.6])
+            labels.append("car")
+        # Gone for good after frame 12.
+        if k < 12:
+            z.append([20.0, -1.5 * t, 0.5, -1.57, 4.5, 1.9, 1.6])
+            labels.append("car")
+        z = np.array(z) + rng.normal(scale=0.05, size=(len(z), 7))
+        for out in tracker.step(t, DetectionBatch.from_columns(z, np.full(len(z), 0.9), labels)):
+            rows.append((t, out.track_id, out.status, out.state.tolist()))
+    return rows
+
+
+def test_lazy_lost_predict_does_not_change_tracks(tracker_factory):
+    eager = _run(tracker_factory("tracker", lazy_lost_predict=False))
+    assert {r[2] for r in eager} == {"confirmed", "lost"}
+    assert _run(tracker_factory("tracker", lazy_lost_predict=True)) == eager
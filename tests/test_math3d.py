@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+
+from cam3d_tracker.nuscenes_runtime.math3d import ego_to_global_batch, ego_to_global_xyzyaw
+
+
+def _pose(yaw, pitch=0.0):
+    # Quaternion for yaw about z followed by pitch about y.
+    cy, sy = math.cos(yaw / 2.0), math.sin(yaw / 2.0)
+    cp, sp = math.cos(pitch / 2.0), math.sin(pitch / 2.0)
+    q = [cy * cp, -sy * sp, cy * sp, sy * cp]
+    return {"translation": [100.0, -20.0, 1.5], "rotation": q, "yaw": yaw}
+
+
+def test_batch_transform_matches_scalar_and_quaternion_for_flat_pose():
+    rng = np.random.default_rng(0)
+    block = np.column_stack([rng.normal(scale=20.0, size=(50, 3)), rng.uniform(-math.pi, math.pi, size=50)])
+    pose = _pose(2.9)
+    expected = np.array([ego_to_global_xyzyaw(*row, pose) for row in block])
+    assert np.allclose(ego_to_global_batch(block, pose), expected)
+    assert np.allclose(ego_to_global_batch(block, pose, rotation="quaternion"), expected)
+
+
+def test_quaternion_transform_applies_pitch():
+    pose = _pose(0.0, pitch=0.1)
+    out = ego_to_global_batch(np.array([[10.0, 0.0, 0.0, 0.0]]), pose, rotation="quaternion")
+    assert np.isclose(out[0, 2], 1.5 - 10.0 * math.sin(0.1))
+    assert np.isclose(out[0, 3], 0.0)
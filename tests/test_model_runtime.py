@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from cam3d_tracker.nuscenes_runtime.model_runtime import (
+    DetectorRuntime,
+    clear_warm_runtimes,
+    load_state_dict,
+    prepared_checkpoint_path,
+)
+
+
+def test_prepared_path_follows_the_checkpoint_file(tmp_path):
+    ckpt = tmp_path / "model.pth"
+    ckpt.write_bytes(b"v1")
+    first = prepared_checkpoint_path(ckpt, tmp_path / "cache")
+    assert first == prepared_checkpoint_path(str(ckpt), tmp_path / "cache")
+    assert first.parent == tmp_path / "cache"
+
+    st = ckpt.stat()
+    os.utime(ckpt, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert prepared_checkpoint_path(ckpt, tmp_path / "cache") != first
+
+
+def test_prepared_checkpoint_round_trip(tmp_path):
+    torch = pytest.importorskip("torch")
+    ckpt = tmp_path / "model.pth"
+    torch.save({"state_dict": {"module.fc.weight": torch.ones(2, 3), "fc.bias": torch.zeros(2)}}, ckpt)
+
+    cold = load_state_dict(torch, ckpt, tmp_path / "cache")
+    assert sorted(cold) == ["fc.bias", "fc.weight"]
+    assert prepared_checkpoint_path(ckpt, tmp_path / "cache").exists()
+
+    warm = load_state_dict(torch, ckpt, tmp_path / "cache")
+    assert sorted(warm) == sorted(cold)
+    assert all(torch.equal(warm[k], cold[k]) for k in cold)
+
+
+class _StubModel:
+    """Records what the runtime loads into it; the runtime only needs these methods."""
+
+    built = 0
+
+    def __init__(self):
+        type(self).built += 1
+        self.state = None
+        self.assigned = None
+
+    def load_state_dict(self, state, strict=True, assign=False):
+        self.state, self.assigned = state, assign
+        return [], []
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+
+def _runtime_kwargs(ckpt, **extra):
+    return dict(
+        model_class_path=f"{__name__}:_StubModel",
+        checkpoint_path=str(ckpt),
+        model_kwargs={},
+        device="cpu",
+        input_adapter_path="cam3d_tracker.nuscenes_runtime.adapters:default_input_adapter",
+        output_adapter_path="cam3d_tracker.nuscenes_runtime.adapters:default_output_adapter",
+        **extra,
+    )
+
+
+def test_warm_runtime_is_built_once_per_configuration(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    monkeypatch.setattr(_StubModel, "built", 0)
+    ckpt = tmp_path / "model.pth"
+    torch.save({"state_dict": {"module.fc.weight": torch.ones(2, 3)}}, ckpt)
+    clear_warm_runtimes()
+    try:
+        first = DetectorRuntime.warm(**_runtime_kwargs(ckpt))
+        assert DetectorRuntime.warm(**_runtime_kwargs(ckpt)) is first
+        assert _StubModel.built == 1
+        assert sorted(first.model.state) == ["fc.weight"]
+        # Tensors from a plain load are copied into the model's own parameters.
+        assert first.model.assigned is False
+
+        # A different cache setting is a different runtime; its memory-mapped tensors are adopted as they are.
+        cached = DetectorRuntime.warm(**_runtime_kwargs(ckpt, checkpoint_cache_dir=str(tmp_path / "cache")))
+        assert cached is not first and _StubModel.built == 2
+        assert cached.model.assigned is True
+
+        clear_warm_runtimes()
+        assert DetectorRuntime.warm(**_runtime_kwargs(ckpt)) is not first
+    finally:
+        clear_warm_runtimes()
@@ -0,0 +1,43 @@
+import copy
+import math
+
+import numpy as np
+
+from cam3d_tracker.models import DetectionBatch, FrameDetections
+from cam3d_tracker.pipeline import decimate_frames
+
+
+def test_dt_scaled_noise_matches_fixed_at_reference_dt_and_is_cached(tracker_factory):
+    fixed = tracker_factory("noise", process_noise_model="fixed")
+    scaled = tracker_factory("noise", process_noise_model="dt_scaled")
+    assert np.allclose(scaled.process_noise(0.5)[0], fixed.process_noise(0.5)[0])
+    q2 = scaled.process_noise(2.0)
+    assert np.allclose(q2[1], 4.0 * fixed.q_ctrv)
+    assert scaled.process_noise(2.0) is q2
+
+
+def test_decimated_dt_scaled_tracking_keeps_identity(tracker_factory):
+    rng = np.random.default_rng(3)
+    frames = []
+    for k in range(60):
+        t = 0.1 * k
+        z = np.array([[12.0 * t, 0.5 * t, 0.3, math.atan2(0.5, 12.0), 4.4, 1.9, 1.6]])
+        z[0, :2] += rng.normal(scale=0.3, size=2)
+        frames.append(FrameDetections(t, DetectionBatch.from_columns(z, np.array([0.9]), ["car"]), is_keyframe=k % 10 == 0))
+
+    # dt = 1.0 s, twice noise.reference_dt_s, so the two noise models differ.
+    kept = decimate_frames(frames, {"mode": "every_k", "every_k": 10})
+    assert [f.timestamp_s for f in kept] == [f.timestamp_s for f in decimate_frames(frames, {"mode": "keyframes"})]
+
+    dt = kept[1].timestamp_s - kept[0].timestamp_s
+    spread = {}
+    for model in ("fixed", "dt_scaled"):
+        tracker = tracker_factory("noise", process_noise_model=model)
+        ids = set()
+        for f in kept:
+            ids.update(o.track_id for o in tracker.step(f.timestamp_s, f.batch))
+        assert ids == {1}
+        filt = copy.deepcopy(tracker.tracks[1].filt)
+        filt.predict(dt, *tracker.process_noise(dt))
+        spread[model] = np.trace(filt.p[:2, :2])
+    assert spread["dt_scaled"] > 1.05 * spread["fixed"]
@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pytest
+
+from cam3d_tracker.geometry import bev_iou, bev_iou_pairs
+from cam3d_tracker.kernels import get_kernels
+from cam3d_tracker.models import DetectionBatch
+from cam3d_tracker.prefilter import DetectionPrefilter
+
+
+def _box(x, y, yaw, l, w):
+    return np.array([x, y, 0.0, 0.0, yaw, 0.0, l, w, 1.5])
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba"])
+def test_bev_iou_of_known_overlaps(backend):
+    # Clockwise box corners made the clipped intersection empty, so every IoU came out 0.
+    if backend == "numba":
+        pytest.importorskip("numba")
+    iou = get_kernels(backend).bev_iou
+    assert iou(_box(0, 0, 0, 2, 2), _box(1, 0, 0, 2, 2)) == pytest.approx(1 / 3)
+    assert iou(_box(0, 0, 0, 4, 2), _box(0, 0, math.pi / 2, 4, 2)) == pytest.approx(1 / 3)
+    assert iou(_box(0, 0, 0.3, 4, 4), _box(0, 0, 0.3, 2, 2)) == pytest.approx(0.25)
+    assert iou(_box(0, 0, 0, 2, 2), _box(5, 0, 0, 2, 2)) == 0.0
+    assert bev_iou(_box(3, -2, 1.0, 4.5, 1.9), _box(3, -2, 1.0, 4.5, 1.9)) == pytest.approx(1.0)
+
+
+def test_bev_iou_pairs_matches_scalar():
+    rng = np.random.default_rng(0)
+    a = np.column_stack([rng.normal(size=(200, 2)), rng.uniform(-4, 4, 200), rng.uniform(0.5, 5, (200, 2))])
+    b = np.column_stack([rng.normal(size=(200, 2)), rng.uniform(-4, 4, 200), rng.uniform(0.5, 5, (200, 2))])
+    b[:20] = a[:20]
+
+    def state(row):
+        x = np.zeros(9)
+        x[[0, 1, 4, 6, 7]] = row
+        return x
+
+    expected = np.array([bev_iou(state(ra), state(rb)) for ra, rb in zip(a, b)])
+    assert np.allclose(bev_iou_pairs(a, b), expected, atol=1e-9)
+    assert np.allclose(expected[:20], 1.0)
+
+
+def test_prefilter_thresholds_nms_and_top_k():
+    z = np.array(
+        [
+            [0.0, 0.0, 0.0, 0.0, 4.0, 2.0, 1.5],
+            [0.2, 0.1, 0.0, 0.05, 4.0, 2.0, 1.5],  # duplicate of 0
+            [10.0, 0.0, 0.0, 0.0, 4.0, 2.0, 1.5],
+            [20.0, 0.0, 0.0, 0.0, 4.0, 2.0, 1.5],
+            [30.0, 0.0, 0.0, 0.0, 0.6, 0.6, 1.7],
+            [30.25, 0.0, 0.0, 0.0, 0.6, 0.6, 1.7],
+        ]
+    )
+    scores = np.array([0.9, 0.8, 0.6, 0.1, 0.7, 0.5])
+    labels = ["car", "car", "car", "car", "pedestrian", "pedestrian"]
+    batch = DetectionBatch.from_columns(z, scores, labels)
+    prefilter = DetectionPrefilter(
+        {
+            "enabled": True,
+            "score_threshold": {"default": 0.2},
+            "nms": {"mode": "bev_iou", "iou_threshold": 0.5},
+            "top_k": {"default": 0, "pedestrian": 1},
+        }
+    )
+    kept, stats = prefilter(batch)
+    assert kept.z[:, 0].tolist() == [0.0, 10.0, 30.0]
+    assert (stats.below_score, stats.nms, stats.top_k, stats.kept) == (1, 1, 1, 3)
+
+    prefilter.nms_mode = "center"
+    prefilter.center_dist_m = {"default": 0.5}
+    kept, stats = prefilter(batch)
+    assert kept.z[:, 0].tolist() == [0.0, 10.0, 30.0]
+    assert stats.nms == 2 and stats.top_k == 0
@@ -0,0 +1,47 @@
+import json
+import math
+
+import numpy as np
+
+from cam3d_tracker.io_utils import load_frames
+from cam3d_tracker.nuscenes_runtime.results_stream import convert_results_stream, iter_result_slices
+
+
+def _anno(token, k, name="car"):
+    yaw = 0.3 * k - 1.0
+    return {
+        "sample_token": token,
+        "translation": [float(k), 2.0, 0.5],
+        "size": [1.9, 4.4, 1.6],
+        "rotation": [math.cos(yaw / 2), 0.0, 0.0, math.sin(yaw / 2)],
+        "velocity": [],
+        "detection_name": name,
+        "detection_score": 0.5 + 0.01 * k,
+        "attribute_name": "",
+    }
+
+
+def test_streamed_slices_match_full_parse(tmp_path):
+    results = {f"tok{i}": [_anno(f"tok{i}", k) for k in range(i)] for i in range(6)}
+    results["tok3"].append(_anno("tok3", 9, name="barrier"))
+    path = tmp_path / "results.json"
+    # Results before meta, indented, and a window far smaller than one sample.
+    path.write_text(json.dumps({"results": results, "meta": {"use_camera": True}}, indent=1))
+
+    slices = list(iter_result_slices(path, chunk_chars=37))
+    assert [t for t, _ in slices] == list(results)
+    assert all(json.loads(text) == results[t] for t, text in slices)
+
+    ts = {t: 0.5 * i for i, t in enumerate(results)}
+    outputs = []
+    for workers in (1, 2):
+        out = tmp_path / f"dets{workers}.json"
+        assert convert_results_stream(path, ts, out, {"car"}, trace_tokens=set(results) - {"tok1"}, workers=workers, tokens_per_task=2) == 5
+        outputs.append(out.read_text())
+    assert outputs[0] == outputs[1]
+
+    frames = load_frames(tmp_path / "dets1.json")
+    assert [len(f.batch) for f in frames] == [0, 2, 3, 4, 5]
+    z = frames[-1].batch.z
+    assert np.allclose(z[:, 3], 0.3 * np.arange(5) - 1.0)
+    assert np.allclose(z[:, 4:6], [4.4, 1.9])
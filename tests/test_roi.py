@@ -0,0 +1,43 @@
+import math
+
+import numpy as np
+
+from cam3d_tracker.models import DetectionBatch
+from cam3d_tracker.roi import RegionOfInterest
+
+
+def test_roi_per_class_radius_and_heading_box():
+    roi = RegionOfInterest(
+        {
+            "enabled": True,
+            "radius_m": {"default": 50.0, "pedestrian": 20.0},
+            "box": {"forward_m": 40.0, "rear_m": 10.0, "half_width_m": 15.0},
+        }
+    )
+    # Ego at (100, 0) heading +y: forward is +y, left is -x.
+    pose = {"translation": [100.0, 0.0, 0.0], "rotation": [math.cos(math.pi / 4), 0.0, 0.0, math.sin(math.pi / 4)]}
+    xy = np.array([[100.0, 30.0], [100.0, 30.0], [100.0, -12.0], [80.0, 0.0], [100.0, 45.0]])
+    codes = np.array([0, 1, 0, 0, 0])
+    inside = roi.inside(xy, codes, ("car", "pedestrian"), pose)
+    assert inside.tolist() == [True, False, False, False, False]
+    assert roi.inside(xy[2:3], codes[:1], ("car",), pose, margin_m=2.0).tolist() == [True]
+
+
+def test_tracker_culls_detections_and_retires_tracks_leaving_roi(tracker_factory):
+    tracker = tracker_factory("roi", enabled=True)
+
+    z = np.array([[10.0, 0.0, 0.0, 0.0, 4.5, 1.9, 1.6], [80.0, 0.0, 0.0, 0.0, 4.5, 1.9, 1.6]])
+    batch = DetectionBatch.from_columns(z, np.array([0.9, 0.9]), ["car", "car"])
+    for k in range(3):
+        outs = tracker.step(0.5 * k, batch, ego_pose={"translation": [0.0, 0.0, 0.0], "yaw": 0.0})
+    assert [round(o.state[0]) for o in outs] == [10]
+    assert tracker.last_roi_stats.detections == 1
+
+    # Ego drives away; the parked car falls out of range and is dropped at once.
+    tracker.step(1.5, DetectionBatch.empty(), ego_pose={"translation": [70.0, 0.0, 0.0], "yaw": 0.0})
+    assert not tracker.tracks
+    assert tracker.last_roi_stats.tracks == 1
+
+    # Without a pose nothing is culled.
+    tracker.step(2.0, batch)
+    assert len(tracker.tracks) == 2
@@ -0,0 +1,43 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cam3d_tracker.nuscenes_runtime.scene_index import (
+    SceneTables,
+    build_scene_shards,
+    build_trace_shard,
+    select_scenes,
+    write_index,
+)
+
+
+def _fake_nusc():
+    scenes = [{"token": f"s{i}", "name": f"scene-010{i}"} for i in range(3)] + [{"token": "s9", "name": "scene-0900"}]
+    samples = []
+    for scene in scenes:
+        # Table order deliberately not time order.
+        for k in (2, 0, 1):
+            samples.append({"token": f"{scene['token']}_{k}", "scene_token": scene["token"], "timestamp": 1_000_000 * k, "anns": []})
+    return SimpleNamespace(version="v1.0-mini", scene=scenes, sample=samples, sample_annotation=[])
+
+
+def test_select_and_shard_scenes(tmp_path):
+    tables = SceneTables(_fake_nusc())
+    scenes = select_scenes(tables.scenes, names=["scene-0900"], patterns=["scene-010[01]"])
+    assert [s["name"] for s in scenes] == ["scene-0100", "scene-0101", "scene-0900"]
+    with pytest.raises(ValueError):
+        select_scenes(tables.scenes, names=["scene-9999"])
+
+    assert tables.trace(scenes[0]) == (["s0_0", "s0_1", "s0_2"], {"s0_0": 0.0, "s0_1": 1.0, "s0_2": 2.0})
+
+    entries = build_scene_shards(tables, scenes, tmp_path, build_trace_shard, workers=2)
+    assert [e["scene_name"] for e in entries] == [s["name"] for s in scenes]
+    write_index(tmp_path, tables.version, entries)
+    write_index(tmp_path, tables.version, [{"scene_name": "scene-0100", "gt_results": "x.json"}])
+
+    index = json.loads((tmp_path / "index.json").read_text())
+    assert index["scenes"]["scene-0100"]["gt_results"] == "x.json"
+    assert index["scenes"]["scene-0100"]["num_samples"] == 3
+    tokens = json.loads((tmp_path / index["scenes"]["scene-0900"]["tokens"]).read_text())
+    assert tokens["sample_tokens"] == ["s9_0", "s9_1", "s9_2"]
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+
+from cam3d_tracker.nuscenes_runtime.shm_ring import consume_ring
+
+
+def _frame(seq):
+    n = seq % 5
+    z = np.full((n, 7), float(seq)) + np.arange(7)
+    return z, np.linspace(0.1, 0.9, n), np.arange(n, dtype=np.int64)
+
+
+def _producer(writer, start, num_frames, crash_marker):
+    for seq in range(start, num_frames):
+        if crash_marker and seq == 7 and not os.path.exists(crash_marker):
+            open(crash_marker, "w").close()
+            os._exit(1)
+        writer.put(seq, *_frame(seq), meta=("car",) * (seq % 3))
+
+
+def _shm_names():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+@pytest.mark.parametrize("crash", [False, True])
+def test_ring_delivers_every_frame_in_order_and_survives_a_crash(tmp_path, crash):
+    before = _shm_names()
+    marker = str(tmp_path / "crashed") if crash else ""
+    seen = []
+    for seq, z, scores, codes, meta in consume_ring(
+        _producer, (20, marker), slots=3, max_detections=8, start_method="fork", poll_s=0.05
+    ):
+        ez, es, ec = _frame(seq)
+        assert np.array_equal(z, ez) and np.array_equal(scores, es) and np.array_equal(codes, ec)
+        assert meta == ("car",) * (seq % 3)
+        seen.append(seq)
+    assert seen == list(range(20))
+    assert os.path.exists(marker) == crash
+    assert _shm_names() == before
+
+
+def test_ring_gives_up_after_max_restarts(tmp_path):
+    with pytest.raises(RuntimeError, match="died"):
+        for _ in consume_ring(_failing_producer, slots=2, max_detections=4, max_restarts=1, start_method="fork", poll_s=0.05):
+            pass
+
+
+def _failing_producer(writer, start):
+    os._exit(3)
+
+
+def test_ring_raises_on_a_frame_larger_than_max_detections():
+    with pytest.raises(RuntimeError, match="max_detections"):
+        for _ in consume_ring(_producer, (20, ""), slots=2, max_detections=3, start_method="fork", poll_s=0.05):
+            pass
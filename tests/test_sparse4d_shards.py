@@ -0,0 +1,112 @@
+import json
+import os
+import pickle
+import sys
+import textwrap
+import time
+
+from cam3d_tracker.nuscenes_runtime.sparse4d_bridge import run_sparse4d_to_tracker
+from cam3d_tracker.nuscenes_runtime.sparse4d_shards import ShardJob, plan_shards, run_shards
+
+# Stands in for Sparse4D's tools/test.py: one car per sample, and the first attempt of shard_001 crashes.
+FAKE_TEST_PY = textwrap.dedent(
+    """
+    import json, pickle, sys
+    from pathlib import Path
+
+    args = sys.argv[1:]
+    out_dir = Path(args[args.index("--eval-options") + 1].split("=", 1)[1])
+    opts = dict(a.split("=", 1) for a in args[args.index("--cfg-options") + 1 :])
+    infos = pickle.load(open(opts["data.test.ann_file"], "rb"))["infos"]
+    marker = out_dir / "crashed_once"
+    if out_dir.name == "shard_001" and not marker.exists():
+        marker.touch()
+        sys.exit(3)
+    results = {}
+    for info in infos:
+        x = float(info["timestamp"]) * 1e-6
+        results[info["token"]] = [
+            {"sample_token": info["token"], "translation": [x, 5.0, 0.5], "size": [1.9, 4.5, 1.6],
+             "rotation": [1.0, 0.0, 0.0, 0.0], "detection_name": "car", "detection_score": 0.9}
+        ]
+    json.dump({"meta": {}, "results": results}, open(out_dir / "results_nusc.json", "w"))
+    """
+)
+
+
+def _infos(scene_lengths):
+    infos = []
+    for s, n in enumerate(scene_lengths):
+        for k in range(n):
+            infos.append({"token": f"s{s}_{k}", "scene_token": f"scene{s}", "timestamp": (100 * s + k) * 500_000})
+    return infos
+
+
+def test_plan_shards_keeps_scenes_whole_and_balanced():
+    shards = plan_shards(_infos([40, 40, 10, 10, 20]), 3)
+    assert [len(s) for s in shards] == [40, 40, 40]
+    assert [len(s) for s in plan_shards(_infos([5, 5]), 4)] == [5, 5]
+
+    no_scene_tokens = [{k: v for k, v in info.items() if k != "scene_token"} for info in _infos([3, 3])]
+    assert [len(s) for s in plan_shards(no_scene_tokens, 2)] == [3, 3]
+
+
+def test_sharded_inference_retries_and_merges(tmp_path):
+    repo = tmp_path / "Sparse4D"
+    (repo / "tools").mkdir(parents=True)
+    (repo / "tools" / "test.py").write_text(FAKE_TEST_PY)
+    infos = _infos([6, 6, 6])
+    with open(tmp_path / "ann.pkl", "wb") as f:
+        pickle.dump({"infos": infos, "metadata": {"version": "v1.0-mini"}}, f)
+    with open(tmp_path / "ts.json", "w") as f:
+        json.dump({i["token"]: i["timestamp"] * 1e-6 for i in infos}, f)
+
+    cfg = {
+        "sparse4d": {
+            "run_inference": True,
+            "repo_root": str(repo),
+            "python_exe": sys.executable,
+            "config_path": "cfg.py",
+            "checkpoint_path": "ckpt.pth",
+            "nuscenes_dataroot": str(tmp_path),
+            "ann_file": str(tmp_path / "ann.pkl"),
+            "results_nusc_path": str(tmp_path / "unused" / "results_nusc.json"),
+            "shards": {"num_shards": 3, "max_concurrent": 2, "max_retries": 1, "poll_s": 0.05},
+        },
+        "conversion": {"token_timestamps_json": str(tmp_path / "ts.json")},
+        "tracker": {"config_path": "configs/default.yaml"},
+        "output": {
+            "detections_path": str(tmp_path / "out" / "detections.json"),
+            "tracks_path": str(tmp_path / "out" / "tracks.json"),
+        },
+    }
+    run_sparse4d_to_tracker(cfg)
+
+    assert (tmp_path / "out" / "sparse4d_shards" / "shard_001" / "crashed_once").exists()
+    with open(tmp_path / "out" / "detections.json") as f:
+        assert [fr["sample_token"] for fr in json.load(f)["frames"]] == [i["token"] for i in infos]
+    with open(tmp_path / "out" / "tracks.json") as f:
+        tracks = json.load(f)["tracks"]
+    # One car per scene, tracked within its shard and renumbered globally.
+    assert sorted({t["track_id"] for t in tracks}) == [1, 2, 3]
+
+
+def _touch_results(job):
+    return [sys.executable, "-c", f"open({str(job.results_path)!r}, 'w').close()"]
+
+
+def test_run_shards_keeps_launching_while_the_caller_is_busy(tmp_path):
+    jobs = []
+    for k in range(2):
+        d = tmp_path / f"shard_{k}"
+        d.mkdir()
+        jobs.append(ShardJob(k, d / "ann.pkl", d, d / "results.json", d / "test.log", 1))
+
+    finished = run_shards(jobs, _touch_results, cwd=tmp_path, env=dict(os.environ), max_concurrent=1, poll_s=0.02)
+    assert next(finished) is jobs[0]
+    # The caller still holds shard 0, yet its freed slot goes on to run shard 1.
+    deadline = time.monotonic() + 10.0
+    while not jobs[1].results_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert jobs[1].results_path.exists()
+    assert list(finished) == [jobs[1]]
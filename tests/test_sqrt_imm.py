@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from cam3d_tracker.imm_ekf import IMMEKF, SqrtIMMEKF, _IMMBase
+
+
+def _filters():
+    x0 = np.array([5.0, 1.0, 0.3, 2.0, 0.1, 0.0, 4.4, 1.9, 1.6])
+    p0 = np.diag(np.array([6.0, 6.0, 3.0, 4.0, 0.8, 0.8, 1.0, 1.0, 1.0]) ** 2)
+    mu0 = np.array([0.5, 0.5])
+    trans = np.array([[0.95, 0.05], [0.05, 0.95]])
+    return IMMEKF(x0, p0, mu0, trans), SqrtIMMEKF(x0, p0, mu0, trans)
+
+
+def test_sqrt_filter_matches_standard():
+    std, sqrt = _filters()
+    q = np.diag(np.array([0.8, 0.8, 0.4, 1.2, 0.15, 0.2, 0.05, 0.05, 0.05]) ** 2)
+    r = np.diag(np.array([1.8, 1.8, 1.2, 0.22, 0.3, 0.3, 0.3]) ** 2)
+    for k in range(10):
+        z = np.array([5.0 + k, 1.0 + 0.1 * k, 0.3, 0.1, 4.4, 1.9, 1.6])
+        for f in (std, sqrt):
+            f.predict(0.5, q, q)
+        assert np.isclose(std.innovation_mahalanobis(z, r), sqrt.innovation_mahalanobis(z, r))
+        for f in (std, sqrt):
+            f.update(z, r)
+        assert np.allclose(std.x, sqrt.x, atol=1e-8)
+        assert np.allclose(std.p, sqrt.p, atol=1e-8)
+
+
+def test_sqrt_filter_long_coast_stays_positive_definite():
+    _, sqrt = _filters()
+    q = np.diag(np.full(9, 1e-3))
+    for _ in range(2000):
+        sqrt.predict(0.5, q, q)
+    assert np.all(np.isfinite(sqrt.x))
+    assert np.all(np.linalg.eigvalsh(sqrt.p) > 0.0)
+
+
+def test_update_with_gating_innovation_matches_fresh_update():
+    q = np.diag(np.full(9, 0.1))
+    r = np.diag(np.array([1.8, 1.8, 1.2, 0.22, 0.3, 0.3, 0.3]) ** 2)
+    z = np.array([6.0, 1.3, 0.3, 3.1, 4.4, 1.9, 1.6])
+    for make in (lambda: _filters()[0], lambda: _filters()[1]):
+        fresh, reused = make(), make()
+        for f in (fresh, reused):
+            f.predict(0.5, q, q)
+        innov, _ = reused.innovations(z[None, :], r)
+        fresh.update(z, r)
+        reused.update(z, r, innov=innov[0])
+        assert np.allclose(fresh.x, reused.x)
+        assert np.allclose(fresh.p, reused.p)
+        assert np.allclose(fresh.state.mu, reused.state.mu)
+
+
+def test_imm_base_requires_the_gating_methods():
+    class Partial(_IMMBase):
+        def _gate_matrix(self, r, r_chol):
+            return r
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from cam3d_tracker.imm_ekf import IMMEKF, StaticPolicy
+from cam3d_tracker.models import DetectionBatch
+
+_Q = np.diag(np.array([0.8, 0.8, 0.4, 1.2, 0.15, 0.2, 0.05, 0.05, 0.05]) ** 2)
+_R = np.diag(np.array([0.3, 0.3, 0.2, 0.05, 0.1, 0.1, 0.1]) ** 2)
+
+
+def _filter():
+    x0 = np.array([5.0, 1.0, 0.3, 0.0, 0.1, 0.0, 4.4, 1.9, 1.6])
+    p0 = np.diag(np.array([1.0, 1.0, 1.0, 2.0, 0.3, 0.5, 0.5, 0.5, 0.5]) ** 2)
+    return IMMEKF(x0, p0, np.array([0.5, 0.5]), np.array([[0.95, 0.05], [0.05, 0.95]]), static=StaticPolicy())
+
+
+def test_parked_object_goes_static_and_returns_when_it_moves():
+    filt = _filter()
+    rng = np.random.default_rng(0)
+    z0 = np.array([5.0, 1.0, 0.3, 0.1, 4.4, 1.9, 1.6])
+    for _ in range(20):
+        filt.predict(0.5, _Q, _Q)
+        filt.update(z0 + rng.normal(scale=0.02, size=7), _R)
+    assert filt.is_static
+    assert filt.x[3] == 0.0 and filt.x[5] == 0.0
+
+    for k in range(1, 8):
+        filt.predict(0.5, _Q, _Q)
+        filt.update(z0 + np.array([3.0 * 0.5 * k, 0, 0, 0, 0, 0, 0]), _R)
+    assert not filt.is_static
+    assert filt.x[3] > 1.5
+
+
+def test_car_pulling_out_keeps_its_track_id(tracker_factory):
+    tracker = tracker_factory("imm", static={"enabled": True})
+    rng = np.random.default_rng(1)
+    ids = set()
+    was_static = False
+    for k in range(40):
+        t = 0.5 * k
+        x = 10.0 + (0.0 if t < 10.0 else 2.0 * (t - 10.0) ** 2 / 4.0)
+        z = np.array([[x, 4.0, 0.8, 0.0, 4.5, 1.9, 1.6]]) + rng.normal(scale=0.05, size=(1, 7))
+        outs = tracker.step(t, DetectionBatch.from_columns(z, np.array([0.9]), ["car"]))
+        ids.update(o.track_id for o in outs)
+        was_static |= next(iter(tracker.tracks.values())).filt.is_static
+    assert was_static and len(ids) == 1
+    assert outs[0].state[3] > 3.0
+
+
+def test_static_mode_requires_standard_filter_form(tracker_factory):
+    with pytest.raises(ValueError, match="static"):
+        tracker_factory("imm", static={"enabled": True}, filter_form="sqrt")
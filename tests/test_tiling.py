@@ -0,0 +1,100 @@
+import numpy as np
+
+from cam3d_tracker.models import DetectionBatch
+from cam3d_tracker.tiling import TiledTracker, tile_routes
+
+
+def test_tile_routes_include_the_halo():
+    xy = np.array([[5.0, 5.0], [19.0, 5.0], [-1.0, 39.5], [10.0, 10.0]])
+    routes = tile_routes(xy, 20.0, 2.0)
+    assert {k: v.tolist() for k, v in routes.items()} == {
+        (0, 0): [0, 1, 3],
+        (1, 0): [1],
+        (-1, 1): [2],
+        (0, 1): [2],
+        (-1, 2): [2],
+        (0, 2): [2],
+    }
+
+
+_TILING = {"enabled": True, "tile_size_m": 20.0, "overlap_m": 6.0}
+
+
+def _frames():
+    # A 4 x 4 grid of cars in one traffic flow across 20 m tiles, blinking in and out.
+    rng = np.random.default_rng(5)
+    gx, gy = np.meshgrid(np.arange(4) * 30.0, np.arange(4) * 30.0)
+    starts = np.column_stack([gx.ravel(), gy.ravel()]) - 45.0
+    velocity = np.array([4.0, 3.0]) + rng.normal(scale=0.3, size=(16, 2))
+    for k in range(30):
+        t = 0.5 * k
+        alive = rng.random(16) > 0.15
+        xy = starts[alive] + velocity[alive] * t + rng.normal(scale=0.1, size=(int(alive.sum()), 2))
+        yaw = np.arctan2(velocity[alive, 1], velocity[alive, 0])
+        z = np.column_stack([xy, np.zeros(len(xy)), yaw, np.tile([4.0, 1.8, 1.6], (len(xy), 1))])
+        yield t, DetectionBatch.from_columns(z, rng.uniform(0.4, 0.95, len(xy)), ["car"] * len(xy))
+
+
+def _key(outputs):
+    return [(o.track_id, o.label, o.status, o.hits, np.round(o.state, 9).tolist()) for o in outputs]
+
+
+def test_tiled_tracker_matches_single_tracker_across_borders(tracker_cfg, tracker_factory):
+    single = tracker_factory()
+    local = TiledTracker(tracker_cfg("tiling", **_TILING, workers=0))
+    pooled = TiledTracker(tracker_cfg("tiling", **_TILING, workers=2))
+    tiles_of: dict[int, set] = {}
+    try:
+        for t, batch in _frames():
+            ref = _key(single.step(t, batch))
+            assert _key(local.step(t, batch)) == ref
+            assert _key(pooled.step(t, batch)) == ref
+            for key, trk in local._workers[0]._tiles.trackers.items():
+                for tid in trk.tracks:
+                    tiles_of.setdefault(tid, set()).add(key)
+    finally:
+        pooled.close()
+    # Tracks really were handed across borders.
+    assert sum(len(keys) > 1 for keys in tiles_of.values()) >= 5
+
+
+def test_tiled_tracker_interns_unconfigured_labels(tracker_cfg, tracker_factory):
+    single = tracker_factory()
+    tiled = TiledTracker(tracker_cfg("tiling", **_TILING, workers=0))
+    for k in range(6):
+        t = 0.5 * k
+        z = np.array([[5.0 + 0.2 * t, 5.0, 0.3, 0.0, 0.4, 0.4, 0.7], [15.0 + 2.0 * t, 30.0, 0.5, 0.0, 4.0, 1.8, 1.6]])
+        batch = DetectionBatch.from_columns(z, [0.9, 0.9], ["traffic_cone", "car"])
+        ref = _key(single.step(t, batch))
+        assert _key(tiled.step(t, batch)) == ref
+    assert {o.label for o in tiled.step(3.0, batch)} == {"traffic_cone", "car"}
+
+
+def _cars(t, xs):
+    z = np.array([[x, 5.0, 0.0, 0.0, 4.0, 1.8, 1.6] for x in xs])
+    return DetectionBatch.from_columns(z, [0.9] * len(xs), ["car"] * len(xs))
+
+
+def test_tiled_tracker_gives_a_shared_halo_detection_to_one_track(tracker_cfg, tracker_factory):
+    # Two parked cars either side of the x = 20 m border, then one detection between them in both halos.
+    single = tracker_factory()
+    tiled = TiledTracker(tracker_cfg("tiling", **_TILING, workers=0))
+    frames = [(0.5 * k, _cars(0.5 * k, [17.0, 23.0])) for k in range(4)]
+    frames.append((2.0, _cars(2.0, [19.2])))
+    for t, batch in frames:
+        ref = single.step(t, batch)
+        out = tiled.step(t, batch)
+        assert _key(out) == _key(ref)
+    hits = sorted((o.hits, o.state[0] < 20.0) for o in out)
+    # Only the nearer track took it; the other counted a miss.
+    assert hits == [(4, False), (5, True)]
+
+
+def test_tiled_tracker_drops_tiles_left_without_tracks(tracker_cfg):
+    tiled = TiledTracker(tracker_cfg("tiling", **_TILING, workers=0))
+    for k in range(8):
+        t = 0.5 * k
+        tiled.step(t, _cars(t, [15.0 + 4.0 * t]))
+    # The car started in tile (0, 0) and drove into (1, 0); the old tile is gone on both sides.
+    assert set(tiled._tile_worker) == {(1, 0)}
+    assert set(tiled._workers[0]._tiles.trackers) == {(1, 0)}